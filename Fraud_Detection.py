@@ -4,47 +4,78 @@ import pandas as pd
 import requests
 import io
 from datetime import date
-import base64
+import json
 import altair as alt
+import numpy as np
 import networkx as nx
-from network_analysis import build_claim_graph, calculate_graph_risk
+from network_analysis import build_claim_graph, calculate_graph_risk, claim_graph_features
+from backend_client import LONG_TIMEOUT, get_backend_client
+from region_data import get_region_data
+from batch_transport import accept_header, decode_batch_response
+from batch_stream import DEFAULT_WORKERS, chunk_rows_for_budget, count_rows, stream_batch_score
+from claim_features import prepare_claims, to_payloads
+from ingestion import read_claims, to_csv_bytes
+from rule_engine import screen_claims, traffic_stats
+import perf
 
-
-def load_provinces():
-    url = "https://wilayah.id/api/provinces.json"
-    res = requests.get(url).json()
-    return res["data"]
-
-@st.cache_data
-def load_regencies(province_code):
-    if not province_code:
-        return []
-    url = f"https://wilayah.id/api/regencies/{province_code}.json"
-    res = requests.get(url).json()
-    return res["data"]
  # in docker compose, backend service name
 API_BASE = st.secrets["API_BASE"]  #st.secrets["API_BASE"] "http://localhost:8000"
+backend = get_backend_client()
 
 st.set_page_config(layout="wide", page_title="Fraud Triage Demo")
+perf_run = perf.begin_page("Fraud_Detection")
 
 st.title("🔍 Fraud Detection — Single Claim Checker")
 
 st.subheader("👥 Demographic & Geographic")
 
 # --- PROVINSI DAN KABUPATEN DI LUAR FORM ---
-provinces = load_provinces()
+# Dari snapshot lokal; refresh ke wilayah.id (bila basi) berjalan di latar
+regions = get_region_data()
+regions.refresh_async()
+
+provinces = regions.provinces()
 province_options = [""] + [prov["name"] for prov in provinces]
 province_selected = st.selectbox("Provinsi", province_options)
 
-province_code = next(
-    (p["code"] for p in provinces if p["name"] == province_selected),
-    None
-)
+province_code = regions.province_code(province_selected)
 
-regencies = load_regencies(province_code)
+regencies = regions.regencies(province_code)
 regency_options = [""] + [reg["name"] for reg in regencies]
 regency_selected = st.selectbox("Kabupaten", regency_options)
 
+# Pre-screening lokal: klaim yang jelas aman / jelas mencurigakan diputuskan di sini,
+# hanya klaim meragukan (AMBER) yang dikirim ke backend. Ambang rule bisa di-override
+# lewat st.secrets["RULE_THRESHOLDS"].
+prescreen = st.toggle("🚦 Pre-screening lokal (rule-based)", value=True)
+rule_thresholds = dict(st.secrets.get("RULE_THRESHOLDS", {}))
+if "triage_stats" not in st.session_state:
+    st.session_state.triage_stats = {"total": 0, "forwarded": 0}
+if "triage_result" not in st.session_state:
+    st.session_state.triage_result = None
+
+RISK_BADGES = {"GREEN": "🟩 Green", "AMBER": "🟨 Amber", "RED": "🟥 Red"}
+
+
+def record_triage(screening):
+    stats = traffic_stats(screening)
+    st.session_state.triage_stats["total"] += stats["total"]
+    st.session_state.triage_stats["forwarded"] += stats["forwarded"]
+
+
+def render_screening(claim_id, verdict):
+    st.markdown(f"## 🧾 Hasil Pre-screening Klaim — **{claim_id}**")
+    col1, col2 = st.columns(2)
+    col1.metric("Label", RISK_BADGES[verdict["label"]])
+    col2.metric("Rule Score", f"{verdict['risk_score']:.2f}")
+    if verdict["reasons"]:
+        for r in verdict["reasons"]:
+            st.markdown(f"- **{r['rule']}** — {r['explanation']}")
+    else:
+        st.success("Tidak ada rules yang terpicu — klaim tampak normal.")
+    st.caption("Diputuskan lokal oleh rule engine, tidak dikirim ke backend.")
+
+
 with st.form("single_claim_form"):
     # =====================
     # 🧾 Core Identifiers
@@ -89,7 +120,6 @@ with st.form("single_claim_form"):
         kode_prosedur = st.text_input("Kode Prosedur")
         jenis_pelayanan = st.selectbox("Jenis Pelayanan", ["", "Rawat Jalan", "Rawat Inap"])
         claim_month = st.number_input("Bulan Klaim (1-12)", min_value=1, max_value=12, step=1)
-        claim_quarter = (claim_month - 1) // 3 + 1
     with col3:
         room_class = st.selectbox("Kelas Rawat", ["", "Kelas 1", "Kelas 2", "Kelas 3", "VIP"])
         lama_dirawat = st.number_input("Lama Dirawat (hari)", min_value=0, step=1)
@@ -108,9 +138,8 @@ with st.form("single_claim_form"):
         procedure_cost = st.number_input("Procedure Cost (Rp)", min_value=0)
         rolling_avg_cost_30d: int = st.number_input("Rata-rata biaya klaim dalam 30 hari terakhir (Rp)", min_value=0)
     with col3:
-        selisih_klaim = billed_amount - paid_amount
         provider_monthly_claims = st.number_input("Total Klaim Provider dalam Sebulan (Rp)", min_value=0)
-        st.text_input("Selisih Klaim (auto)", value=str(selisih_klaim), disabled=True)
+        selisih_slot = st.empty()
 
     # =====================
     # 📊 Behavioral Metrics
@@ -129,23 +158,10 @@ with st.form("single_claim_form"):
     # =====================
     # 🧮 Computed Features
     # =====================
-    claim_ratio = billed_amount / paid_amount if paid_amount else 0
-    drug_ratio = drug_cost / billed_amount if billed_amount else 0
-    procedure_ratio = procedure_cost / billed_amount if billed_amount else 0
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.text_input("Claim Ratio (auto)", value=f"{claim_ratio:.2f}", disabled=True)
-    with col2:
-        st.text_input("Drug Ratio (auto)", value=f"{drug_ratio:.2f}", disabled=True)
-    with col3:
-        st.text_input("Procedure Ratio (auto)", value=f"{procedure_ratio:.2f}", disabled=True)
-
+    feature_slots = st.columns(3)
     provider_claim_share = st.number_input("Provider Claim Share", min_value=0.0, max_value=1.0, step=0.01)
 
-    submitted = st.form_submit_button("🔎 Check Risk")
-
-if submitted:
-    payload = {
+    claim = pd.DataFrame([{
         # Core Identifiers
         "claim_id": claim_id,
         "episode_id": episode_id,
@@ -153,7 +169,7 @@ if submitted:
         "nik_hash": nik_hash,
         "faskes_id": faskes_id,
         "dpjp_id": dpjp_id,
-        "nik_hash_reuse_count": 1,
+        "nik_hash_reuse_count": nik_hash_reuse_count,
 
         # Demographic & Geographic
         "age": age,
@@ -163,7 +179,7 @@ if submitted:
         "faskes_level": faskes_level,
 
         # Clinical Information
-        "tgl_pelayanan": tgl_pelayanan.isoformat(),
+        "tgl_pelayanan": tgl_pelayanan,
         "kode_icd10": kode_icd10,
         "kode_prosedur": kode_prosedur,
         "jenis_pelayanan": jenis_pelayanan,
@@ -175,14 +191,12 @@ if submitted:
         # Financial Data
         "billed_amount": billed_amount,
         "paid_amount": paid_amount,
-        "selisih_klaim": selisih_klaim,
         "drug_cost": drug_cost,
         "procedure_cost": procedure_cost,
         "tarif_inacbg": tarif_inacbg,
         "rolling_avg_cost_30d": rolling_avg_cost_30d,
         "provider_monthly_claims": provider_monthly_claims,
-        "claim_month" : claim_month,
-        'claim_quarter': claim_quarter,
+        "claim_month": claim_month,
 
         # Behavioral Metrics
         "clinical_pathway_deviation_score": clinical_pathway_deviation_score,
@@ -193,15 +207,35 @@ if submitted:
         # "fraud_flag": 0,
         # "fraud_type": "upcoding_diagnosis",
 
-        # Computed Features
-        "claim_ratio": claim_ratio,
-        "drug_ratio": drug_ratio,
-        "procedure_ratio": procedure_ratio,
         "provider_claim_share": provider_claim_share,
-    }
-    
+    }])
+    # Fitur turunan (selisih, rasio, kuartal) dihitung & divalidasi dengan modul
+    # yang sama seperti upload batch
+    valid_claims, rejected_claims = prepare_claims(claim)
+    screening = screen_claims(valid_claims, rule_thresholds)
+    features = claim.iloc[0]
+    selisih_slot.text_input("Selisih Klaim (auto)", value=f"{features['selisih_klaim']:.0f}", disabled=True)
+    feature_slots[0].text_input("Claim Ratio (auto)", value=f"{features['claim_ratio']:.2f}", disabled=True)
+    feature_slots[1].text_input("Drug Ratio (auto)", value=f"{features['drug_ratio']:.2f}", disabled=True)
+    feature_slots[2].text_input("Procedure Ratio (auto)", value=f"{features['procedure_ratio']:.2f}", disabled=True)
+
+    submitted = st.form_submit_button("🔎 Check Risk")
+
+if submitted and not rejected_claims.empty:
+    # Ditolak lokal, tidak perlu round-trip ke backend
+    st.error("❌ Data klaim tidak valid: " + rejected_claims["errors"].iloc[0])
+
+elif submitted and prescreen and not screening["forward"].iloc[0]:
+    record_triage(screening)
+    render_screening(claim_id, screening.iloc[0])
+
+elif submitted:
+    if prescreen:
+        record_triage(screening)
+    payload = to_payloads(valid_claims)[0]
+
     with st.spinner("Evaluating risk..."):
-        response = requests.post(f"{API_BASE}/score_single", json=payload)
+        response = backend.post("/score_single", json=payload)
 
     if response.status_code == 200:
         predictions = response.json()["predictions"]
@@ -288,80 +322,240 @@ if submitted:
     else:
         st.error("❌ Failed to get prediction.")
 
+if st.session_state.triage_stats["total"]:
+    stats = st.session_state.triage_stats
+    avoided = stats["total"] - stats["forwarded"]
+    st.caption(
+        f"🚦 Pre-screening: {avoided:,} dari {stats['total']:,} klaim diputuskan lokal "
+        f"({avoided / stats['total']:.0%} request ke backend dihindari)"
+    )
+
+# =====================
+# 🚦 Triage Banyak Klaim
+# =====================
+st.subheader("🚦 Triage Banyak Klaim")
+triage_file = st.file_uploader("Upload klaim untuk triage (CSV/Parquet)", type=["csv", "parquet"], key="triage_file")
+
+
+def run_triage(file):
+    # Rule engine menilai semua klaim sekaligus; hanya klaim AMBER yang dikirim
+    # paralel ke /score_single
+    valid, rejected = prepare_claims(read_claims(file, file.name))
+    screening = screen_claims(valid, rule_thresholds)
+    forward = screening["forward"].to_numpy()
+
+    responses = backend.score_claims(to_payloads(valid[forward])) if forward.any() else []
+    backend_results = np.full(len(screening), None, dtype=object)
+    backend_results[np.flatnonzero(forward)] = [
+        json.dumps(r.json()) if not isinstance(r, Exception) and r.status_code == 200 else None
+        for r in responses
+    ]
+
+    table = pd.DataFrame({
+        "claim_id": valid["claim_id"].to_numpy(),
+        "label": screening["label"].to_numpy(),
+        "rule_score": screening["risk_score"].round(2).to_numpy(),
+        "rules": [", ".join(r["rule"] for r in reasons) for reasons in screening["reasons"]],
+        "forwarded": forward,
+        "backend_result": backend_results,
+    })
+    stats = traffic_stats(screening)
+    stats["failed"] = int(sum(1 for r in responses if isinstance(r, Exception) or r.status_code != 200))
+    return {"table": table, "stats": stats, "rejected": len(rejected)}
+
+
+if triage_file:
+    # Hasil disimpan per file supaya rerun tidak mengirim ulang request
+    if st.session_state.triage_result is None or st.session_state.triage_result[0] != triage_file.file_id:
+        try:
+            with st.spinner("⏳ Pre-screening & scoring klaim meragukan..."):
+                with perf.span("triage"):
+                    st.session_state.triage_result = (triage_file.file_id, run_triage(triage_file))
+        except ValueError as e:
+            st.error(f"❌ File tidak valid: {e}")
+            st.session_state.triage_result = None
+
+    if st.session_state.triage_result is not None:
+        triage = st.session_state.triage_result[1]
+        stats = triage["stats"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Klaim Valid", f"{stats['total']:,}")
+        col2.metric("Dikirim ke Backend", f"{stats['forwarded']:,}")
+        col3.metric("Request Dihindari", f"{stats['avoided_share']:.0%}")
+        col4.metric("Gagal / Ditolak", f"{stats['failed']:,} / {triage['rejected']:,}")
+        st.dataframe(triage["table"], use_container_width=True, hide_index=True)
+
 st.title("📊 Batch Scoring Dashboard")
 
+
+def fraud_type_chart(fraud_type_counts):
+    # Hapus "benign"
+    fraud_only = fraud_type_counts.drop("benign", errors="ignore")
+    df_chart = fraud_only.reset_index()
+    df_chart.columns = ["fraud_type", "count"]
+
+    return (
+        alt.Chart(df_chart)
+        .mark_bar()
+        .encode(
+            x=alt.X("count:Q", title="Jumlah"),
+            y=alt.Y("fraud_type:N", sort="-x", title="Fraud Type"),
+            tooltip=["fraud_type", "count"]
+        )
+        .properties(width=600, height=450)
+    )
+
+
 uploaded = st.file_uploader("Upload scored parquet/csv (or use demo)", type=["parquet","csv"])
 
+# Mode streaming: file dibaca & dikirim per chunk, hasil tampil bertahap
+stream_mode = st.toggle("⚡ Mode streaming (untuk file besar)")
+if stream_mode:
+    col1, col2 = st.columns(2)
+    max_memory_mb = col1.number_input("Batas memori chunk (MB)", min_value=64, value=512, step=64)
+    workers = col2.slider("Request paralel", min_value=1, max_value=8, value=DEFAULT_WORKERS)
+
+# Fitur graf (degree partisipan, DPJP per partisipan, porsi tetangga fraud, ukuran
+# komponen) dihitung atas seluruh file, jadi hanya tersedia di mode non-streaming
+graph_features = st.toggle("🕸️ Sertakan fitur graf klaim", disabled=stream_mode)
+
 if uploaded:
-    with st.spinner("⏳ Mengirim ke backend untuk scoring..."):
-        files = {"file": (uploaded.name, uploaded.getvalue())}
-        response = requests.post(f"{API_BASE}/batch_score", files=files)
+    if stream_mode:
+        total_expected = count_rows(uploaded, uploaded.name)
+        chunk_rows = chunk_rows_for_budget(uploaded, uploaded.name, max_memory_mb, workers)
+        progress = st.progress(0.0, text="⏳ Mengirim chunk pertama ke backend...")
+        live = st.empty()
+        running = {"fraud": 0, "types": pd.Series(dtype="int64")}
+        rejected_chunks = []
+
+        def prepare(chunk):
+            valid, rejected = prepare_claims(chunk)
+            if len(rejected):
+                rejected_chunks.append(rejected)
+            return valid
+
+        def on_chunk(index, rows_done, predictions):
+            running["fraud"] += int(predictions["predicted_fraud"].sum())
+            running["types"] = running["types"].add(
+                predictions["predicted_fraud_type"].value_counts(), fill_value=0
+            )
+            progress.progress(
+                min(rows_done / max(total_expected, 1), 1.0),
+                text=f"⏳ {rows_done:,} / ~{total_expected:,} baris diproses",
+            )
+            with live.container():
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Rows Scored", f"{rows_done:,}")
+                col2.metric("Predicted Fraud (1)", f"{running['fraud']:,}")
+                col3.metric("Predicted Not Fraud (0)", f"{(rows_done - running['fraud']):,}")
+                st.altair_chart(fraud_type_chart(running["types"].astype("int64")), use_container_width=True)
+
+        try:
+            with perf.span("batch_stream", chunk_rows=chunk_rows, workers=workers):
+                df = stream_batch_score(backend, uploaded, uploaded.name, chunk_rows, workers, on_chunk, prepare)
+        except ValueError as e:
+            st.error(f"❌ File tidak valid: {e}")
+            st.stop()
+        except (RuntimeError, requests.RequestException):
+            st.error("Gagal memproses batch.")
+            st.stop()
+
+        progress.empty()
+        live.empty()
+        rejected = pd.concat(rejected_chunks) if rejected_chunks else pd.DataFrame()
+        batch = {
+            "df": df,
+            "raw": df.to_csv(index=False).encode(),
+            "file_name": "predictions.csv",
+            "mime": "text/csv",
+        }
 
-    if response.status_code != 200:
-        st.error("Gagal memproses batch.")
-        st.stop()
-    
     else:
-        data = response.json()
-        csv_b64 = data["predictions_csv_b64"]
-        df = pd.read_csv(io.BytesIO(base64.b64decode(csv_b64)))
-        st.subheader("📋 Prediction Summary")
+        # Validasi & fitur turunan dihitung lokal; baris yang ditolak tidak dikirim
+        try:
+            valid, rejected = prepare_claims(read_claims(uploaded, uploaded.name))
+        except ValueError as e:
+            st.error(f"❌ File tidak valid: {e}")
+            st.stop()
+        if valid.empty:
+            st.error("❌ Tidak ada baris valid untuk di-scoring.")
+            st.stop()
+        if graph_features:
+            with st.spinner("🕸️ Menghitung fitur graf klaim..."):
+                valid = valid.join(claim_graph_features(valid))
+
+        with st.spinner("⏳ Mengirim ke backend untuk scoring..."):
+            if uploaded.name.lower().endswith(".parquet"):
+                buf = io.BytesIO()
+                valid.to_parquet(buf, index=False)
+                files = {"file": (uploaded.name, buf.getvalue())}
+            else:
+                files = {"file": (uploaded.name, to_csv_bytes(valid))}
+            # Minta Arrow/Parquet bila backend mendukung; backend lama membalas JSON + CSV base64
+            response = backend.post(
+                "/batch_score", files=files, headers={"Accept": accept_header()}, timeout=LONG_TIMEOUT
+            )
 
-        # 1️⃣ Hitung total baris
-        total_rows = len(df)
+        if response.status_code != 200:
+            st.error("Gagal memproses batch.")
+            st.stop()
+
+        with perf.span("decode_batch_response"):
+            batch = decode_batch_response(response)
+
+    if len(rejected):
+        st.warning(f"⚠️ {len(rejected):,} baris ditolak validasi dan tidak dikirim ke backend.")
+        with st.expander("Lihat baris yang ditolak"):
+            st.dataframe(rejected.head(1000))
+            st.download_button(
+                "Download baris ditolak (CSV)",
+                data=to_csv_bytes(rejected),
+                file_name="rejected_rows.csv",
+                mime="text/csv",
+            )
 
-        # 2️⃣ Hitung total kolom predicted_fraud == 1
-        total_fraud_predicted = df["predicted_fraud"].sum()
+    df = batch["df"]
+    st.subheader("📋 Prediction Summary")
 
-        # 3️⃣ Hitung jumlah per kategori predicted_fraud_type
-        fraud_type_counts = df["predicted_fraud_type"].value_counts()
-            
-        col1, col2, col3 = st.columns(3)
-        
-        col1.metric("Total Rows", f"{total_rows:,}")
-        col2.metric("Predicted Fraud (1)", f"{total_fraud_predicted:,}")
-        col3.metric("Predicted Not Fraud (0)", f"{(total_rows - total_fraud_predicted):,}")
-
-        # Hapus "benign"
-        fraud_only = fraud_type_counts.drop("benign", errors="ignore")
-        df_chart = fraud_only.reset_index()
-        df_chart.columns = ["fraud_type", "count"]
-
-        chart = (
-            alt.Chart(df_chart)
-            .mark_bar()
-            .encode(
-                x=alt.X("count:Q", title="Jumlah"),
-                y=alt.Y("fraud_type:N", sort="-x", title="Fraud Type"),
-                tooltip=["fraud_type", "count"]
-            )
-            .properties(width=600, height=450)
-        )
+    # 1️⃣ Hitung total baris
+    total_rows = len(df)
 
-        st.subheader("📊 Fraud Type Distribution")
-        st.altair_chart(chart, use_container_width=True)
-        
-        
-        st.markdown("---")
-        
+    # 2️⃣ Hitung total kolom predicted_fraud == 1
+    total_fraud_predicted = df["predicted_fraud"].sum()
 
-        st.subheader("🔍 Predicted Fraud Type Breakdown")
-        st.write(fraud_type_counts)
+    # 3️⃣ Hitung jumlah per kategori predicted_fraud_type
+    fraud_type_counts = df["predicted_fraud_type"].value_counts()
         
-        # === DOWNLOAD BUTTON ===
-        st.subheader("📥 Download Predictions")
-        csv_bytes = base64.b64decode(csv_b64)
-
-        st.download_button(
-            "Download Predictions CSV",
-            data=csv_bytes,
-            file_name="predictions.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
+    col1, col2, col3 = st.columns(3)
+    
+    col1.metric("Total Rows", f"{total_rows:,}")
+    col2.metric("Predicted Fraud (1)", f"{total_fraud_predicted:,}")
+    col3.metric("Predicted Not Fraud (0)", f"{(total_rows - total_fraud_predicted):,}")
+
+    st.subheader("📊 Fraud Type Distribution")
+    st.altair_chart(fraud_type_chart(fraud_type_counts), use_container_width=True)
+    
+    
+    st.markdown("---")
+    
+
+    st.subheader("🔍 Predicted Fraud Type Breakdown")
+    st.write(fraud_type_counts)
+    
+    # === DOWNLOAD BUTTON ===
+    st.subheader("📥 Download Predictions")
+    st.download_button(
+        f"Download Predictions ({batch['file_name'].rsplit('.', 1)[-1].upper()})",
+        data=batch["raw"],
+        file_name=batch["file_name"],
+        mime=batch["mime"],
+        use_container_width=True
+    )
         
 
 else:
     # try ask backend for sample via / (or show message)
     st.info("Upload scored file exported from backend, or run demo seeds.")
     df = pd.DataFrame()
+
+perf.end_page(perf_run, {"Latensi backend": backend.latency_stats()})
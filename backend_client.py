@@ -0,0 +1,245 @@
+import bisect
+import gzip
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from urllib.parse import urlsplit
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from perf import span, submit
+
+# Timeout (connect, read) dalam detik
+DEFAULT_TIMEOUT = (5, 60)
+# Endpoint batch memproses seluruh file, jadi read timeout lebih longgar
+LONG_TIMEOUT = (5, 600)
+POOL_SIZE = 10
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (500, 502, 503, 504)
+# Endpoint POST yang idempoten (skoring satu klaim) sehingga aman di-retry
+RETRY_POST_PATHS = ("/score_single",)
+# Body JSON di bawah ukuran ini tidak dikompres
+GZIP_MIN_BYTES = 1024
+# Batas request paralel default untuk fan-out (tidak melebihi ukuran pool koneksi)
+MAX_CONCURRENCY = 8
+# Artefak hasil inference (CSV prediksi, JSON penjelasan): dipakai ulang tanpa
+# request selama TTL, setelahnya direvalidasi dengan If-None-Match
+ARTIFACT_TTL = 300
+ARTIFACT_CACHE_SIZE = 32
+# Batas atas bucket histogram latensi (ms); bucket terakhir = tak hingga
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+# ============================
+# HISTOGRAM LATENSI
+# ============================
+class LatencyHistogram:
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float):
+        self.counts[bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def summary(self):
+        n = sum(self.counts)
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            "count": n,
+            "mean_ms": round(self.total_ms / n, 1) if n else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {label: c for label, c in zip(labels, self.counts) if c},
+        }
+
+
+# ============================
+# BACKEND CLIENT
+# ============================
+class BackendClient:
+    # Satu requests.Session untuk semua panggilan ke backend: koneksi keep-alive
+    # di-pool, timeout default, retry dengan backoff untuk 5xx, kompresi gzip,
+    # dan histogram latensi per endpoint.
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout=DEFAULT_TIMEOUT,
+        pool_size: int = POOL_SIZE,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        gzip_requests: bool = False,
+        retry_post_paths=RETRY_POST_PATHS,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.gzip_requests = gzip_requests
+        self.pool_size = pool_size
+
+        def adapter(allowed_methods):
+            retry = Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=allowed_methods,
+                raise_on_status=False,  # kembalikan response terakhir, status dicek pemanggil
+            )
+            return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        # Default: hanya method idempoten (GET, PUT, ...) yang di-retry saat 5xx/timeout baca.
+        # POST upload batch (/inference_graph, /batch_score) tidak di-retry supaya job
+        # inference di server tidak terduplikasi; POST yang aman diulang didaftarkan
+        # di retry_post_paths dan mendapat adapter sendiri (prefix URL terpanjang menang).
+        self.session = requests.Session()
+        default_adapter = adapter(Retry.DEFAULT_ALLOWED_METHODS)
+        self.session.mount("http://", default_adapter)
+        self.session.mount("https://", default_adapter)
+        post_adapter = adapter(Retry.DEFAULT_ALLOWED_METHODS | {"POST"})
+        for path in retry_post_paths:
+            self.session.mount(self.url(path), post_adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+        self._latency = {}
+        self._artifacts = OrderedDict()  # url -> {"content", "etag", "checked_at", "version"}
+        self._versions = count(1)
+        self._lock = threading.Lock()
+
+    def url(self, endpoint: str):
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def _compress_json(self, kwargs: dict):
+        body = json.dumps(kwargs.pop("json")).encode("utf-8")
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers["Content-Type"] = "application/json"
+        if len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        kwargs["data"] = body
+        kwargs["headers"] = headers
+
+    def request(self, method: str, endpoint: str, **kwargs):
+        url = self.url(endpoint)
+        kwargs.setdefault("timeout", self.timeout)
+        if self.gzip_requests and kwargs.get("json") is not None:
+            self._compress_json(kwargs)
+
+        key = f"{method} {urlsplit(url).path}"
+        start = time.perf_counter()
+        try:
+            with span("backend", request=key):
+                return self.session.request(method, url, **kwargs)
+        finally:
+            self._record(key, (time.perf_counter() - start) * 1000)
+
+    def get(self, endpoint: str, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def gather(self, calls: dict, max_concurrency: int = MAX_CONCURRENCY):
+        # Jalankan beberapa request sekaligus di thread pool.
+        # calls: {nama: (method, endpoint, kwargs)} -> {nama: response}
+        # Exception dari satu request diteruskan saat hasilnya diambil.
+        workers = max(1, min(max_concurrency, self.pool_size, len(calls)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                name: submit(pool, self.request, method, endpoint, **(kwargs or {}))
+                for name, (method, endpoint, kwargs) in calls.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
+
+    def score_claims(self, payloads: list, max_concurrency: int = MAX_CONCURRENCY):
+        # Skor banyak klaim via /score_single secara paralel (terbatas), urutan tetap.
+        # Hasil per klaim: response, atau exception bila request gagal.
+        workers = max(1, min(max_concurrency, self.pool_size, len(payloads)))
+
+        def score(payload):
+            try:
+                return self.post("/score_single", json=payload)
+            except requests.RequestException as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [submit(pool, score, payload) for payload in payloads]
+            return [future.result() for future in futures]
+
+    def fetch_artifact(self, url: str, ttl: float = ARTIFACT_TTL):
+        # Hasil: {"content": bytes, "etag", "checked_at", "version"}. "version" hanya
+        # berubah bila isi artefak benar-benar baru (bukan 304 Not Modified).
+        endpoint = self.url(url)
+        with self._lock:
+            entry = self._artifacts.get(endpoint)
+            if entry is not None:
+                self._artifacts.move_to_end(endpoint)
+        if entry is not None and time.time() - entry["checked_at"] < ttl:
+            return entry
+
+        headers = {"If-None-Match": entry["etag"]} if entry is not None and entry["etag"] else {}
+        try:
+            response = self.get(endpoint, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                entry["checked_at"] = time.time()
+                return entry
+            response.raise_for_status()
+        except requests.RequestException:
+            # Revalidasi gagal: pakai salinan lama bila ada
+            if entry is not None:
+                return entry
+            raise
+
+        entry = {
+            "content": response.content,
+            "etag": response.headers.get("ETag"),
+            "checked_at": time.time(),
+            "version": next(self._versions),
+        }
+        with self._lock:
+            self._artifacts[endpoint] = entry
+            while len(self._artifacts) > ARTIFACT_CACHE_SIZE:
+                self._artifacts.popitem(last=False)
+        return entry
+
+    def fetch_artifacts(self, urls: dict, ttl: float = ARTIFACT_TTL):
+        # {nama: url} -> {nama: artefak}, diunduh/direvalidasi paralel
+        workers = max(1, min(MAX_CONCURRENCY, self.pool_size, len(urls)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {name: submit(pool, self.fetch_artifact, url, ttl) for name, url in urls.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def _record(self, key: str, elapsed_ms: float):
+        with self._lock:
+            self._latency.setdefault(key, LatencyHistogram()).record(elapsed_ms)
+
+    def latency_stats(self):
+        with self._lock:
+            return {key: hist.summary() for key, hist in sorted(self._latency.items())}
+
+    def close(self):
+        self.session.close()
+
+
+@st.cache_resource
+def get_backend_client():
+    # Dibagi antar rerun & sesi; konfigurasi opsional lewat st.secrets
+    return BackendClient(
+        st.secrets["API_BASE"],
+        timeout=(
+            st.secrets.get("BACKEND_CONNECT_TIMEOUT", DEFAULT_TIMEOUT[0]),
+            st.secrets.get("BACKEND_READ_TIMEOUT", DEFAULT_TIMEOUT[1]),
+        ),
+        gzip_requests=st.secrets.get("BACKEND_GZIP_REQUESTS", False),
+    )
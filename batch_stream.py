@@ -0,0 +1,152 @@
+import io
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from backend_client import LONG_TIMEOUT
+from batch_transport import accept_header, decode_batch_response
+from ingestion import sniff_csv
+from perf import submit
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_WORKERS = 2
+MIN_CHUNK_ROWS = 1_000
+SAMPLE_ROWS = 1_000
+# Kolom prediksi dari /batch_score yang dibaca halaman ringkasan (dtype untuk hasil kosong)
+PREDICTION_COLUMNS = {"predicted_fraud": "int64", "predicted_fraud_type": "object"}
+
+
+# ============================
+# BACA FILE PER CHUNK
+# ============================
+def _is_parquet(name: str):
+    return name.lower().endswith(".parquet")
+
+
+def _read_csv(file, **kwargs):
+    # Encoding & delimiter hasil sniff yang sama dengan read_claims (mis. CSV ';'
+    # atau UTF-16 ekspor Excel); engine default karena pyarrow tidak mendukung chunksize
+    encoding, sep, _ = sniff_csv(file)
+    return pd.read_csv(file, sep=sep, encoding=encoding, **kwargs)
+
+
+def estimate_row_bytes(file, name: str):
+    # Perkiraan memori per baris dari sampel kecil di awal file
+    file.seek(0)
+    if _is_parquet(name):
+        sample = next(pq.ParquetFile(file).iter_batches(batch_size=SAMPLE_ROWS)).to_pandas()
+    else:
+        sample = _read_csv(file, nrows=SAMPLE_ROWS)
+    file.seek(0)
+    return max(int(sample.memory_usage(deep=True).sum() / max(len(sample), 1)), 1)
+
+
+def count_rows(file, name: str):
+    # Untuk progress bar; pada CSV dihitung dari jumlah baris teks (perkiraan)
+    file.seek(0)
+    if _is_parquet(name):
+        rows = pq.ParquetFile(file).metadata.num_rows
+    else:
+        rows = -1  # header
+        for block in iter(lambda: file.read(1 << 20), b""):
+            rows += block.count(b"\n")
+    file.seek(0)
+    return max(rows, 0)
+
+
+def chunk_rows_for_budget(file, name: str, max_memory_mb: float, workers: int = DEFAULT_WORKERS):
+    # Chunk yang sedang diproses = workers + 1 (satu sedang dibaca); tiap chunk juga
+    # diserialisasi untuk dikirim, jadi anggap dua kali ukuran DataFrame-nya
+    row_bytes = estimate_row_bytes(file, name)
+    rows = int(max_memory_mb * 1024 ** 2 / (2 * row_bytes * (workers + 1)))
+    return max(rows, MIN_CHUNK_ROWS)
+
+
+def iter_chunks(file, name: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    file.seek(0)
+    if _is_parquet(name):
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from _read_csv(file, chunksize=chunk_rows)
+
+
+def _serialize(chunk: pd.DataFrame, name: str):
+    buf = io.BytesIO()
+    if _is_parquet(name):
+        chunk.to_parquet(buf, index=False)
+    else:
+        chunk.to_csv(buf, index=False)
+    return buf.getvalue()
+
+
+# ============================
+# KIRIM CHUNK KE BACKEND
+# ============================
+def score_chunk(client, chunk: pd.DataFrame, name: str):
+    files = {"file": (name, _serialize(chunk, name))}
+    response = client.post(
+        "/batch_score", files=files, headers={"Accept": accept_header()}, timeout=LONG_TIMEOUT
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Backend gagal memproses chunk ({response.status_code})")
+    return decode_batch_response(response)["df"]
+
+
+def empty_predictions(columns=()):
+    # Hasil tanpa baris (file kosong / semua baris ditolak) tetap punya kolom prediksi
+    columns = [col for col in columns if col not in PREDICTION_COLUMNS]
+    df = pd.DataFrame(columns=columns)
+    for col, dtype in PREDICTION_COLUMNS.items():
+        df[col] = pd.Series(dtype=dtype)
+    return df
+
+
+def stream_batch_score(client, file, name: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                       workers: int = DEFAULT_WORKERS, on_chunk=None, prepare=None):
+    # Chunk dikirim paralel (maks. `workers` sekaligus, sisanya menunggu sehingga
+    # memori tetap terbatas). on_chunk(index, rows_done, predictions) dipanggil di
+    # thread pemanggil setiap satu chunk selesai, untuk update UI bertahap.
+    # prepare(chunk) -> chunk (opsional) dijalankan sebelum chunk dikirim, mis.
+    # validasi & fitur turunan; chunk yang hasilnya kosong tidak dikirim.
+    results = {}
+    rows_done = 0
+    columns = []
+    chunks = enumerate(iter_chunks(file, name, chunk_rows))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            for index, chunk in chunks:
+                if prepare is not None:
+                    chunk = prepare(chunk)
+                columns[:] = chunk.columns
+                if len(chunk):
+                    pending[submit(pool, score_chunk, client, chunk, name)] = index
+                    return True
+            return False
+
+        for _ in range(workers):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                predictions = future.result()
+                results[index] = predictions
+                rows_done += len(predictions)
+                if on_chunk is not None:
+                    on_chunk(index, rows_done, predictions)
+                submit_next()
+
+    if not results:
+        return empty_predictions(columns)
+    return pd.concat([results[i] for i in sorted(results)], ignore_index=True)
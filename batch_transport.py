@@ -0,0 +1,53 @@
+import base64
+import io
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow opsional: tanpa itu hanya jalur CSV lama yang dipakai
+    pa = None
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+PARQUET_MIME = "application/vnd.apache.parquet"
+JSON_MIME = "application/json"
+
+
+# ============================
+# NEGOSIASI FORMAT
+# ============================
+def accept_header():
+    # Backend baru memilih Arrow/Parquet; backend lama tetap membalas JSON
+    if pa is None:
+        return JSON_MIME
+    return f"{ARROW_MIME}, {PARQUET_MIME};q=0.9, {JSON_MIME};q=0.5"
+
+
+# ============================
+# DECODE RESPONSE
+# ============================
+def decode_batch_response(response):
+    # Hasil: dict berisi DataFrame prediksi dan bytes mentah (disimpan sekali
+    # untuk tombol download) beserta nama file & mime-nya
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+
+    if content_type == ARROW_MIME and pa is not None:
+        raw = response.content
+        # Baca langsung dari buffer bytes response, tanpa parsing teks
+        table = ipc.open_stream(pa.py_buffer(raw)).read_all()
+        return _result(table.to_pandas(), raw, "predictions.arrow", ARROW_MIME)
+
+    if content_type == PARQUET_MIME and pa is not None:
+        raw = response.content
+        table = pq.read_table(pa.BufferReader(pa.py_buffer(raw)))
+        return _result(table.to_pandas(), raw, "predictions.parquet", PARQUET_MIME)
+
+    # Fallback backend lama: CSV base64 di dalam JSON, di-decode sekali saja
+    raw = base64.b64decode(response.json()["predictions_csv_b64"])
+    return _result(pd.read_csv(io.BytesIO(raw)), raw, "predictions.csv", "text/csv")
+
+
+def _result(df: pd.DataFrame, raw: bytes, file_name: str, mime: str):
+    return {"df": df, "raw": raw, "file_name": file_name, "mime": mime}
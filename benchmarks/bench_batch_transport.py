@@ -0,0 +1,88 @@
+# Benchmark transport hasil /batch_score: JSON + CSV base64 (lama) vs Arrow IPC vs Parquet
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_batch_transport            # 1M baris
+#   python -m benchmarks.bench_batch_transport 100000
+import base64
+import io
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from batch_transport import ARROW_MIME, PARQUET_MIME, JSON_MIME, decode_batch_response
+
+FRAUD_TYPES = ["benign", "upcoding_diagnosis", "phantom_billing", "unbundling", "duplicate_claim"]
+
+
+class FakeResponse:
+    def __init__(self, content: bytes, content_type: str):
+        self.content = content
+        self.headers = {"Content-Type": content_type}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def make_predictions(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "claim_id": [f"CLM{i:08d}" for i in range(n_rows)],
+        "predicted_fraud": rng.integers(0, 2, n_rows),
+        "fraud_probability": rng.random(n_rows),
+        "predicted_fraud_type": rng.choice(FRAUD_TYPES, n_rows),
+    })
+
+
+def encode(df: pd.DataFrame):
+    # Payload seperti yang dikirim backend untuk tiap format
+    csv_b64 = base64.b64encode(df.to_csv(index=False).encode()).decode()
+    legacy = json.dumps({"predictions_csv_b64": csv_b64}).encode()
+
+    sink = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    arrow = sink.getvalue()
+
+    sink = io.BytesIO()
+    pq.write_table(table, sink)
+    parquet = sink.getvalue()
+
+    return {"json+csv_b64": (legacy, JSON_MIME), "arrow": (arrow, ARROW_MIME), "parquet": (parquet, PARQUET_MIME)}
+
+
+def decode_legacy_twice(payload: bytes):
+    # Jalur lama di Fraud_Detection.py: decode base64 dua kali (tabel + download)
+    csv_b64 = json.loads(payload)["predictions_csv_b64"]
+    df = pd.read_csv(io.BytesIO(base64.b64decode(csv_b64)))
+    base64.b64decode(csv_b64)
+    return df
+
+
+def main(n_rows: int):
+    df = make_predictions(n_rows)
+    payloads = encode(df)
+    print(f"{n_rows:,} baris")
+    print(f"{'format':>14} {'payload (MB)':>13} {'decode (s)':>11}")
+
+    legacy = payloads["json+csv_b64"][0]
+    start = time.perf_counter()
+    decode_legacy_twice(legacy)
+    print(f"{'legacy (2x)':>14} {len(legacy) / 1024 ** 2:>13.1f} {time.perf_counter() - start:>11.3f}")
+
+    for name, (payload, mime) in payloads.items():
+        start = time.perf_counter()
+        out = decode_batch_response(FakeResponse(payload, mime))
+        seconds = time.perf_counter() - start
+        assert len(out["df"]) == n_rows
+        print(f"{name:>14} {len(payload) / 1024 ** 2:>13.1f} {seconds:>11.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
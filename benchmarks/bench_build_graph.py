@@ -0,0 +1,77 @@
+# Benchmark build_claim_graph: versi iterrows lama vs bulk builder
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_build_graph            # 10k, 100k, 1M
+#   python -m benchmarks.bench_build_graph 10000 50000
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from network_analysis import build_claim_graph
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Di atas ukuran ini kedua graf tidak disimpan bersamaan (hemat RAM)
+MAX_COMPARE_ROWS = 100_000
+
+
+def build_claim_graph_iterrows(df: pd.DataFrame):
+    # Salinan implementasi lama (baseline)
+    G = nx.Graph()
+    for _, row in df.iterrows():
+        claim_id = row['claim_id']
+        participant = f"PTC_{row['participant_id']}"
+        faskes = f"FSK_{row['faskes_id']}"
+        dpjp = f"DR_{row['dpjp_id']}"
+        icd = f"ICD_{row['kode_icd10']}"
+        G.add_node(claim_id, type="claim", fraud=row['fraud_prediction'])
+        G.add_node(participant, type="participant")
+        G.add_node(faskes, type="faskes")
+        G.add_node(dpjp, type="dpjp")
+        G.add_node(icd, type="icd")
+        G.add_edge(faskes, dpjp, relation="doctor_in_charge")
+        G.add_edge(claim_id, participant, relation="filed_by")
+        G.add_edge(claim_id, dpjp, relation="attended_by")
+        G.add_edge(claim_id, icd, relation="diagnosis")
+    return G
+
+
+def make_claims(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "claim_id": [f"CLM{i:08d}" for i in range(n_rows)],
+        "participant_id": rng.integers(0, max(n_rows // 3, 1), n_rows),
+        "faskes_id": rng.integers(0, 200, n_rows),
+        "dpjp_id": rng.integers(0, 2_000, n_rows),
+        "kode_icd10": rng.choice(["A09", "E11", "I10", "J06", "K29", "N39"], n_rows),
+        "fraud_prediction": rng.integers(0, 2, n_rows),
+    })
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'iterrows (s)':>14} {'bulk (s)':>10} {'speedup':>9}  identical")
+    for n_rows in sizes:
+        df = make_claims(n_rows)
+        G_old, t_old = timed(build_claim_graph_iterrows, df)
+        if n_rows > MAX_COMPARE_ROWS:
+            del G_old
+        G_new, t_new = timed(build_claim_graph, df)
+        identical = "-"
+        if n_rows <= MAX_COMPARE_ROWS:
+            identical = (
+                list(G_old.nodes(data=True)) == list(G_new.nodes(data=True))
+                and nx.utils.edges_equal(G_old.edges(data=True), G_new.edges(data=True))
+            )
+        print(f"{n_rows:>10,} {t_old:>14.3f} {t_new:>10.3f} {t_old / t_new:>8.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,38 @@
+# Benchmark memori & waktu build: graf networkx (dict-of-dicts) vs CompactClaimGraph
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_compact_graph            # 10k, 100k, 1M
+#   python -m benchmarks.bench_compact_graph 10000 50000
+import gc
+import sys
+import tracemalloc
+
+from network_analysis import build_claim_graph
+from benchmarks.bench_build_graph import DEFAULT_SIZES, make_claims, timed
+
+
+def retained_mb(fn, *args):
+    # Memori yang masih dipegang objek hasil build (bukan puncak sementara)
+    gc.collect()
+    tracemalloc.start()
+    out = fn(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del out
+    gc.collect()
+    return current / 1024 ** 2
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'backend':>9} {'build (s)':>10} {'memory (MB)':>12}")
+    for n_rows in sizes:
+        df = make_claims(n_rows)
+        for backend in ["networkx", "compact"]:
+            G, seconds = timed(build_claim_graph, df, backend)
+            del G
+            memory = retained_mb(build_claim_graph, df, backend)
+            print(f"{n_rows:>10,} {backend:>9} {seconds:>10.3f} {memory:>12.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,58 @@
+# Benchmark fitur graf per klaim: loop networkx per klaim vs claim_graph_features
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_graph_features            # 10k, 100k, 1M
+#   python -m benchmarks.bench_graph_features 10000 50000
+import sys
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from benchmarks.bench_build_graph import make_claims, timed
+from network_analysis import build_claim_graph, claim_graph_features
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Loop per klaim hanya dijalankan sampai ukuran ini
+MAX_LOOP_ROWS = 100_000
+
+
+def graph_features_loop(df: pd.DataFrame):
+    # Baseline: bangun graf networkx lalu hitung fitur klaim satu per satu
+    G = build_claim_graph(df)
+    component_size = {}
+    for nodes in nx.connected_components(G):
+        for node in nodes:
+            component_size[node] = len(nodes)
+
+    rows = []
+    for claim_id, participant_id, dpjp_id in zip(df["claim_id"], df["participant_id"], df["dpjp_id"]):
+        participant = f"PTC_{participant_id}"
+        dpjp = f"DR_{dpjp_id}"
+        claims = list(G[participant])
+        others = [G.nodes[c]["fraud"] for c in claims if c != claim_id]
+        rows.append({
+            "graph_participant_degree": G.degree(participant),
+            "graph_participant_distinct_dpjp": len({n for c in claims for n in G[c] if n.startswith("DR_")}),
+            "graph_dpjp_degree": G.degree(dpjp),
+            "graph_participant_fraud_share": sum(others) / len(others) if others else 0.0,
+            "graph_component_size": component_size[claim_id],
+        })
+    return pd.DataFrame(rows, index=df.index)
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'loop (s)':>9} {'bulk (s)':>9} {'speedup':>8}  identical")
+    for n_rows in sizes:
+        df = make_claims(n_rows)
+        bulk, t_bulk = timed(claim_graph_features, df)
+        if n_rows > MAX_LOOP_ROWS:
+            print(f"{n_rows:>10,} {'-':>9} {t_bulk:>9.3f} {'-':>8}  -")
+            continue
+        loop, t_loop = timed(graph_features_loop, df)
+        identical = np.allclose(bulk[loop.columns].to_numpy(dtype=float), loop.to_numpy(dtype=float))
+        print(f"{n_rows:>10,} {t_loop:>9.3f} {t_bulk:>9.3f} {t_loop / t_bulk:>7.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
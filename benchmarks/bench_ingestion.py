@@ -0,0 +1,110 @@
+# Benchmark ingestion CSV klaim: pd.read_csv default, safe_read_csv lama (engine
+# python, coba-coba delimiter), read_claims (sniff + pyarrow + categorical) dan Parquet
+#
+# Tiap varian jalan di subprocess sendiri supaya puncak RSS (ru_maxrss) tidak
+# tercampur; tracemalloc tidak melihat alokasi buffer arrow. Puncak RSS sudah
+# termasuk interpreter + import pandas/pyarrow (~sama untuk semua varian).
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_ingestion            # 10k, 100k, 1M
+#   python -m benchmarks.bench_ingestion 10000 50000
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_build_graph import make_claims
+from ingestion import read_claims
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+VARIANTS = ["read_csv", "safe_read_csv", "read_claims_csv", "read_claims_parquet"]
+
+
+def safe_read_csv(file):
+    # Salinan implementasi lama (baseline)
+    for sep in [",", ";", "\t", "|"]:
+        try:
+            df = pd.read_csv(file, sep=sep, engine="python", encoding="utf-8")
+            if len(df.columns) > 1:
+                return df
+        except:
+            pass
+
+    for enc in ["latin-1", "utf-16", "ISO-8859-1"]:
+        try:
+            df = pd.read_csv(file, sep=",", engine="python", encoding=enc)
+            if len(df.columns) > 1:
+                return df
+        except:
+            pass
+
+    return None
+
+
+def make_upload(n_rows: int, seed: int = 0):
+    # Kolom klaim + kolom nominal seperti form Fraud Detection
+    rng = np.random.default_rng(seed)
+    df = make_claims(n_rows, seed)
+    df["billed_amount"] = rng.integers(100_000, 50_000_000, n_rows)
+    df["paid_amount"] = (df["billed_amount"] * rng.uniform(0.5, 1.0, n_rows)).round()
+    df["lama_dirawat"] = rng.integers(0, 30, n_rows)
+    return df
+
+
+# ============================
+# SATU VARIAN (DI SUBPROCESS)
+# ============================
+def run_variant(variant: str, path: str):
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        if variant == "read_csv":
+            df = pd.read_csv(f)
+        elif variant == "safe_read_csv":
+            df = safe_read_csv(f)
+        else:
+            df = read_claims(f, path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB di Linux
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_mb": peak / 1024,
+        "df_mb": df.memory_usage(deep=True).sum() / 1024 ** 2,
+    }))
+
+
+def measure(variant: str, path: str):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_ingestion", "--variant", variant, path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'variant':>20} {'time (s)':>9} {'peak RSS (MB)':>14} {'df (MB)':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            df = make_upload(n_rows)
+            csv_path = os.path.join(tmp, f"claims_{n_rows}.csv")
+            parquet_path = os.path.join(tmp, f"claims_{n_rows}.parquet")
+            df.to_csv(csv_path, index=False)
+            df.to_parquet(parquet_path, index=False)
+            del df
+
+            for variant in VARIANTS:
+                path = parquet_path if variant == "read_claims_parquet" else csv_path
+                r = measure(variant, path)
+                print(f"{n_rows:>10,} {variant:>20} {r['seconds']:>9.3f} {r['peak_mb']:>14.1f} {r['df_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--variant"]:
+        run_variant(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,66 @@
+# Benchmark skor risiko semua faskes: calculate_graph_risk_batch (satu proses) vs
+# calculate_graph_risk_parallel (betweenness dibagi per sumber BFS ke beberapa proses)
+# dengan jumlah worker bertambah. Cache centrality & komunitas dikosongkan sebelum
+# tiap pengukuran.
+#
+# Data sintetis apa adanya (tanpa prefix id per klaster): ICD & peserta dipakai
+# lintas faskes sehingga graf umumnya satu komponen raksasa, seperti data asli.
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_parallel_risk                   # 20k klaim, approx
+#   python -m benchmarks.bench_parallel_risk 5000 exact
+import os
+import sys
+
+import networkx as nx
+import numpy as np
+
+from benchmarks.bench_build_graph import timed
+from benchmarks.synthetic_claims import make_synthetic_claims
+from network_analysis import (
+    build_claim_graph,
+    calculate_graph_risk_batch,
+    calculate_graph_risk_parallel,
+    clear_centrality_cache,
+    clear_community_cache,
+)
+
+DEFAULT_ROWS = 20_000
+DEFAULT_CENTRALITY = "approx"
+COMMUNITY = "louvain"
+
+
+def uncached(fn):
+    clear_centrality_cache()
+    clear_community_cache()
+    return timed(fn)
+
+
+def main(n_rows: int, centrality: str):
+    df = make_synthetic_claims(n_rows)
+    G = build_claim_graph(df)
+    print(
+        f"{len(df):,} klaim, {G.number_of_nodes():,} node, "
+        f"{nx.number_connected_components(G)} komponen, {os.cpu_count()} CPU, centrality={centrality}\n"
+    )
+
+    serial, t_serial = uncached(lambda: calculate_graph_risk_batch(G, centrality=centrality, community=COMMUNITY))
+    serial = serial.set_index("faskes_id").sort_index()
+    print(f"{'mode':>28} {'workers':>8} {'time (s)':>9} {'speedup':>8}  identical")
+    print(f"{'batch (satu proses)':>28} {1:>8} {t_serial:>9.2f} {1:>7.1f}x  -")
+
+    counts = sorted({2, 4, os.cpu_count() or 1} - {1})
+    for workers in counts:
+        parallel, t = uncached(lambda: calculate_graph_risk_parallel(
+            G, centrality=centrality, community=COMMUNITY, workers=workers
+        ))
+        parallel = parallel.set_index("faskes_id").sort_index()
+        identical = np.allclose(serial["betweenness"], parallel["betweenness"]) and (
+            serial["final_risk"] == parallel["final_risk"]
+        ).all()
+        print(f"{'parallel per sumber BFS':>28} {workers:>8} {t:>9.2f} {t_serial / t:>7.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    main(n_rows, sys.argv[2] if len(sys.argv) > 2 else DEFAULT_CENTRALITY)
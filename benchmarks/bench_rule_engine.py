@@ -0,0 +1,54 @@
+# Benchmark rule engine pre-screening: waktu per klaim & porsi request yang dihindari
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_rule_engine            # 1k, 100k, 1M
+#   python -m benchmarks.bench_rule_engine 50000
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from claim_features import compute_features
+from rule_engine import screen_claims, traffic_stats
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def make_features(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "billed_amount": rng.integers(100_000, 5_000_000, n_rows),
+        "paid_amount": rng.integers(100_000, 5_000_000, n_rows),
+        "tarif_inacbg": rng.integers(100_000, 5_000_000, n_rows),
+        "drug_cost": rng.integers(0, 1_000_000, n_rows),
+        "procedure_cost": rng.integers(0, 1_000_000, n_rows),
+        "rolling_avg_cost_30d": rng.integers(100_000, 3_000_000, n_rows),
+        "visit_count_30d": rng.integers(0, 10, n_rows),
+        "nik_hash_reuse_count": rng.integers(0, 4, n_rows),
+        "referral_flag": rng.random(n_rows) < 0.3,
+        "referral_to_same_facility": rng.random(n_rows) < 0.3,
+        "clinical_pathway_deviation_score": rng.random(n_rows),
+        "claim_month": rng.integers(1, 13, n_rows),
+    })
+    return compute_features(df)
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'total (s)':>10} {'us/claim':>9} {'GREEN':>8} {'AMBER':>8} {'RED':>8} {'avoided':>8}")
+    for n_rows in sizes:
+        df = make_features(n_rows)
+        start = time.perf_counter()
+        screening = screen_claims(df)
+        elapsed = time.perf_counter() - start
+        counts = screening["label"].value_counts()
+        stats = traffic_stats(screening)
+        print(
+            f"{n_rows:>10,} {elapsed:>10.3f} {elapsed / n_rows * 1e6:>9.2f} "
+            f"{counts.get('GREEN', 0):>8,} {counts.get('AMBER', 0):>8,} {counts.get('RED', 0):>8,} "
+            f"{stats['avoided_share']:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
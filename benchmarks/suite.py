@@ -0,0 +1,186 @@
+# Suite benchmark dengan hasil JSON, untuk membandingkan performa antar versi.
+# Semua kasus memakai data dari benchmarks.synthetic_claims (seed tetap).
+#
+# Jalankan dari root repo:
+#   python -m benchmarks.suite                                  # 10k, 100k, 1M
+#   python -m benchmarks.suite --sizes 10000 100000 --cases build_graph ego_graph
+#   python -m benchmarks.suite --compare benchmarks/results/<versi-lama>.json
+#
+# Hasil disimpan di benchmarks/results/<waktu UTC>_<commit>.json (atau --output).
+# Commit diberi akhiran "-dirty" bila working tree berisi perubahan yang belum
+# di-commit, termasuk file baru; hasil seperti itu jangan ikut di-commit.
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from batch_transport import decode_batch_response
+from benchmarks.bench_batch_transport import FakeResponse, encode
+from benchmarks.synthetic_claims import make_synthetic_claims
+from graph_render import graph_page_html, render_graph_body, render_summary_body
+from ingestion import read_claims
+from network_analysis import NeighbourhoodIndex, build_claim_graph, calculate_graph_risk, summarize_graph
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# Kasus yang dijalankan ulang lebih sedikit pada data besar (total waktu tetap wajar)
+REPEATS = {10_000: 5, 100_000: 3, 1_000_000: 1}
+EGO_RADIUS = 2
+EGO_MAX_NODES = 2000
+# Rasio median baru / lama di atas batas ini ditandai sebagai regresi
+REGRESSION_RATIO = 1.2
+
+
+# ============================
+# KASUS BENCHMARK
+# ============================
+def _top_faskes(df: pd.DataFrame):
+    return df["faskes_id"].value_counts().index[0]
+
+
+def _predictions(df: pd.DataFrame):
+    return pd.DataFrame({
+        "claim_id": df["claim_id"],
+        "predicted_fraud": df["fraud_prediction"],
+        "fraud_probability": df["clinical_pathway_deviation_score"],
+        "predicted_fraud_type": df["fraud_type"],
+    })
+
+
+def setup_cases(df: pd.DataFrame):
+    # Hasil: {nama: fungsi tanpa argumen}. Persiapan (graf, payload) tidak ikut diukur.
+    faskes = _top_faskes(df)
+    faskes_df = df[df["faskes_id"] == faskes]
+    G_faskes = build_claim_graph(faskes_df)
+    center = faskes_df["claim_id"].iloc[0]
+    index = NeighbourhoodIndex(G_faskes)
+    ego, _ = index.ego_graph(center, EGO_RADIUS, EGO_MAX_NODES)
+    summary, _ = summarize_graph(G_faskes, by="community")
+
+    csv_bytes = df.to_csv(index=False).encode()
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    parquet_bytes = buf.getvalue()
+
+    payloads = encode(_predictions(df))
+    legacy = FakeResponse(*payloads["json+csv_b64"])
+    arrow = FakeResponse(*payloads["arrow"])
+
+    return {
+        "build_graph": lambda: build_claim_graph(df),
+        "build_graph_compact": lambda: build_claim_graph(df, backend="compact"),
+        # Seperti halaman Network Analytics: risiko dihitung di graf satu faskes
+        "calculate_graph_risk": lambda: calculate_graph_risk(
+            build_claim_graph(faskes_df), faskes, centrality="approx", community="louvain"
+        ),
+        "ego_graph": lambda: NeighbourhoodIndex(G_faskes).ego_graph(center, EGO_RADIUS, EGO_MAX_NODES),
+        # HTML lengkap seperti yang dikirim halaman: body graf + template bersama
+        "render_html": lambda: graph_page_html(render_graph_body(ego)),
+        "summarize_graph": lambda: summarize_graph(G_faskes, by="type"),
+        "render_summary_html": lambda: graph_page_html(render_summary_body(summary)),
+        "read_csv": lambda: read_claims(io.BytesIO(csv_bytes), "claims.csv"),
+        "read_parquet": lambda: read_claims(io.BytesIO(parquet_bytes), "claims.parquet"),
+        "decode_base64_csv": lambda: decode_batch_response(legacy),
+        "decode_arrow": lambda: decode_batch_response(arrow),
+    }
+
+
+CASES = [
+    "build_graph", "build_graph_compact", "calculate_graph_risk", "ego_graph", "render_html",
+    "summarize_graph", "render_summary_html",
+    "read_csv", "read_parquet", "decode_base64_csv", "decode_arrow",
+]
+
+
+def measure(fn, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times), "repeats": repeats}
+
+
+# ============================
+# METADATA & PERBANDINGAN
+# ============================
+def git_version():
+    # git describe --dirty mengabaikan file untracked, padahal kode baru yang
+    # belum di-commit juga membuat hasil tidak mewakili commit tersebut
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+
+    try:
+        version = git("describe", "--always")
+        return f"{version}-dirty" if git("status", "--porcelain") else version
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str):
+    baseline = {(r["case"], r["rows"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\nvs {baseline_path}")
+    print(f"{'case':>22} {'rows':>10} {'old (s)':>9} {'new (s)':>9} {'ratio':>7}")
+    for r in results:
+        old = baseline.get((r["case"], r["rows"]))
+        if old is None:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        flag = "  REGRESI" if ratio > REGRESSION_RATIO else ""
+        print(f"{r['case']:>22} {r['rows']:>10,} {old['median_s']:>9.3f} {r['median_s']:>9.3f} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite benchmark dengan hasil JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="file JSON hasil versi sebelumnya")
+    args = parser.parse_args()
+
+    version = git_version()
+    started_at = datetime.now(timezone.utc)
+    results = []
+    print(f"{'case':>22} {'rows':>10} {'min (s)':>9} {'median (s)':>11} {'repeats':>8}")
+    for n_rows in args.sizes:
+        df = make_synthetic_claims(n_rows, seed=args.seed)
+        cases = setup_cases(df)
+        for name in args.cases:
+            r = {"case": name, "rows": n_rows, **measure(cases[name], REPEATS.get(n_rows, 1))}
+            results.append(r)
+            print(f"{name:>22} {n_rows:>10,} {r['min_s']:>9.3f} {r['median_s']:>11.3f} {r['repeats']:>8}")
+        del df, cases
+
+    report = {
+        "version": version,
+        "timestamp": started_at.isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "packages": {name: __import__(name).__version__ for name in ["pandas", "numpy", "networkx", "pyarrow", "pyvis"]},
+        "seed": args.seed,
+        "results": results,
+    }
+    default_name = f"{started_at:%Y%m%dT%H%M%SZ}_{version}.json"
+    output = Path(args.output) if args.output else RESULTS_DIR / default_name
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nHasil: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Generator klaim sintetis: semua kolom form Single Claim Checker + kolom graf
+# (claim_id, participant_id, faskes_id, dpjp_id, kode_icd10, fraud_prediction),
+# dengan fraud ring yang bisa diatur (sekelompok partisipan, sedikit DPJP di satu
+# faskes, tagihan digelembungkan, prediksi fraud).
+#
+# Contoh:
+#   python -m benchmarks.synthetic_claims 100000 claims.parquet --rings 20 --ring-size 15
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from claim_features import compute_features
+
+REGIONS_FILE = Path(__file__).resolve().parent.parent / "data" / "regions.json"
+
+ICD_CODES = [
+    "A09", "E11", "I10", "J06", "K29", "N39", "J18", "I63", "I21", "K35",
+    "O80", "Z34", "R50", "A01", "B34", "E78", "J44", "M54", "N18", "C50",
+]
+PROCEDURE_CODES = ["", "89.52", "99.04", "87.44", "45.13", "88.76", "36.06", "47.09"]
+SEX = ["M", "F"]
+FASKES_LEVELS = ["FKTP", "FKRTL"]
+SERVICE_TYPES = ["Rawat Jalan", "Rawat Inap"]
+ROOM_CLASSES = ["Kelas 1", "Kelas 2", "Kelas 3", "VIP"]
+FRAUD_TYPES = ["upcoding_diagnosis", "phantom_billing", "unbundling", "duplicate_claim"]
+
+DEFAULT_FRAUD_RATE = 0.03
+DEFAULT_RINGS = 10
+DEFAULT_RING_SIZE = 12
+RING_CLAIMS_PER_MEMBER = 6
+
+
+def _provinces():
+    return [p["name"] for p in json.loads(REGIONS_FILE.read_text(encoding="utf-8"))["provinces"]]
+
+
+def make_synthetic_claims(n_rows: int, seed: int = 0, n_faskes: int = None,
+                          fraud_rate: float = DEFAULT_FRAUD_RATE,
+                          n_rings: int = DEFAULT_RINGS, ring_size: int = DEFAULT_RING_SIZE):
+    # Semua kolom dibangkitkan vektorisasi; hasil deterministik untuk seed yang sama
+    rng = np.random.default_rng(seed)
+    n_faskes = n_faskes or max(20, n_rows // 5_000)
+    n_dpjp = n_faskes * 10
+    n_participants = max(n_rows // 3, 1)
+
+    # Struktur dasar: tiap DPJP punya faskes asal, 90% klaim di faskes asal DPJP
+    dpjp_home = rng.integers(0, n_faskes, n_dpjp)
+    dpjp = rng.integers(0, n_dpjp, n_rows)
+    faskes = np.where(rng.random(n_rows) < 0.9, dpjp_home[dpjp], rng.integers(0, n_faskes, n_rows))
+    participant = rng.integers(0, n_participants, n_rows)
+    icd_weights = 1 / np.arange(1, len(ICD_CODES) + 1)  # distribusi Zipf
+    icd = rng.choice(len(ICD_CODES), n_rows, p=icd_weights / icd_weights.sum())
+
+    tarif_by_icd = rng.integers(150_000, 15_000_000, len(ICD_CODES))
+    tarif = tarif_by_icd[icd]
+    billed = np.round(tarif * rng.lognormal(0, 0.25, n_rows), -3)
+    fraud = rng.random(n_rows) < fraud_rate
+
+    # Fraud ring: anggota ring mengisi blok baris terakhir dengan DPJP/faskes/ICD yang sama
+    ring = np.full(n_rows, -1)
+    ring_rows = min(n_rings * ring_size * RING_CLAIMS_PER_MEMBER, n_rows // 2)
+    if n_rings and ring_rows:
+        rows = np.arange(n_rows - ring_rows, n_rows)
+        ring[rows] = rng.integers(0, n_rings, ring_rows)
+        members = rng.integers(0, n_participants, (n_rings, ring_size))
+        ring_dpjp = rng.integers(0, n_dpjp, (n_rings, 2))
+        ring_icd = rng.integers(0, len(ICD_CODES), (n_rings, 2))
+        r = ring[rows]
+        pick = rng.integers(0, 2, ring_rows)
+        participant[rows] = members[r, rng.integers(0, ring_size, ring_rows)]
+        dpjp[rows] = ring_dpjp[r, pick]
+        faskes[rows] = dpjp_home[dpjp[rows]]
+        icd[rows] = ring_icd[r, pick]
+        tarif[rows] = tarif_by_icd[icd[rows]]
+        billed[rows] = np.round(tarif[rows] * rng.uniform(1.5, 3.0, ring_rows), -3)
+        fraud[rows] = rng.random(ring_rows) < 0.85
+
+    paid = np.minimum(billed, np.round(tarif * rng.uniform(0.8, 1.0, n_rows), -3))
+    inpatient = rng.random(n_rows) < 0.3
+    service_date = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 366, n_rows), unit="D")
+    nik_reuse = np.bincount(participant, minlength=n_participants)[participant]
+
+    fraud_type = np.full(n_rows, "benign", dtype=object)
+    fraud_type[fraud] = np.array(FRAUD_TYPES, dtype=object)[rng.integers(0, len(FRAUD_TYPES), fraud.sum())]
+    fraud_type[(ring >= 0) & fraud] = "collusion_ring"
+
+    provinces = np.array(_provinces(), dtype=object)
+    faskes_province = rng.integers(0, len(provinces), n_faskes)
+
+    df = pd.DataFrame({
+        "claim_id": np.char.add("CLM", np.char.zfill(np.arange(n_rows).astype(str), 9)),
+        "episode_id": np.char.add("EPS", np.char.zfill(rng.integers(0, n_rows, n_rows).astype(str), 9)),
+        "participant_id": participant,
+        "nik_hash": np.char.add("NIK", participant.astype(str)),
+        "faskes_id": faskes,
+        "dpjp_id": dpjp,
+        "nik_hash_reuse_count": nik_reuse,
+        "age": rng.integers(0, 90, n_rows),
+        "sex": np.array(SEX, dtype=object)[rng.integers(0, 2, n_rows)],
+        "provinsi": provinces[faskes_province[faskes]],
+        "kabupaten": "",
+        "faskes_level": np.array(FASKES_LEVELS, dtype=object)[(faskes % 3 == 0).astype(int)],
+        "tgl_pelayanan": service_date,
+        "kode_icd10": np.array(ICD_CODES, dtype=object)[icd],
+        "kode_prosedur": np.array(PROCEDURE_CODES, dtype=object)[rng.integers(0, len(PROCEDURE_CODES), n_rows)],
+        "jenis_pelayanan": np.where(inpatient, SERVICE_TYPES[1], SERVICE_TYPES[0]),
+        "room_class": np.where(inpatient, np.array(ROOM_CLASSES, dtype=object)[rng.integers(0, 4, n_rows)], ""),
+        "lama_dirawat": np.where(inpatient, rng.integers(1, 15, n_rows), 0),
+        "time_diff_prev_claim": rng.integers(0, 180, n_rows),
+        "billed_amount": billed,
+        "paid_amount": paid,
+        "drug_cost": np.round(billed * rng.uniform(0.05, 0.5, n_rows), -3),
+        "procedure_cost": np.round(billed * rng.uniform(0.0, 0.4, n_rows), -3),
+        "tarif_inacbg": tarif,
+        "rolling_avg_cost_30d": np.round(tarif * rng.uniform(0.7, 1.3, n_rows), -3),
+        "provider_monthly_claims": rng.integers(50, 5_000, n_rows),
+        "claim_month": service_date.month,
+        "clinical_pathway_deviation_score": np.round(rng.beta(2, 8, n_rows), 2),
+        "visit_count_30d": rng.poisson(1.5, n_rows),
+        "kapitasi_flag": faskes % 3 != 0,
+        "referral_flag": rng.random(n_rows) < 0.3,
+        "referral_to_same_facility": rng.random(n_rows) < 0.05,
+        "provider_claim_share": np.round(rng.uniform(0, 0.2, n_rows), 3),
+        "fraud_prediction": fraud.astype(np.int64),
+        "fraud_type": fraud_type,
+    })
+    # Ring & fraud acak tersebar ke seluruh file, bukan menumpuk di akhir
+    df = df.sample(frac=1, random_state=seed, ignore_index=True)
+    df["claim_id"] = df["claim_id"].sort_values(ignore_index=True)
+    return compute_features(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangkitkan data klaim sintetis")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", help="file .csv atau .parquet")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--faskes", type=int, default=None)
+    parser.add_argument("--fraud-rate", type=float, default=DEFAULT_FRAUD_RATE)
+    parser.add_argument("--rings", type=int, default=DEFAULT_RINGS)
+    parser.add_argument("--ring-size", type=int, default=DEFAULT_RING_SIZE)
+    args = parser.parse_args()
+
+    df = make_synthetic_claims(args.rows, args.seed, args.faskes, args.fraud_rate, args.rings, args.ring_size)
+    if args.output.lower().endswith(".parquet"):
+        df.to_parquet(args.output, index=False)
+    else:
+        df.to_csv(args.output, index=False)
+    print(f"{len(df):,} klaim -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
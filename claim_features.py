@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from perf import traced
+
+# Kolom wajib ada (schema) dan tidak boleh kosong di tiap baris
+REQUIRED_COLUMNS = [
+    "claim_id", "participant_id", "faskes_id", "dpjp_id", "kode_icd10",
+    "tgl_pelayanan", "billed_amount", "paid_amount",
+]
+
+# Rentang nilai numerik (None = tanpa batas); hanya dicek bila kolomnya ada
+NUMERIC_RANGES = {
+    "age": (0, 120),
+    "nik_hash_reuse_count": (0, None),
+    "lama_dirawat": (0, 365),
+    "time_diff_prev_claim": (0, None),
+    "claim_month": (1, 12),
+    "billed_amount": (0, None),
+    "paid_amount": (0, None),
+    "tarif_inacbg": (0, None),
+    "drug_cost": (0, None),
+    "procedure_cost": (0, None),
+    "rolling_avg_cost_30d": (0, None),
+    "provider_monthly_claims": (0, None),
+    "visit_count_30d": (0, None),
+    "clinical_pathway_deviation_score": (0, 1),
+    "provider_claim_share": (0, 1),
+}
+
+# Nilai kategori yang dikenali; kosong dianggap tidak diisi (bukan error)
+CATEGORY_VALUES = {
+    "sex": {"M", "F"},
+    "faskes_level": {"FKTP", "FKRTL"},
+    "jenis_pelayanan": {"Rawat Jalan", "Rawat Inap"},
+    "room_class": {"Kelas 1", "Kelas 2", "Kelas 3", "VIP"},
+}
+
+DATE_COLUMNS = ["tgl_pelayanan"]
+
+
+# ============================
+# KONVERSI TIPE
+# ============================
+def _blank(series: pd.Series):
+    return series.isna() | series.astype(str).str.strip().eq("")
+
+
+def coerce_types(df: pd.DataFrame):
+    # Kolom numerik & tanggal dikonversi in-place; nilai yang gagal dikonversi jadi NaN
+    # dan dicatat di mask "invalid" (per kolom) untuk validasi
+    invalid = {}
+    for col in NUMERIC_RANGES:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            converted = pd.to_numeric(df[col], errors="coerce")
+            invalid[col] = converted.isna() & ~_blank(df[col])
+            df[col] = converted
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            converted = pd.to_datetime(df[col], errors="coerce")
+            invalid[col] = converted.isna() & ~_blank(df[col])
+            df[col] = converted
+    return invalid
+
+
+# ============================
+# FITUR TURUNAN
+# ============================
+def _safe_ratio(numerator: pd.Series, denominator: pd.Series):
+    # Sama seperti versi skalar lama: pembagi 0 -> rasio 0
+    num = numerator.to_numpy(dtype=float)
+    den = denominator.to_numpy(dtype=float)
+    out = np.zeros(len(num))
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def compute_features(df: pd.DataFrame):
+    # Hitung fitur turunan in-place untuk seluruh baris sekaligus;
+    # fitur hanya dihitung bila kolom sumbernya ada
+    cols = df.columns
+    if "billed_amount" in cols and "paid_amount" in cols:
+        df["selisih_klaim"] = df["billed_amount"] - df["paid_amount"]
+        df["claim_ratio"] = _safe_ratio(df["billed_amount"], df["paid_amount"])
+    if "billed_amount" in cols and "drug_cost" in cols:
+        df["drug_ratio"] = _safe_ratio(df["drug_cost"], df["billed_amount"])
+    if "billed_amount" in cols and "procedure_cost" in cols:
+        df["procedure_ratio"] = _safe_ratio(df["procedure_cost"], df["billed_amount"])
+
+    # Bulan klaim dari tanggal pelayanan bila tidak diisi
+    if "tgl_pelayanan" in cols and pd.api.types.is_datetime64_any_dtype(df["tgl_pelayanan"]):
+        month = df["tgl_pelayanan"].dt.month.astype("Int64")
+        df["claim_month"] = df["claim_month"].fillna(month) if "claim_month" in cols else month
+    if "claim_month" in df.columns:
+        df["claim_quarter"] = (df["claim_month"] - 1) // 3 + 1
+    return df
+
+
+# ============================
+# VALIDASI
+# ============================
+def missing_columns(df: pd.DataFrame):
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+
+def validate_claims(df: pd.DataFrame, invalid: dict = None):
+    # Hasil: Series pesan error per baris ("" = valid). Tiap aturan dicek
+    # vektorisasi atas seluruh kolom, bukan per baris.
+    errors = pd.Series("", index=df.index, dtype=object)
+
+    def flag(mask, message):
+        # Mask nullable (Int64/boolean) bisa berisi NA: NA dianggap tidak melanggar
+        mask = pd.Series(mask, index=df.index).fillna(False).to_numpy(dtype=bool)
+        if mask.any():
+            errors[mask] = errors[mask] + message + "; "
+
+    for col, mask in (invalid or {}).items():
+        flag(mask, f"{col} bukan {'tanggal' if col in DATE_COLUMNS else 'angka'}")
+
+    for col in REQUIRED_COLUMNS:
+        if col in df.columns:
+            flag(_blank(df[col]), f"{col} kosong")
+
+    # Bulan klaim wajib ada: dari kolomnya sendiri atau turunan tgl_pelayanan
+    if "claim_month" in df.columns:
+        flag(df["claim_month"].isna(), "claim_month kosong")
+
+    for col, (low, high) in NUMERIC_RANGES.items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if low is not None:
+            flag(values < low, f"{col} < {low}")
+        if high is not None:
+            flag(values > high, f"{col} > {high}")
+
+    for col, allowed in CATEGORY_VALUES.items():
+        if col in df.columns:
+            values = df[col]
+            flag(~_blank(values) & ~values.isin(allowed), f"{col} tidak dikenal")
+
+    return errors.str.rstrip("; ")
+
+
+@traced("prepare_claims")
+def prepare_claims(df: pd.DataFrame):
+    # Konversi tipe, hitung fitur, validasi. Hasil: (baris valid, baris ditolak
+    # + kolom "errors"). ValueError bila kolom wajib tidak ada sama sekali.
+    missing = missing_columns(df)
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    invalid = coerce_types(df)
+    compute_features(df)
+    errors = validate_claims(df, invalid)
+    bad = errors.ne("").to_numpy()
+    return df[~bad], df[bad].assign(errors=errors[bad])
+
+
+# ============================
+# PAYLOAD JSON
+# ============================
+def to_payloads(df: pd.DataFrame):
+    # Baris -> dict siap json: tanggal jadi ISO, NaN jadi None, tipe numpy jadi native
+    out = df.copy()
+    for col in DATE_COLUMNS:
+        if col in out.columns and pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime("%Y-%m-%d")
+    out = out.astype(object).where(out.notna(), None)
+    return [
+        {key: value.item() if isinstance(value, np.generic) else value for key, value in record.items()}
+        for record in out.to_dict("records")
+    ]
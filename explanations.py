@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+# ============================
+# AMBIL SATU HALAMAN DARI BACKEND
+# ============================
+def fetch_page(client, url: str, offset: int, limit: int, claim_query: str = "",
+               prediction=None, min_confidence: float = 0.0):
+    # Backend yang mendukung paging membalas {"items": [...], "total": N};
+    # backend lama mengabaikan parameter dan membalas seluruh list penjelasan.
+    params = {"offset": offset, "limit": limit}
+    if claim_query:
+        params["claim_id"] = claim_query
+    if prediction is not None:
+        params["prediction"] = prediction
+    if min_confidence:
+        params["min_confidence"] = min_confidence
+
+    response = client.get(url, params=params)
+    response.raise_for_status()
+    data = response.json()
+    if isinstance(data, dict) and "items" in data:
+        return {"paged": True, "items": data["items"], "total": data.get("total", len(data["items"]))}
+    return {"paged": False, "items": data, "total": len(data)}
+
+
+# ============================
+# FALLBACK: PAGING DI SISI CLIENT
+# ============================
+class ExplanationIndex:
+    # Index kolom (claim_id, prediction, confidence) untuk filter vektorisasi
+    # atas list penjelasan lengkap; hanya item di halaman aktif yang dirender.
+
+    def __init__(self, items: list):
+        self.items = items
+        self.frame = pd.DataFrame({
+            "claim_id": [str(item["claim_id"]) for item in items],
+            "prediction": [item["prediction"] for item in items],
+            "confidence": np.array([item["confidence"] for item in items], dtype=float),
+        })
+
+    def labels(self):
+        return sorted(self.frame["prediction"].dropna().unique().tolist(), key=str)
+
+    def query(self, claim_query: str = "", prediction=None, min_confidence: float = 0.0):
+        mask = np.ones(len(self.frame), dtype=bool)
+        if claim_query:
+            mask &= self.frame["claim_id"].str.contains(claim_query, case=False, regex=False).to_numpy()
+        if prediction is not None:
+            mask &= (self.frame["prediction"] == prediction).to_numpy()
+        if min_confidence:
+            mask &= self.frame["confidence"].to_numpy() >= min_confidence
+        return np.flatnonzero(mask)
+
+    def page(self, offset: int, limit: int, **filters):
+        positions = self.query(**filters)
+        return {
+            "paged": False,
+            "items": [self.items[i] for i in positions[offset:offset + limit]],
+            "total": len(positions),
+        }
@@ -0,0 +1,141 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import networkx as nx
+
+from network_analysis import ClaimGraph, CompactClaimGraph
+from perf import traced
+
+# Perkiraan memori graf networkx (diukur dengan tracemalloc pada data klaim)
+NX_BYTES_PER_NODE = 500
+NX_BYTES_PER_EDGE = 320
+# ClaimGraph menyimpan refcount node/edge di samping graf networkx
+CLAIM_GRAPH_OVERHEAD = 1.2
+
+_MISSING = object()
+
+
+# ============================
+# HASH DATASET
+# ============================
+@traced("dataset_hash")
+def dataset_hash(df: pd.DataFrame):
+    # Hash isi DataFrame (bukan identitas objek) supaya sesi yang mengunggah
+    # file yang sama mendapat key yang sama
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# ============================
+# ESTIMASI UKURAN
+# ============================
+def estimate_nbytes(value):
+    if isinstance(value, ClaimGraph):
+        # Graf + cache turunan (centrality, komunitas, lapisan ego) yang terus bertambah
+        return int(estimate_nbytes(value.G) * CLAIM_GRAPH_OVERHEAD) + value.derived_nbytes
+    if isinstance(value, nx.Graph):
+        return NX_BYTES_PER_NODE * value.number_of_nodes() + NX_BYTES_PER_EDGE * value.number_of_edges()
+    if isinstance(value, CompactClaimGraph):
+        adjacency = value.adjacency
+        return (
+            value.node_names.nbytes + value.node_type.nbytes + value.fraud.nbytes
+            + adjacency.data.nbytes + adjacency.indices.nbytes + adjacency.indptr.nbytes
+            + NX_BYTES_PER_NODE // 5 * value.number_of_nodes()  # string id node
+        )
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ============================
+# LRU CACHE DENGAN BATAS MEMORI
+# ============================
+class GraphCache:
+    # Cache LRU thread-safe untuk graf dan hasil risiko, dibagi antar sesi
+    # Streamlit (lewat st.cache_resource). Entri terlama dibuang bila total
+    # perkiraan memori melebihi max_bytes. Entri ClaimGraph terus mengisi cache
+    # turunannya setelah disimpan, jadi ukurannya diukur ulang di setiap get/put/stats.
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._growing = set()          # key entri yang ukurannya bisa bertambah
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = self._entries[key][0]
+                self._remeasure()
+                return value
+            self.misses += 1
+            return default
+
+    def put(self, key, value, nbytes: int = None):
+        nbytes = estimate_nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+                self._growing.discard(key)
+            if nbytes > self.max_bytes:
+                return value  # terlalu besar untuk di-cache
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            if isinstance(value, ClaimGraph):
+                self._growing.add(key)
+            self._remeasure()
+        return value
+
+    def _remeasure(self):
+        # Dipanggil dengan self._lock sudah dipegang: perbarui ukuran entri yang
+        # bisa bertambah, lalu buang entri terlama sampai kembali di bawah batas
+        for key in self._growing:
+            value, old = self._entries[key]
+            nbytes = estimate_nbytes(value)
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes - old
+        while self.nbytes > self.max_bytes:
+            evicted_key, (_, evicted) = self._entries.popitem(last=False)
+            self._growing.discard(evicted_key)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        # None juga di-cache (mis. faskes tanpa node di graf), jadi pakai sentinel
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._growing.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            self._remeasure()
+            return {
+                "entries": len(self._entries),
+                "memory_mb": round(self.nbytes / 1024 ** 2, 1),
+                "max_memory_mb": round(self.max_bytes / 1024 ** 2, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
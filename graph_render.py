@@ -0,0 +1,208 @@
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import networkx as nx
+from jinja2.utils import htmlsafe_json_dumps
+from pyvis.network import Network
+
+from perf import traced
+
+LIB_DIR = Path(__file__).resolve().parent / "lib"
+
+# Tag aset yang dihasilkan template pyvis (cdn_resources="local"); diganti aset vendored
+_PYVIS_ASSET_TAGS = re.compile(
+    r'\s*<script src="lib/bindings/utils\.js"></script>'
+    r'|\s*<link rel="stylesheet" href="https://cdnjs\.cloudflare\.com/ajax/libs/vis-network/[^"]*"[^>]*/>'
+    r'|\s*<script src="https://cdnjs\.cloudflare\.com/ajax/libs/vis-network/[^"]*"[^>]*></script>'
+)
+_HEAD_ANCHOR = '<meta charset="utf-8">'
+# Slot di template halaman yang diisi data graf saat ditampilkan
+_NODES_SLOT, _EDGES_SLOT, _OPTIONS_SLOT = "__GRAPH_NODES__", "__GRAPH_EDGES__", "__GRAPH_OPTIONS__"
+# Template pyvis menampilkan loading bar bila node > 100 dan physics aktif
+_LOADING_BAR_MIN_NODES = 101
+
+
+# ============================
+# ASET VENDORED
+# ============================
+@lru_cache(maxsize=1)
+def vendored_assets_html():
+    # Dibaca dari disk sekali per proses; hanya ada di template halaman, tidak di body cache
+    utils_js = (LIB_DIR / "bindings" / "utils.js").read_text(encoding="utf-8")
+    vis_css = (LIB_DIR / "vis-9.1.2" / "vis-network.css").read_text(encoding="utf-8")
+    vis_js = (LIB_DIR / "vis-9.1.2" / "vis-network.min.js").read_text(encoding="utf-8")
+    return (
+        f"\n<script>{utils_js}</script>"
+        f"\n<style>{vis_css}</style>"
+        f"\n<script>{vis_js}</script>"
+    )
+
+
+# ============================
+# STYLE NODE
+# ============================
+def node_style(data: dict):
+    node_type = data.get("type", "")
+    fraud = data.get("fraud", 0)  # Ambil nilai fraud dari node (claim)
+
+    # Menentukan warna dan simbol berdasarkan jenis node dan fraud
+    if node_type == "faskes":
+        return "#ff6666", "dot", 20
+    elif node_type == "participant":
+        return "#66b3ff", "dot", 10
+    elif node_type == "dpjp":
+        return "#99ff99", "diamond", 14
+    elif node_type == "icd":
+        return "#ffcc66", "triangle", 14
+    elif node_type == "claim":
+        # Jika fraud_prediction == 1, set warna hitam dan bentuk simbol khusus
+        if fraud == 1:
+            return "black", "star", 18
+        return "#ff99ff", "star", 18
+    return "#cccccc", "dot", 8
+
+
+def fraud_ratio_color(ratio: float):
+    # Hijau (0% fraud) -> kuning -> merah (100% fraud)
+    ratio = min(max(ratio, 0.0), 1.0)
+    red = int(255 * min(1.0, 2 * ratio))
+    green = int(200 * min(1.0, 2 * (1 - ratio)))
+    return f"#{red:02x}{green:02x}40"
+
+
+def super_node_style(data: dict):
+    # Warna dari rasio fraud (abu-abu jika tanpa klaim), ukuran ~ log jumlah node
+    color = fraud_ratio_color(data["fraud_ratio"]) if data["claims"] else "#cccccc"
+    size = 12 + 6 * math.log2(1 + data["size"])
+    return color, "dot", min(size, 80)
+
+
+# ============================
+# RENDER HTML (IN-MEMORY)
+# ============================
+def _network(height: str):
+    nt = Network(
+        height=height,
+        width="100%",
+        bgcolor="#ffffff",
+        font_color="black",
+        directed=False,
+        cdn_resources="local",
+    )
+    nt.barnes_hut(gravity=-20000, central_gravity=0)
+    return nt
+
+
+class _Slot(str):
+    # Placeholder pengganti list node/edge saat merender template pyvis;
+    # len() meniru jumlah node supaya cabang loading bar tetap benar
+    def __new__(cls, name: str, length: int = 0):
+        slot = super().__new__(cls, name)
+        slot.length = length
+        return slot
+
+    def __len__(self):
+        return self.length
+
+
+@lru_cache(maxsize=16)
+def _page_template(height: str, physics: bool, loading_bar: bool):
+    # Template HTML pyvis + aset vendored, dirender sekali per (tinggi, physics);
+    # data graf disisipkan lewat slot, jadi aset ~690KB tidak ikut di tiap entri cache
+    nt = _network(height)
+    nt.toggle_physics(physics)
+    env = nt.templateEnv.overlay()
+    env.filters["tojson"] = lambda value: value  # slot sudah berupa teks JS
+    html = env.get_template(nt.path).render(
+        height=nt.height,
+        width=nt.width,
+        nodes=_Slot(_NODES_SLOT, _LOADING_BAR_MIN_NODES if loading_bar else 0),
+        edges=_Slot(_EDGES_SLOT),
+        heading=nt.heading,
+        options=_OPTIONS_SLOT,
+        physics_enabled=physics,
+        use_DOT=nt.use_DOT,
+        dot_lang=nt.dot_lang,
+        widget=nt.widget,
+        bgcolor=nt.bgcolor,
+        conf=nt.conf,
+        tooltip_link=False,
+        neighborhood_highlight=nt.neighborhood_highlight,
+        select_menu=nt.select_menu,
+        filter_menu=nt.filter_menu,
+        notebook=False,
+        cdn_resources=nt.cdn_resources,
+    )
+    html = _PYVIS_ASSET_TAGS.sub("", html)
+    return html.replace(_HEAD_ANCHOR, _HEAD_ANCHOR + vendored_assets_html(), 1)
+
+
+def _to_body(nt: Network):
+    # Body graf yang di-cache: data node/edge/opsi (JSON) + parameter template
+    nodes, edges, _, height, _, options = nt.get_network_data()
+    physics = nt.options.physics.enabled
+    return {
+        "nodes": str(htmlsafe_json_dumps(nodes, sort_keys=True)),
+        "edges": str(htmlsafe_json_dumps(edges, sort_keys=True)),
+        "options": options,
+        "height": height,
+        "physics": physics,
+        "loading_bar": physics and len(nodes) >= _LOADING_BAR_MIN_NODES,
+    }
+
+
+def graph_page_html(body: dict):
+    # HTML lengkap untuk components.html: template halaman bersama + body graf
+    html = _page_template(body["height"], body["physics"], body["loading_bar"])
+    return (
+        html.replace(_NODES_SLOT, body["nodes"], 1)
+        .replace(_EDGES_SLOT, body["edges"], 1)
+        .replace(_OPTIONS_SLOT, body["options"], 1)
+    )
+
+
+@traced("pyvis_render")
+def render_graph_body(subG: nx.Graph, height: str = "700px"):
+    # Setup Visualisasi menggunakan pyvis; hasilnya body graf (lihat _to_body),
+    # tidak ada file graph.html yang ditulis ke working directory
+    nt = _network(height)
+    nt.toggle_physics(False)
+
+    # Menambahkan node ke dalam visualisasi
+    for node, data in subG.nodes(data=True):
+        color, shape, size = node_style(data)
+        nt.add_node(node, label=node, color=color, shape=shape, size=size)
+
+    # Menambahkan edge ke dalam visualisasi
+    for src, dst in subG.edges():
+        nt.add_edge(src, dst)
+
+    return _to_body(nt)
+
+
+@traced("pyvis_render_summary")
+def render_summary_body(summary: nx.Graph, height: str = "700px"):
+    # Render graf ringkasan (hasil summarize_graph): satu node per super-node,
+    # tebal edge ~ log jumlah edge asli. Jumlah node/edge dibatasi jumlah
+    # super-node, jadi waktu render tidak bergantung pada volume klaim.
+    nt = _network(height)
+    nt.toggle_physics(True)
+
+    for node, data in summary.nodes(data=True):
+        color, shape, size = super_node_style(data)
+        counts = ", ".join(f"{kind}: {count:,}" for kind, count in sorted(data["counts"].items()))
+        title = (
+            f"{node} — {data['size']:,} node ({counts})\n"
+            f"Klaim fraud: {data['fraud_claims']:,} / {data['claims']:,} ({data['fraud_ratio']:.0%})\n"
+            f"Edge internal: {data['internal_edges']:,}"
+        )
+        label = f"{node}\n{data['size']:,} node · fraud {data['fraud_ratio']:.0%}"
+        nt.add_node(node, label=label, title=title, color=color, shape=shape, size=size)
+
+    for src, dst, data in summary.edges(data=True):
+        weight = data.get("weight", 1)
+        nt.add_edge(src, dst, width=1 + math.log2(weight), title=f"{weight:,} edge")
+
+    return _to_body(nt)
@@ -0,0 +1,116 @@
+import codecs
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+from perf import traced
+
+SNIFF_BYTES = 64 * 1024
+DELIMITERS = [",", ";", "\t", "|"]
+FALLBACK_ENCODING = "latin-1"
+
+# Kolom id berulang -> categorical (hemat memori, perbandingan cepat)
+CATEGORICAL_COLUMNS = ["faskes_id", "dpjp_id", "kode_icd10", "participant_id"]
+# Kolom id tidak pernah di-downcast: dtype-nya harus sama di setiap file/chunk
+# supaya merge dengan prediksi backend, hash dataset dan id node graf konsisten
+ID_COLUMNS = ["claim_id", "participant_id", "faskes_id", "dpjp_id"]
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+# ============================
+# SNIFF ENCODING & DELIMITER
+# ============================
+def sniff_encoding(prefix: bytes):
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        # Decoder inkremental: karakter multibyte yang terpotong di ujung prefix bukan error
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def sniff_delimiter(text: str):
+    sample = text[:text.rfind("\n")] if "\n" in text else text
+    try:
+        return csv.Sniffer().sniff(sample, delimiters="".join(DELIMITERS)).delimiter
+    except csv.Error:
+        # Fallback: delimiter yang paling sering muncul di baris header
+        header = sample.split("\n", 1)[0]
+        return max(DELIMITERS, key=header.count)
+
+
+def sniff_csv(file):
+    # Hasil: (encoding, delimiter, kolom header) dari prefix kecil di awal file
+    file.seek(0)
+    prefix = file.read(SNIFF_BYTES)
+    file.seek(0)
+    encoding = sniff_encoding(prefix)
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(prefix, final=False)
+    sep = sniff_delimiter(text)
+    header = next(csv.reader([text.lstrip("\ufeff").split("\n", 1)[0].rstrip("\r")], delimiter=sep), [])
+    return encoding, sep, header
+
+
+# ============================
+# DTYPE & DOWNCAST
+# ============================
+def downcast_numeric(df: pd.DataFrame, exclude=ID_COLUMNS):
+    for col in df.columns:
+        if col in exclude:
+            continue
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            # float32 hanya bila tanpa kehilangan presisi (nominal rupiah bisa besar)
+            downcast = series.astype(np.float32)
+            if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+                df[col] = downcast
+    return df
+
+
+def _categorical_dtypes(columns):
+    return {col: "category" for col in CATEGORICAL_COLUMNS if col in columns}
+
+
+# ============================
+# READ CLAIMS
+# ============================
+@traced("read_claims")
+def read_claims(file, name: str = ""):
+    # Satu kali parsing: Parquet langsung, CSV dengan encoding & delimiter hasil sniff
+    # lalu engine pyarrow. Kolom id jadi categorical, kolom numerik di-downcast.
+    if name.lower().endswith(".parquet"):
+        file.seek(0)
+        df = pd.read_parquet(file)
+        for col in _categorical_dtypes(df.columns):
+            df[col] = df[col].astype("category")
+        return downcast_numeric(df)
+
+    encoding, sep, header = sniff_csv(file)
+    df = pd.read_csv(
+        file,
+        sep=sep,
+        encoding=encoding,
+        engine="pyarrow",
+        dtype=_categorical_dtypes(header),
+    )
+    return downcast_numeric(df)
+
+
+def to_csv_bytes(df: pd.DataFrame):
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
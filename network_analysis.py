@@ -1,38 +1,104 @@
+import math
+import multiprocessing
+import os
+import random
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import networkx as nx
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from perf import span, traced
 
 # ============================
 # BUILD GRAPH
 # ============================
-def build_claim_graph(df: pd.DataFrame):
-    G = nx.Graph()
+REQUIRED_COLUMNS = ['claim_id', 'participant_id', 'faskes_id', 'dpjp_id', 'kode_icd10']
+
+# Urutan kolom node per baris klaim: (tipe node, prefix id)
+NODE_LAYOUT = [
+    ("claim", None),
+    ("participant", "PTC_"),
+    ("faskes", "FSK_"),
+    ("dpjp", "DR_"),
+    ("icd", "ICD_"),
+]
+
+# Edge per baris klaim: (index kolom asal, index kolom tujuan, relation)
+EDGE_LAYOUT = [
+    (2, 3, "doctor_in_charge"),
+    (0, 1, "filed_by"),
+    (0, 3, "attended_by"),
+    (0, 4, "diagnosis"),
+]
+
 
+def _node_columns(df: pd.DataFrame):
+    # Bangun id node berprefix secara kolom-wise (tanpa loop per baris)
+    cols = []
+    for (_, prefix), col in zip(NODE_LAYOUT, REQUIRED_COLUMNS):
+        values = df[col]
+        if prefix is not None:
+            values = prefix + values.astype(str)
+        cols.append(values.to_numpy(dtype=object))
+    return cols
+
+
+def _node_codes(df: pd.DataFrame):
+    # Kode integer node per baris (n_rows x len(NODE_LAYOUT)), urutan kemunculan pertama
+    codes, node_names = pd.factorize(np.column_stack(_node_columns(df)).ravel())
+    return codes.astype(np.int32).reshape(len(df), len(NODE_LAYOUT)), node_names
+
+
+@traced("build_claim_graph")
+def build_claim_graph(df: pd.DataFrame, backend: str = "networkx"):
     # Pastikan tidak ada nilai kosong di kolom yang digunakan
-    required_columns = ['claim_id', 'participant_id', 'faskes_id', 'dpjp_id', 'kode_icd10']
-    if any(df[col].isnull().any() for col in required_columns):
+    if df[REQUIRED_COLUMNS].isnull().any().any():
         raise ValueError("Dataframe memiliki nilai kosong di salah satu kolom yang dibutuhkan")
 
-    # Iterasi untuk menambahkan node dan edge ke graf
-    for _, row in df.iterrows():
-        claim_id = row['claim_id']
-        participant = f"PTC_{row['participant_id']}"
-        faskes = f"FSK_{row['faskes_id']}"
-        dpjp = f"DR_{row['dpjp_id']}"
-        icd = f"ICD_{row['kode_icd10']}"
-        fraud_prediction = row['fraud_prediction']  # Ambil nilai fraud_prediction
-
-        # Tambahkan node ke graf
-        G.add_node(claim_id, type="claim", fraud=fraud_prediction)
-        G.add_node(participant, type="participant")
-        G.add_node(faskes, type="faskes")
-        G.add_node(dpjp, type="dpjp")
-        G.add_node(icd, type="icd")
-
-        # Tambahkan edge ke graf
-        G.add_edge(faskes, dpjp, relation="doctor_in_charge")
-        G.add_edge(claim_id, participant, relation="filed_by")
-        G.add_edge(claim_id, dpjp, relation="attended_by")
-        G.add_edge(claim_id, icd, relation="diagnosis")
+    if backend == "compact":
+        return CompactClaimGraph.from_dataframe(df)
+    if backend != "networkx":
+        raise ValueError(f"Backend graf tidak dikenal: {backend}")
+
+    G = nx.Graph()
+
+    n_rows = len(df)
+    cols = _node_columns(df)
+    fraud = df['fraud_prediction'].to_numpy(dtype=object)
+
+    # Node disusun baris demi baris (claim, participant, faskes, dpjp, icd)
+    # supaya urutan node sama dengan versi iterrows sebelumnya
+    nodes = pd.DataFrame({
+        "node": np.column_stack(cols).ravel() if n_rows else np.empty(0, dtype=object),
+        "kind": np.tile(np.arange(len(NODE_LAYOUT)), n_rows),
+    })
+    order = nodes.drop_duplicates("node", keep="first")
+
+    # Atribut fraud klaim: nilai terakhir yang menang, sama seperti add_node berulang
+    claim_fraud = dict(zip(cols[0], fraud))
+
+    node_types = [kind for kind, _ in NODE_LAYOUT]
+    G.add_nodes_from(
+        (node, {"type": "claim", "fraud": claim_fraud[node]})
+        if kind == 0 else (node, {"type": node_types[kind]})
+        for node, kind in zip(
+            order["node"].to_numpy(dtype=object), order["kind"].to_numpy()
+        )
+    )
+
+    # Edge disusun dengan cara yang sama lalu dideduplikasi oleh pandas,
+    # kemudian dimuat per relation sekaligus
+    for src, dst, relation in EDGE_LAYOUT:
+        edges = pd.DataFrame({"src": cols[src], "dst": cols[dst]}).drop_duplicates()
+        G.add_edges_from(
+            zip(edges["src"].to_numpy(dtype=object), edges["dst"].to_numpy(dtype=object)),
+            relation=relation,
+        )
 
     # Cek jika graf terbentuk dengan benar
     if G.number_of_nodes() == 0:
@@ -42,43 +108,898 @@ def build_claim_graph(df: pd.DataFrame):
 
 
 # ============================
-# CALCULATE RISK SCORE
+# COMPACT GRAPH BACKEND
 # ============================
-def calculate_graph_risk(G: nx.Graph, faskes_id: str):
+NODE_TYPES = [kind for kind, _ in NODE_LAYOUT]
+RELATION_BY_TYPES = {
+    frozenset((NODE_TYPES[s], NODE_TYPES[d])): relation for s, d, relation in EDGE_LAYOUT
+}
 
-    faskes_node = f"FSK_{faskes_id}"
 
-    if faskes_node not in G.nodes:
-        return None
+class CompactClaimGraph:
+    # Graf klaim berindeks integer: id node dikodekan (categorical), adjacency
+    # disimpan sebagai CSR SciPy dan atribut type/fraud sebagai array bertipe.
+    # Hanya subgraf yang dirender yang dikonversi ke networkx.
+
+    def __init__(self, node_names: np.ndarray, node_type: np.ndarray, fraud: np.ndarray, adjacency: sp.csr_matrix):
+        self.node_names = node_names
+        self.node_type = node_type
+        self.fraud = fraud
+        self.adjacency = adjacency
+        self._index = pd.Index(node_names)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        n_rows = len(df)
+        if n_rows == 0:
+            raise ValueError("Graf tidak memiliki node setelah proses pembangunan.")
+
+        # Kode node mengikuti urutan kemunculan pertama, sama dengan build_claim_graph
+        codes, node_names = _node_codes(df)
+        n_nodes = len(node_names)
+
+        # Tipe node dari kemunculan pertama (posisi kolom di NODE_LAYOUT)
+        _, first = np.unique(codes.ravel(), return_index=True)
+        node_type = (first % len(NODE_LAYOUT)).astype(np.int8)
+
+        # Atribut fraud klaim: nilai terakhir yang menang
+        fraud_values = df['fraud_prediction'].to_numpy()
+        fraud = np.zeros(n_nodes, dtype=fraud_values.dtype)
+        claim_codes, last = np.unique(codes[::-1, 0], return_index=True)
+        fraud[claim_codes] = fraud_values[::-1][last]
+
+        src = np.concatenate([codes[:, s] for s, _, _ in EDGE_LAYOUT])
+        dst = np.concatenate([codes[:, d] for _, d, _ in EDGE_LAYOUT])
+        adjacency = sp.coo_matrix(
+            (np.ones(2 * len(src), dtype=np.int8), (np.concatenate([src, dst]), np.concatenate([dst, src]))),
+            shape=(n_nodes, n_nodes),
+        ).tocsr()
+        adjacency.data[:] = 1  # edge duplikat dijumlahkan oleh tocsr
+
+        return cls(np.asarray(node_names, dtype=object), node_type, fraud, adjacency)
+
+    def number_of_nodes(self):
+        return len(self.node_names)
+
+    def number_of_edges(self):
+        return self.adjacency.nnz // 2
+
+    def __contains__(self, node):
+        return node in self._index
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def index_of(self, node):
+        return self._index.get_loc(node)
+
+    def degree(self, node):
+        i = self.index_of(node)
+        return int(self.adjacency.indptr[i + 1] - self.adjacency.indptr[i])
+
+    def ego_nodes(self, center, radius: int = 1):
+        # BFS per lapisan langsung di atas CSR
+        visited = np.zeros(self.number_of_nodes(), dtype=bool)
+        frontier = np.array([self.index_of(center)], dtype=np.int32)
+        visited[frontier] = True
+        for _ in range(radius):
+            neighbours = self.adjacency[frontier].indices
+            frontier = np.unique(neighbours[~visited[neighbours]])
+            if len(frontier) == 0:
+                break
+            visited[frontier] = True
+        return np.flatnonzero(visited)
+
+    def to_networkx(self, nodes: np.ndarray = None):
+        # Konversi (sebagian) graf ke networkx; nodes = indeks integer
+        if nodes is None:
+            nodes = np.arange(self.number_of_nodes())
+        G = nx.Graph()
+        names = self.node_names[nodes]
+        types = self.node_type[nodes]
+        fraud = self.fraud[nodes]
+        G.add_nodes_from(
+            (name, {"type": "claim", "fraud": fraud[i].item()})
+            if types[i] == 0 else (name, {"type": NODE_TYPES[types[i]]})
+            for i, name in enumerate(names)
+        )
+        sub = sp.triu(self.adjacency[nodes][:, nodes], format="coo")
+        G.add_edges_from(
+            (names[u], names[v], {"relation": RELATION_BY_TYPES.get(frozenset((NODE_TYPES[types[u]], NODE_TYPES[types[v]])))})
+            for u, v in zip(sub.row, sub.col)
+        )
+        return G
+
+    def ego_graph(self, center, radius: int = 1):
+        return self.to_networkx(self.ego_nodes(center, radius))
+
+
+# ============================
+# CENTRALITY ENGINE
+# ============================
+CENTRALITY_CACHE_SIZE = 8
+# Hasil graf penuh (leaderboard) bisa ratusan MB: cache juga dibatasi total memori
+CENTRALITY_CACHE_MAX_MB = 256
+# Perkiraan memori dict node -> skor (betweenness/degree), diukur dengan tracemalloc
+CENTRALITY_BYTES_PER_NODE = 60
+_centrality_cache = OrderedDict()  # key -> (hasil, nbytes)
+_cache_lock = threading.Lock()     # cache modul dipakai bersama oleh sesi Streamlit
+
+
+def _cache_get(cache: OrderedDict, key):
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key][0]
+    return None
+
+
+def _cache_put(cache: OrderedDict, key, value, nbytes: int, max_size: int, max_mb: int):
+    # LRU dibatasi jumlah entri dan total perkiraan memori; hasil yang lebih besar
+    # dari batas tidak di-cache sama sekali
+    max_bytes = max_mb * 1024 ** 2
+    if nbytes > max_bytes:
+        return
+    with _cache_lock:
+        cache.pop(key, None)
+        cache[key] = (value, nbytes)
+        total = sum(size for _, size in cache.values())
+        while len(cache) > max_size or total > max_bytes:
+            _, (_, evicted) = cache.popitem(last=False)
+            total -= evicted
+
+
+def graph_fingerprint(G: nx.Graph):
+    # Hash yang tidak bergantung pada urutan node/edge, O(V + E)
+    node_hash = sum(hash(n) for n in G.nodes) & 0xFFFFFFFFFFFFFFFF
+    edge_hash = sum(hash(frozenset(e)) for e in G.edges) & 0xFFFFFFFFFFFFFFFF
+    return (G.number_of_nodes(), G.number_of_edges(), node_hash, edge_hash)
+
 
-    # Centrality
-    bet = nx.betweenness_centrality(G).get(faskes_node, 0)
-    deg = nx.degree_centrality(G).get(faskes_node, 0)
+def _exact_centrality(G: nx.Graph, k=None, seed=None):
+    return nx.betweenness_centrality(G), 0.0
 
-    # Community detection (Louvain alternative)
-    communities = nx.algorithms.community.greedy_modularity_communities(G)
 
-    community_score = 0
-    for c in communities:
-        if faskes_node in c:
-            size = len(c)
-            if size > 7:  # cluster besar mencurigakan
-                community_score = 1
-            elif size > 4:
-                community_score = 0.7
-            else:
-                community_score = 0.3
+def _hoeffding_bound(n: int, k: int, confidence: float = 0.95):
+    # Batas error Hoeffding per node: tiap pivot menyumbang nilai di [0, n/(n-1)]
+    value_range = n / (n - 1) if n > 1 else 1.0
+    return value_range * math.sqrt(math.log(2 / (1 - confidence)) / (2 * k))
 
+
+def _approx_centrality(G: nx.Graph, k=None, seed=None, confidence=0.95):
+    n = G.number_of_nodes()
+    k = min(k or max(int(math.sqrt(n)), 1), n)
+    if k >= n:
+        return _exact_centrality(G)
+
+    bet = nx.betweenness_centrality(G, k=k, seed=seed)
+    return bet, _hoeffding_bound(n, k, confidence)
+
+
+CENTRALITY_ENGINES = {
+    "exact": _exact_centrality,
+    "approx": _approx_centrality,
+}
+
+
+def compute_centrality(G: nx.Graph, mode: str = "exact", k: int = None, seed: int = 42, use_cache: bool = True):
+    if mode not in CENTRALITY_ENGINES:
+        raise ValueError(f"Mode centrality tidak dikenal: {mode}")
+
+    key = (graph_fingerprint(G), mode, k, seed)
+    cached = _cache_get(_centrality_cache, key) if use_cache else None
+    if cached is not None:
+        return cached
+
+    with span("betweenness", mode=mode, nodes=G.number_of_nodes()):
+        bet, error_bound = CENTRALITY_ENGINES[mode](G, k=k, seed=seed)
+    result = {
+        "betweenness": bet,
+        "degree": nx.degree_centrality(G),
+        "mode": mode,
+        "k": k,
+        "error_bound": error_bound,
+    }
+
+    if use_cache:
+        _cache_put(
+            _centrality_cache, key, result, 2 * CENTRALITY_BYTES_PER_NODE * G.number_of_nodes(),
+            CENTRALITY_CACHE_SIZE, CENTRALITY_CACHE_MAX_MB,
+        )
+
+    return result
+
+
+def clear_centrality_cache():
+    with _cache_lock:
+        _centrality_cache.clear()
+
+
+# ============================
+# COMMUNITY DETECTION
+# ============================
+COMMUNITY_CACHE_SIZE = 8
+COMMUNITY_CACHE_MAX_MB = 256
+# Perkiraan memori membership + set komunitas per node, diukur dengan tracemalloc
+COMMUNITY_BYTES_PER_NODE = 80
+_community_cache = OrderedDict()  # key -> (hasil, nbytes)
+
+
+def _community_score(size: int):
+    if size > 7:  # cluster besar mencurigakan
+        return 1
+    elif size > 4:
+        return 0.7
+    return 0.3
+
+
+COMMUNITY_BACKENDS = {
+    "greedy": lambda G, seed, resolution: nx.community.greedy_modularity_communities(G, resolution=resolution),
+    "louvain": lambda G, seed, resolution: nx.community.louvain_communities(G, resolution=resolution, seed=seed),
+    "label_propagation": lambda G, seed, resolution: nx.community.label_propagation_communities(G),
+}
+
+
+def detect_communities(G: nx.Graph, method: str = "greedy", seed: int = 42, use_cache: bool = True, resolution: float = 1):
+    if method not in COMMUNITY_BACKENDS:
+        raise ValueError(f"Metode komunitas tidak dikenal: {method}")
+
+    key = (graph_fingerprint(G), method, seed, resolution)
+    cached = _cache_get(_community_cache, key) if use_cache else None
+    if cached is not None:
+        return cached
+
+    with span("community_detection", method=method, nodes=G.number_of_nodes()):
+        communities = [set(c) for c in COMMUNITY_BACKENDS[method](G, seed, resolution)]
+
+    # Index node -> id komunitas supaya lookup O(1); skor dihitung sekali per komunitas
+    membership = {node: cid for cid, c in enumerate(communities) for node in c}
+    sizes = [len(c) for c in communities]
+    result = {
+        "method": method,
+        "communities": communities,
+        "membership": membership,
+        "sizes": sizes,
+        "scores": [_community_score(size) for size in sizes],
+    }
+
+    if use_cache:
+        _cache_put(
+            _community_cache, key, result, COMMUNITY_BYTES_PER_NODE * G.number_of_nodes(),
+            COMMUNITY_CACHE_SIZE, COMMUNITY_CACHE_MAX_MB,
+        )
+
+    return result
+
+
+def community_score_of(communities: dict, node):
+    cid = communities["membership"].get(node)
+    return 0 if cid is None else communities["scores"][cid]
+
+
+def clear_community_cache():
+    with _cache_lock:
+        _community_cache.clear()
+
+
+# ============================
+# CALCULATE RISK SCORE
+# ============================
+def _final_risk(bet, deg, community_score):
     # Final score (0–100)
-    final_score = (
+    return (
         0.4 * bet +
         0.3 * deg +
         0.3 * community_score
     ) * 100
 
+
+def calculate_graph_risk(G: nx.Graph, faskes_id: str, centrality: str = "exact", k: int = None, seed: int = 42, community: str = "greedy"):
+
+    faskes_node = f"FSK_{faskes_id}"
+
+    if faskes_node not in G.nodes:
+        return None
+
+    # Centrality (di-cache per fingerprint graf, dipakai ulang antar faskes)
+    cent = compute_centrality(G, mode=centrality, k=k, seed=seed)
+    bet = cent["betweenness"].get(faskes_node, 0)
+    deg = cent["degree"].get(faskes_node, 0)
+
+    # Community detection (greedy / louvain / label_propagation)
+    communities = detect_communities(G, method=community, seed=seed)
+    community_score = community_score_of(communities, faskes_node)
+
+    final_score = _final_risk(bet, deg, community_score)
+
     return {
         "betweenness": bet,
         "degree": deg,
         "community_score": community_score,
-        "final_risk": round(final_score, 2)
+        "final_risk": round(final_score, 2),
+        "betweenness_error": cent["error_bound"],
+    }
+
+
+def calculate_graph_risk_batch(G: nx.Graph, faskes_ids=None, centrality: str = "exact", k: int = None, seed: int = 42, community: str = "greedy"):
+    # Skor risiko untuk banyak faskes sekaligus: centrality & community sekali jalan
+    if faskes_ids is None:
+        faskes_nodes = [node for node, node_type in G.nodes(data="type") if node_type == "faskes"]
+    else:
+        faskes_nodes = [f"FSK_{f}" for f in faskes_ids if f"FSK_{f}" in G]
+
+    cent = compute_centrality(G, mode=centrality, k=k, seed=seed)
+    communities = detect_communities(G, method=community, seed=seed)
+
+    result = pd.DataFrame({
+        "faskes_id": [node[len("FSK_"):] for node in faskes_nodes],
+        "betweenness": [cent["betweenness"].get(node, 0) for node in faskes_nodes],
+        "degree": [cent["degree"].get(node, 0) for node in faskes_nodes],
+        "community_score": [community_score_of(communities, node) for node in faskes_nodes],
+    })
+    result["final_risk"] = _final_risk(
+        result["betweenness"], result["degree"], result["community_score"]
+    ).round(2)
+    result["betweenness_error"] = cent["error_bound"]
+
+    return result.sort_values("final_risk", ascending=False, ignore_index=True)
+
+
+# ============================
+# PARALLEL RISK (MULTI-PROSES)
+# ============================
+# Jumlah task per worker: sumber BFS dibagi ke potongan yang lebih kecil supaya beban seimbang
+PARALLEL_TASKS_PER_WORKER = 4
+# Graf lebih kecil dari ini dihitung di satu proses: start worker lebih mahal dari hitungannya
+PARALLEL_MIN_NODES = 5_000
+# spawn, bukan fork: fork di server Streamlit (multi-thread) bisa mewarisi lock yang
+# sedang dipegang thread lain sehingga worker deadlock
+PROCESS_START_METHOD = "spawn"
+
+_worker_graph = None
+_worker_targets = None
+
+
+def _process_pool(workers: int, initializer=None, initargs=()):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def _init_betweenness_worker(nodes: list, edges: list, targets: list):
+    # Graf dikirim sekali per worker (bukan per task)
+    global _worker_graph, _worker_targets
+    _worker_graph = nx.Graph()
+    _worker_graph.add_nodes_from(nodes)
+    _worker_graph.add_edges_from(edges)
+    _worker_targets = targets
+
+
+def _betweenness_task(sources: list):
+    # Di proses worker: jumlah dependency BFS dari sebagian sumber (tidak
+    # dinormalisasi, pasangan tak berurutan), hanya untuk node target
+    bet = nx.betweenness_centrality_subset(
+        _worker_graph, sources=sources, targets=list(_worker_graph), normalized=False
+    )
+    return [bet[node] for node in _worker_targets]
+
+
+@traced("graph_risk_parallel")
+def calculate_graph_risk_parallel(G: nx.Graph, faskes_ids=None, centrality: str = "exact", k: int = None,
+                                  seed: int = 42, community: str = "greedy", workers: int = None):
+    # Sama seperti calculate_graph_risk_batch, tetapi betweenness dibagi per sumber BFS
+    # ke ProcessPoolExecutor: betweenness = jumlah dependency dari setiap sumber, jadi
+    # graf tetap utuh (data klaim asli umumnya satu komponen raksasa karena ICD &
+    # peserta dipakai lintas faskes). Mode approx memakai pivot yang sama dengan
+    # networkx (random.Random(seed).sample), jadi kedua mode identik dengan versi batch.
+    # Komunitas dihitung di proses ini sambil worker menghitung betweenness.
+    if centrality not in CENTRALITY_ENGINES:
+        raise ValueError(f"Mode centrality tidak dikenal: {centrality}")
+    workers = workers or os.cpu_count() or 1
+    n = G.number_of_nodes()
+    if workers <= 1 or n < PARALLEL_MIN_NODES:
+        return calculate_graph_risk_batch(G, faskes_ids, centrality=centrality, k=k, seed=seed, community=community)
+
+    if faskes_ids is None:
+        faskes_nodes = [node for node, node_type in G.nodes(data="type") if node_type == "faskes"]
+    else:
+        faskes_nodes = [f"FSK_{f}" for f in faskes_ids if f"FSK_{f}" in G]
+
+    sources, sampled, error_bound = list(G.nodes), None, 0.0
+    if centrality == "approx":
+        k = min(k or max(int(math.sqrt(n)), 1), n)
+        if k < n:
+            sources = sampled = random.Random(seed).sample(sources, k)
+            error_bound = _hoeffding_bound(n, k)
+
+    n_chunks = workers * PARALLEL_TASKS_PER_WORKER
+    chunks = [sources[i::n_chunks] for i in range(min(n_chunks, len(sources)))]
+    raw = np.zeros(len(faskes_nodes))
+    with span("betweenness", mode=f"{centrality}_parallel", nodes=n, workers=workers):
+        with _process_pool(workers, _init_betweenness_worker, (list(G.nodes), list(G.edges), faskes_nodes)) as pool:
+            futures = [pool.submit(_betweenness_task, chunk) for chunk in chunks]
+            communities = detect_communities(G, method=community, seed=seed)
+            for future in futures:
+                raw += future.result()
+
+    # Skala networkx.betweenness_centrality(normalized=True, endpoints=False):
+    # 1/((n-1)(n-2)) per pasangan berurutan; dengan k pivot, pivot sendiri dibagi k-1
+    if n <= 2:
+        bet = np.zeros(len(faskes_nodes))
+    elif sampled is None:
+        bet = raw * 2 / ((n - 1) * (n - 2))
+    else:
+        pivots = set(sampled)
+        source_scale = 2 / ((k - 1) * (n - 2)) if k > 1 else math.nan
+        bet = raw * np.array([source_scale if node in pivots else 2 / (k * (n - 2)) for node in faskes_nodes])
+
+    deg_scale = 1 / (n - 1) if n > 1 else 0.0
+    result = pd.DataFrame({
+        "faskes_id": [node[len("FSK_"):] for node in faskes_nodes],
+        "betweenness": bet,
+        "degree": [G.degree(node) * deg_scale for node in faskes_nodes],
+        "community_score": [community_score_of(communities, node) for node in faskes_nodes],
+    })
+    result["final_risk"] = _final_risk(
+        result["betweenness"], result["degree"], result["community_score"]
+    ).round(2)
+    result["betweenness_error"] = error_bound
+
+    return result.sort_values("final_risk", ascending=False, ignore_index=True)
+
+
+# ============================
+# GRAPH FEATURES (BULK, PER KLAIM)
+# ============================
+def _distinct_pairs(a: np.ndarray, b: np.ndarray, n_nodes: int):
+    # Pasangan (a, b) unik lewat satu key int64, tanpa np.unique(axis=0)
+    keys = pd.unique(a.astype(np.int64) * n_nodes + b)
+    return keys // n_nodes, keys % n_nodes
+
+
+def _hub_fraud_share(claim, hub, fraud, n_nodes: int):
+    # Porsi klaim fraud lain (selain klaim itu sendiri) yang berbagi hub yang sama
+    pair_claim, pair_hub = _distinct_pairs(claim, hub, n_nodes)
+    hub_claims = np.bincount(pair_hub, minlength=n_nodes)
+    hub_fraud = np.bincount(pair_hub, weights=fraud[pair_claim], minlength=n_nodes)
+    others = hub_claims[hub] - 1
+    share = np.zeros(len(claim))
+    np.divide(hub_fraud[hub] - fraud[claim], others, out=share, where=others > 0)
+    return share
+
+
+@traced("claim_graph_features")
+def claim_graph_features(df: pd.DataFrame, community: str = None, seed: int = 42,
+                         fraud_column: str = "fraud_prediction"):
+    # Fitur graf untuk setiap baris klaim dalam satu pass vektorisasi di atas
+    # kode integer node (tanpa membangun networkx, tanpa loop per klaim).
+    # Hasil: DataFrame kolom "graph_*" dengan index sama seperti df, siap di-join.
+    # community (mis. "louvain") opsional karena butuh graf networkx utuh.
+    if df[REQUIRED_COLUMNS].isnull().any().any():
+        raise ValueError("Dataframe memiliki nilai kosong di salah satu kolom yang dibutuhkan")
+
+    codes, node_names = _node_codes(df)
+    n_nodes = len(node_names)
+    claim, participant, faskes, dpjp, _ = codes.T
+
+    # Edge unik per relation, sama seperti graf klaim
+    edges = [_distinct_pairs(codes[:, s], codes[:, d], n_nodes) for s, d, _ in EDGE_LAYOUT]
+    src = np.concatenate([e[0] for e in edges])
+    dst = np.concatenate([e[1] for e in edges])
+    degree = np.bincount(np.concatenate([src, dst]), minlength=n_nodes)
+
+    features = {
+        "graph_participant_degree": degree[participant],
+        "graph_participant_distinct_dpjp": np.bincount(
+            _distinct_pairs(participant, dpjp, n_nodes)[0], minlength=n_nodes
+        )[participant],
+        "graph_participant_distinct_faskes": np.bincount(
+            _distinct_pairs(participant, faskes, n_nodes)[0], minlength=n_nodes
+        )[participant],
+        "graph_dpjp_degree": degree[dpjp],
+        "graph_dpjp_distinct_participants": np.bincount(
+            _distinct_pairs(dpjp, participant, n_nodes)[0], minlength=n_nodes
+        )[dpjp],
+        "graph_faskes_dpjp_count": degree[faskes],
     }
+
+    if fraud_column in df.columns:
+        # Atribut fraud klaim: nilai terakhir yang menang, sama dengan build_claim_graph
+        fraud = np.zeros(n_nodes)
+        claim_codes, last = np.unique(claim[::-1], return_index=True)
+        fraud[claim_codes] = df[fraud_column].to_numpy(dtype=float)[::-1][last]
+        features["graph_participant_fraud_share"] = _hub_fraud_share(claim, participant, fraud, n_nodes)
+        features["graph_dpjp_fraud_share"] = _hub_fraud_share(claim, dpjp, fraud, n_nodes)
+
+    adjacency = sp.coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n_nodes, n_nodes))
+    _, component = connected_components(adjacency, directed=False)
+    features["graph_component_size"] = np.bincount(component)[component[claim]]
+
+    if community is not None:
+        G = nx.Graph()
+        G.add_nodes_from(range(n_nodes))
+        G.add_edges_from(zip(src.tolist(), dst.tolist()))
+        communities = detect_communities(G, method=community, seed=seed)
+        membership = np.empty(n_nodes, dtype=np.int64)
+        for cid, nodes in enumerate(communities["communities"]):
+            membership[list(nodes)] = cid
+        features["graph_community_size"] = np.asarray(communities["sizes"])[membership[claim]]
+
+    return pd.DataFrame(features, index=df.index)
+
+
+# ============================
+# RINGKASAN GRAF (SUPER-NODE)
+# ============================
+SUMMARY_MODES = ["community", "type"]
+# Komunitas terbesar yang ditampilkan sendiri; sisanya digabung ke satu super-node
+MAX_SUPER_NODES = 40
+OTHER_GROUP = "lainnya"
+
+
+def _summary_groups(G: nx.Graph, by: str, community: str, seed: int):
+    # Hasil: {node: nama super-node}
+    if by == "type":
+        return {node: data.get("type", "") for node, data in G.nodes(data=True)}
+    if by != "community":
+        raise ValueError(f"Mode ringkasan tidak dikenal: {by}")
+
+    communities = detect_communities(G, method=community, seed=seed)
+    sizes = communities["sizes"]
+    order = sorted(range(len(sizes)), key=lambda cid: -sizes[cid])
+    n_named = len(order) if len(order) <= MAX_SUPER_NODES else MAX_SUPER_NODES - 1
+    names = {cid: f"K{rank + 1}" for rank, cid in enumerate(order[:n_named])}
+    return {node: names.get(cid, OTHER_GROUP) for node, cid in communities["membership"].items()}
+
+
+@traced("summarize_graph")
+def summarize_graph(G: nx.Graph, by: str = "community", community: str = "louvain", seed: int = 42):
+    # Gabungkan node per komunitas / per tipe node menjadi super-node.
+    # Hasil: (graf ringkasan, {super-node: [node anggota]}). Atribut super-node:
+    # jumlah node per tipe, jumlah klaim & klaim fraud, rasio fraud, edge internal;
+    # bobot edge = jumlah edge asli antar dua super-node.
+    groups = _summary_groups(G, by, community, seed)
+    members = {}
+    for node, group in groups.items():
+        members.setdefault(group, []).append(node)
+
+    S = nx.Graph()
+    for group, nodes in members.items():
+        counts = Counter(G.nodes[node].get("type", "") for node in nodes)
+        fraud_claims = sum(
+            1 for node in nodes
+            if G.nodes[node].get("type") == "claim" and G.nodes[node].get("fraud", 0) == 1
+        )
+        claims = counts.get("claim", 0)
+        S.add_node(
+            group,
+            type="super",
+            size=len(nodes),
+            counts=dict(counts),
+            claims=claims,
+            fraud_claims=fraud_claims,
+            fraud_ratio=fraud_claims / claims if claims else 0.0,
+            internal_edges=0,
+        )
+
+    for u, v in G.edges():
+        gu, gv = groups[u], groups[v]
+        if gu == gv:
+            S.nodes[gu]["internal_edges"] += 1
+        elif S.has_edge(gu, gv):
+            S[gu][gv]["weight"] += 1
+        else:
+            S.add_edge(gu, gv, weight=1)
+
+    return S, members
+
+
+def expand_super_node(G: nx.Graph, members: list, max_nodes: int = None):
+    # Drill-down satu super-node: anggota (derajat terbesar dulu) lalu tetangga
+    # langsung di luar super-node selama masih ada sisa kuota max_nodes.
+    # Hasil: (subgraf, truncated)
+    nodes = sorted(members, key=G.degree, reverse=True)
+    if max_nodes is not None and len(nodes) > max_nodes:
+        return G.subgraph(nodes[:max_nodes]), True
+
+    inside = set(nodes)
+    for node in list(nodes):
+        for neighbour in G[node]:
+            if neighbour in inside:
+                continue
+            if max_nodes is not None and len(nodes) >= max_nodes:
+                return G.subgraph(nodes), True
+            inside.add(neighbour)
+            nodes.append(neighbour)
+    return G.subgraph(nodes), False
+
+
+# ============================
+# EGO SUBGRAPH INDEX
+# ============================
+# Perkiraan memori lapisan BFS + set node terkunjungi per node, diukur dengan tracemalloc
+EGO_BYTES_PER_NODE = 50
+
+
+class NeighbourhoodIndex:
+    # Menyimpan lapisan BFS per node pusat, sekali per graf. Lapisan hanya diperluas
+    # sejauh radius yang diminta (dan berhenti begitu melebihi max_nodes), jadi radius
+    # kecil tidak menelusuri seluruh komponen. Hanya max_centers pusat terakhir disimpan.
+
+    def __init__(self, G: nx.Graph, max_radius: int = 10, max_centers: int = 32):
+        self.G = G
+        self.max_radius = max_radius
+        self.max_centers = max_centers
+        self._layers = OrderedDict()  # center -> (lapisan, node yang sudah dikunjungi)
+        self.nbytes = 0
+
+    def layers(self, center, radius: int = None, max_nodes: int = None):
+        radius = self.max_radius if radius is None else min(radius, self.max_radius)
+        if center not in self.G:
+            raise nx.NodeNotFound(f"Node {center} tidak ada di graf")
+        if center in self._layers:
+            self._layers.move_to_end(center)
+            layers, seen = self._layers[center]
+        else:
+            layers, seen = [[center]], {center}
+            self._layers[center] = (layers, seen)
+            self.nbytes += EGO_BYTES_PER_NODE
+            while len(self._layers) > self.max_centers:
+                _, (_, evicted) = self._layers.popitem(last=False)
+                self.nbytes -= EGO_BYTES_PER_NODE * len(evicted)
+
+        # Urutan node per lapisan sama dengan nx.bfs_layers
+        while len(layers) <= radius and layers[-1] and (max_nodes is None or len(seen) <= max_nodes):
+            layer = []
+            for node in layers[-1]:
+                for neighbour in self.G[node]:
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        layer.append(neighbour)
+            layers.append(layer)
+            self.nbytes += EGO_BYTES_PER_NODE * len(layer)
+        return [layer for layer in layers[:radius + 1] if layer]
+
+    def ego_nodes(self, center, radius: int, max_nodes: int = None):
+        # Hasil: (daftar node, truncated). Node diambil per lapisan terdekat dulu
+        nodes = []
+        for layer in self.layers(center, radius, max_nodes):
+            if max_nodes is not None and len(nodes) + len(layer) > max_nodes:
+                nodes.extend(layer[:max_nodes - len(nodes)])
+                return nodes, True
+            nodes.extend(layer)
+        return nodes, False
+
+    def ego_graph(self, center, radius: int, max_nodes: int = None):
+        with span("ego_graph", radius=radius):
+            nodes, truncated = self.ego_nodes(center, radius, max_nodes)
+            return self.G.subgraph(nodes), truncated
+
+
+# ============================
+# INCREMENTAL CLAIM GRAPH
+# ============================
+# Perkiraan memori set node komponen + index node -> komponen, diukur dengan tracemalloc
+COMPONENT_BYTES_PER_NODE = 60
+
+
+class ClaimGraph:
+    # Graf klaim yang bisa ditambah/dikurangi klaim tanpa rebuild.
+    # Hasil degree, betweenness dan komunitas di-cache per komponen terhubung;
+    # perubahan hanya menandai node yang tersentuh (dirty) sehingga yang dihitung
+    # ulang hanya komponen yang terdampak.
+    # Satu instance dibagi antar sesi (GraphCache/st.cache_resource): mutasi, refresh
+    # dan lookup yang mengisi cache komponen dijalankan di bawah satu RLock.
+    # Akses langsung ke .G tidak dikunci; jangan dipakai bersamaan dengan mutasi.
+    # derived_nbytes = perkiraan memori cache turunan (bertambah seiring lookup),
+    # dipakai GraphCache untuk mengukur ulang entri.
+
+    def __init__(self, df: pd.DataFrame = None):
+        self.G = nx.Graph()
+        self._claims = {}            # claim_id -> [(participant, faskes, dpjp, icd), ...] per baris
+        self._node_refs = Counter()  # node -> jumlah klaim yang memakainya
+        self._edge_refs = Counter()  # (src, dst) -> jumlah klaim yang memakainya
+        self._dirty = set()
+        self._node_component = {}    # node -> id komponen
+        self._components = {}        # id komponen -> {"nodes": set, ...cache}
+        self._next_component = 0
+        self._ego_index = None
+        self._component_nbytes = 0   # jumlah "sizes" semua komponen
+        self._lock = threading.RLock()
+
+        if df is not None:
+            self.add_claims(df)
+
+    @property
+    def dirty_nodes(self):
+        with self._lock:
+            return frozenset(self._dirty)
+
+    @property
+    def derived_nbytes(self):
+        # Dibaca tanpa lock: cukup sebagai perkiraan untuk batas memori cache
+        ego_index = self._ego_index
+        return self._component_nbytes + (ego_index.nbytes if ego_index is not None else 0)
+
+    # ----- mutasi -----
+    @traced("claim_graph.add_claims")
+    def add_claims(self, df: pd.DataFrame):
+        # Setiap baris menambah referensi node/edge-nya, sama dengan build_claim_graph:
+        # claim_id yang muncul di beberapa baris (mis. satu diagnosis/DPJP per baris)
+        # menjadi gabungan semua barisnya. Mengganti klaim lewat update_claims.
+        if df[REQUIRED_COLUMNS].isnull().any().any():
+            raise ValueError("Dataframe memiliki nilai kosong di salah satu kolom yang dibutuhkan")
+
+        cols = _node_columns(df)
+        fraud = df['fraud_prediction'].to_numpy(dtype=object)
+        with self._lock:
+            for claim_id, participant, faskes, dpjp, icd, fraud_prediction in zip(*cols, fraud):
+                nodes = (claim_id, participant, faskes, dpjp, icd)
+                for (node_type, _), node in zip(NODE_LAYOUT, nodes):
+                    if self._node_refs[node] == 0:
+                        self.G.add_node(node, type=node_type)
+                    self._node_refs[node] += 1
+                # Atribut fraud: nilai baris terakhir yang menang, sama dengan build_claim_graph
+                self.G.nodes[claim_id]["fraud"] = fraud_prediction
+                for src, dst, relation in EDGE_LAYOUT:
+                    edge = (nodes[src], nodes[dst])
+                    if self._edge_refs[edge] == 0:
+                        self.G.add_edge(*edge, relation=relation)
+                    self._edge_refs[edge] += 1
+                self._claims.setdefault(claim_id, []).append(nodes[1:])
+                self._dirty.update(nodes)
+            self._ego_index = None
+
+    def update_claims(self, df: pd.DataFrame):
+        # Klaim di df menggantikan semua baris lama dengan claim_id yang sama
+        with self._lock:
+            self.remove_claims(df['claim_id'].unique())
+            self.add_claims(df)
+
+    def remove_claims(self, claim_ids):
+        with self._lock:
+            for claim_id in claim_ids:
+                for row in self._claims.pop(claim_id, ()):
+                    self._remove_row((claim_id,) + row)
+            self._ego_index = None
+
+    def ego_graph(self, center, radius: int, max_nodes: int = None):
+        # Subgraf di sekitar center memakai NeighbourhoodIndex (dibuat ulang setelah mutasi)
+        with self._lock:
+            if self._ego_index is None:
+                self._ego_index = NeighbourhoodIndex(self.G)
+            return self._ego_index.ego_graph(center, radius, max_nodes)
+
+    def _remove_row(self, nodes):
+        for src, dst, _ in EDGE_LAYOUT:
+            edge = (nodes[src], nodes[dst])
+            self._edge_refs[edge] -= 1
+            if self._edge_refs[edge] == 0:
+                del self._edge_refs[edge]
+                self.G.remove_edge(*edge)
+        for node in nodes:
+            self._node_refs[node] -= 1
+            if self._node_refs[node] == 0:
+                del self._node_refs[node]
+                self.G.remove_node(node)
+        self._dirty.update(nodes)
+
+    # ----- komponen & cache -----
+    def refresh(self):
+        # Hitung ulang hanya komponen yang berisi node dirty
+        with self._lock:
+            if not self._dirty:
+                return
+            pending = set()
+            for node in self._dirty:
+                cid = self._node_component.pop(node, None)
+                component = self._components.pop(cid, None) if cid is not None else None
+                if component is not None:
+                    self._component_nbytes -= sum(component["sizes"].values())
+                    for member in component["nodes"]:
+                        self._node_component.pop(member, None)
+                    pending.update(component["nodes"])
+                pending.add(node)
+
+            pending.intersection_update(self.G.nodes)
+            while pending:
+                nodes = nx.node_connected_component(self.G, pending.pop())
+                pending.difference_update(nodes)
+                cid = self._next_component
+                self._next_component += 1
+                # sizes: key cache -> perkiraan nbytes (termasuk set node & index node -> komponen)
+                self._components[cid] = {"nodes": nodes, "sizes": {"nodes": COMPONENT_BYTES_PER_NODE * len(nodes)}}
+                self._component_nbytes += COMPONENT_BYTES_PER_NODE * len(nodes)
+                for member in nodes:
+                    self._node_component[member] = cid
+
+            self._dirty.clear()
+
+    def _cache_in_component(self, component, key, value, nbytes: int):
+        # Dipanggil dengan self._lock sudah dipegang; simpan hasil turunan beserta
+        # perkiraan memorinya (menggantikan nilai lama dengan key yang sama)
+        self._component_nbytes += nbytes - component["sizes"].get(key, 0)
+        component["sizes"][key] = nbytes
+        component[key] = value
+        return value
+
+    def _component_of(self, node):
+        # Dipanggil dengan self._lock sudah dipegang
+        self.refresh()
+        cid = self._node_component.get(node)
+        return None if cid is None else self._components[cid]
+
+    def degree_centrality(self, node):
+        with self._lock:
+            n = self.G.number_of_nodes()
+            component = self._component_of(node)
+            if component is None or n <= 1:
+                return 0
+            if "degree" not in component:
+                self._cache_in_component(
+                    component, "degree", dict(self.G.degree(component["nodes"])),
+                    CENTRALITY_BYTES_PER_NODE * len(component["nodes"]),
+                )
+            return component["degree"][node] / (n - 1)
+
+    def betweenness_centrality(self, node):
+        # Betweenness hanya bergantung pada komponen node; normalisasi memakai n global
+        with self._lock:
+            n = self.G.number_of_nodes()
+            component = self._component_of(node)
+            if component is None or n <= 2:
+                return 0
+            if "betweenness" not in component:
+                with span("betweenness", mode="component", nodes=len(component["nodes"])):
+                    self._cache_in_component(
+                        component, "betweenness",
+                        nx.betweenness_centrality(self.G.subgraph(component["nodes"]), normalized=False),
+                        CENTRALITY_BYTES_PER_NODE * len(component["nodes"]),
+                    )
+            return component["betweenness"][node] * 2 / ((n - 1) * (n - 2))
+
+    def community_score(self, node, method: str = "greedy", seed: int = 42):
+        # Komunitas dideteksi per komponen (komunitas tidak melintasi komponen).
+        # Modularity global = jumlah modularity per komponen dengan resolution m_k / m,
+        # jadi hasilnya setara dengan deteksi di seluruh graf. m global ikut berubah
+        # saat komponen lain ditambah/dikurangi, jadi hasil disimpan bersama m yang
+        # dipakai dan dihitung ulang bila m berbeda.
+        with self._lock:
+            component = self._component_of(node)
+            if component is None:
+                return 0
+            key = ("communities", method, seed)
+            m = self.G.number_of_edges()
+            cached = component.get(key)
+            if cached is None or cached[0] != m:
+                subgraph = self.G.subgraph(component["nodes"])
+                communities = detect_communities(
+                    subgraph, method=method, seed=seed, use_cache=False,
+                    resolution=subgraph.number_of_edges() / max(m, 1),
+                )
+                cached = self._cache_in_component(
+                    component, key, (m, communities), COMMUNITY_BYTES_PER_NODE * len(component["nodes"])
+                )
+            return community_score_of(cached[1], node)
+
+    def graph_risk(self, faskes_id: str, community: str = "greedy", seed: int = 42):
+        # Ketiga skor dibaca dari versi graf yang sama (mutasi menunggu di lock)
+        faskes_node = f"FSK_{faskes_id}"
+        with self._lock:
+            if faskes_node not in self.G.nodes:
+                return None
+
+            bet = self.betweenness_centrality(faskes_node)
+            deg = self.degree_centrality(faskes_node)
+            community_score = self.community_score(faskes_node, method=community, seed=seed)
+
+        return {
+            "betweenness": bet,
+            "degree": deg,
+            "community_score": community_score,
+            "final_risk": round(_final_risk(bet, deg, community_score), 2),
+            "betweenness_error": 0.0,
+        }
@@ -1,10 +1,21 @@
 import streamlit as st
 import pandas as pd
-from pyvis.network import Network
-import networkx as nx
-from network_analysis import build_claim_graph, calculate_graph_risk
+from network_analysis import (
+    ClaimGraph, build_claim_graph, calculate_graph_risk_parallel, expand_super_node,
+    summarize_graph,
+)
+from graph_cache import GraphCache, dataset_hash
+from graph_render import graph_page_html, render_graph_body, render_summary_body
+from backend_client import LONG_TIMEOUT, get_backend_client
+from explanations import PAGE_SIZES, ExplanationIndex, fetch_page
+from ingestion import read_claims, to_csv_bytes
+from result_store import ResultStore, content_hash
+import io
 import requests
-import json
+import perf
+
+st.set_page_config(layout="wide", page_title="Network Analytics")
+perf_run = perf.begin_page("Network_Analytics")
 
 if "inference_done" not in st.session_state:
     st.session_state.inference_done = False
@@ -18,8 +29,140 @@ if "df_uploaded" not in st.session_state:
 if "predictions_url" not in st.session_state:
     st.session_state.predictions_url = None
 
+if "faskes_leaderboard" not in st.session_state:
+    st.session_state.faskes_leaderboard = None
+
+if "explanations_url" not in st.session_state:
+    st.session_state.explanations_url = None
+
+if "artifact_versions" not in st.session_state:
+    st.session_state.artifact_versions = None
+
+if "store_key" not in st.session_state:
+    st.session_state.store_key = None  # hash isi upload, key di result store
+    st.session_state.from_store = False
+
+if "dataset_hash" not in st.session_state:
+    st.session_state.dataset_hash = None
+
+if "explanation_index" not in st.session_state:
+    st.session_state.explanation_index = None  # fallback bila backend tidak mendukung paging
+    st.session_state.explanation_pages = {}
+    st.session_state.explanation_labels = set()
+
 API_BASE = st.secrets["API_BASE"] #st.secrets["API_BASE"]"http://localhost:8989"
-st.set_page_config(layout="wide", page_title="Network Analytics")
+GRAPH_CACHE_MAX_MB = 1024
+EGO_MAX_NODES = 2000  # batas node yang dirender pyvis
+# Label mode tampilan graf -> mode summarize_graph (None = ego graph node mentah)
+VIEW_MODES = {
+    "Ego graph": None,
+    "Ringkasan komunitas": "community",
+    "Ringkasan tipe node": "type",
+}
+EXPLANATION_PAGE_CACHE = 50  # halaman penjelasan yang disimpan per sesi
+
+
+@st.cache_resource
+def get_graph_cache():
+    # Satu cache untuk semua sesi: file yang sama tidak dibangun ulang
+    return GraphCache(max_bytes=GRAPH_CACHE_MAX_MB * 1024 ** 2)
+
+
+@st.cache_resource
+def get_result_store():
+    # Store di disk: hasil inference & risiko tetap ada setelah server restart
+    return ResultStore()
+
+
+graph_cache = get_graph_cache()
+result_store = get_result_store()
+backend = get_backend_client()
+
+
+@perf.traced("load_inference_artifacts")
+def load_inference_artifacts():
+    # Prediksi diunduh sekali; rerun berikutnya memakai cache client, yang hanya
+    # merevalidasi via ETag setelah TTL habis. Parsing dan merge ke data upload
+    # hanya diulang bila isi artefak berubah. Penjelasan diambil per halaman.
+    artifacts = backend.fetch_artifacts({
+        "predictions": st.session_state.predictions_url,
+    })
+    versions = {name: artifact["version"] for name, artifact in artifacts.items()}
+    if versions == st.session_state.artifact_versions:
+        return
+
+    df_match = pd.read_csv(io.BytesIO(artifacts["predictions"]["content"]))
+    set_predictions(df_match)
+    st.session_state.artifact_versions = versions
+    if st.session_state.store_key is not None:
+        artifact = artifacts["predictions"]
+        result_store.save_predictions(
+            st.session_state.store_key, df_match, artifact["etag"] or content_hash(artifact["content"])
+        )
+
+
+def set_predictions(df_match: pd.DataFrame):
+    st.session_state.df_match = df_match
+    st.session_state.df_merged = st.session_state.df_uploaded.merge(
+        df_match[['claim_id', 'fraud_prediction']],
+        on='claim_id',
+        how='left'
+    )
+    st.session_state.dataset_hash = None
+
+
+@perf.traced("revalidate_stored_predictions")
+def revalidate_stored_predictions(key: str, version: str):
+    # Prediksi tersimpan dicek sekali ke backend (If-None-Match, seperti artefak
+    # di client). 304 -> tetap dipakai; isi baru -> prediksi diganti dan hasil
+    # turunan di store dihapus. Backend tidak terjangkau -> salinan lokal dipakai.
+    try:
+        response = backend.get(
+            st.session_state.predictions_url,
+            headers={"If-None-Match": version} if version else {},
+        )
+    except requests.RequestException:
+        st.warning("Backend tidak terjangkau: memakai hasil tersimpan tanpa validasi ulang.")
+        return None
+    if response.status_code == 304:
+        return None
+    if response.status_code != 200:
+        st.warning(f"Prediksi tersimpan tidak bisa divalidasi ulang (HTTP {response.status_code}).")
+        return None
+
+    new_version = response.headers.get("ETag") or content_hash(response.content)
+    if new_version == version:
+        return None
+    df_match = pd.read_csv(io.BytesIO(response.content))
+    result_store.save_predictions(key, df_match, new_version)
+    return df_match
+
+
+def restore_from_store(key: str):
+    # Dataset yang pernah diproses: upload, prediksi & penjelasan dibaca dari
+    # Parquet; prediksi hanya direvalidasi (biasanya 304) tanpa inference ulang.
+    # Hasil: False bila belum tersimpan lengkap atau sudah kedaluwarsa.
+    stored = result_store.load_dataset(key)
+    if stored is None:
+        return False
+
+    st.session_state.df_uploaded = stored["df"]
+    result = stored["inference_results"]
+    st.session_state.inference_results = result
+    st.session_state.predictions_url = API_BASE + "/" + result["predictions_url"]
+    st.session_state.explanations_url = API_BASE + "/" + result["explanations_url"]
+    df_match = revalidate_stored_predictions(key, stored["predictions_version"])
+    set_predictions(stored["predictions"] if df_match is None else df_match)
+    explanations = result_store.load_table(key, "explanations")
+    if explanations is not None:
+        index = ExplanationIndex(explanations.to_dict("records"))
+        st.session_state.explanation_index = index
+        st.session_state.explanation_labels = set(index.labels())
+    st.session_state.store_key = key
+    st.session_state.from_store = True
+    st.session_state.inference_done = True
+    return True
+
 
 st.title("🕸️ Fraud Network Analysis")
 st.caption("Analisis hubungan antar Faskes, Peserta, Perusahaan, DPJP & Diagnosis")
@@ -27,36 +170,22 @@ st.caption("Analisis hubungan antar Faskes, Peserta, Perusahaan, DPJP & Diagnosi
 # =============================
 # Upload CSV
 # =============================
-# Safe CSV reader
-def safe_read_csv(file):
-    # Coba delimiter umum
-    for sep in [",", ";", "\t", "|"]:
-        try:
-            df = pd.read_csv(file, sep=sep, engine="python", encoding="utf-8")
-            if len(df.columns) > 1:
-                return df
-        except:
-            pass
-
-    # Coba encoding lain
-    for enc in ["latin-1", "utf-16", "ISO-8859-1"]:
-        try:
-            df = pd.read_csv(file, sep=",", engine="python", encoding=enc)
-            if len(df.columns) > 1:
-                return df
-        except:
-            pass
+uploaded = st.file_uploader("Upload file klaim (CSV/Parquet)", type=["csv", "parquet"])
 
-    return None
+if uploaded and not st.session_state.inference_done:
 
+    st.write("File uploaded:", uploaded.name)
 
-uploaded = st.file_uploader("Upload file CSV klaim", type=["csv"])
+    # File yang sama (hash isi) sudah pernah diproses dengan versi model yang
+    # sama: muat dari result store. MODEL_VERSION dinaikkan setelah model dilatih ulang.
+    upload_key = content_hash(uploaded.getvalue(), st.secrets.get("MODEL_VERSION", ""))
+    if restore_from_store(upload_key):
+        st.success("Hasil inference dimuat dari penyimpanan lokal. Silakan pilih faskes di bawah.")
 
 if uploaded and not st.session_state.inference_done:
 
-    st.write("File uploaded:", uploaded.name)
-
-    df = pd.read_csv(uploaded)
+    # Sniff delimiter & encoding lalu parse sekali (pyarrow); Parquet juga diterima
+    df = read_claims(uploaded, uploaded.name)
     st.session_state.df_uploaded = df
     
 
@@ -67,10 +196,14 @@ if uploaded and not st.session_state.inference_done:
     # 🔥 Hanya jalankan sekali
     # =============================
     with st.spinner("Mengirim file ke backend dan memproses..."):
-        files = {"file": (uploaded.name, uploaded.getvalue(), "text/csv")}
+        # Backend menerima CSV; Parquet dikonversi dulu
+        if uploaded.name.lower().endswith(".parquet"):
+            files = {"file": (uploaded.name.rsplit(".", 1)[0] + ".csv", to_csv_bytes(df), "text/csv")}
+        else:
+            files = {"file": (uploaded.name, uploaded.getvalue(), "text/csv")}
         
         try:
-            response = requests.post(f"{API_BASE}/inference_graph", files=files)
+            response = backend.post("/inference_graph", files=files, timeout=LONG_TIMEOUT)
         except Exception as e:
             st.error(f"Request error: {e}")
             st.stop()
@@ -81,12 +214,13 @@ if uploaded and not st.session_state.inference_done:
 
         # Simpan hasil
         result = response.json()
-        predictions_url = API_BASE + "/" + result["predictions_url"]
-        st.session_state.predictions_url = predictions_url
-        
-        df_match = pd.read_csv(predictions_url) 
-        st.session_state.df_match = df_match
-        
+        st.session_state.predictions_url = API_BASE + "/" + result["predictions_url"]
+        st.session_state.explanations_url = API_BASE + "/" + result["explanations_url"]
+        # report_url       = API_BASE + result["report_url"]
+        result_store.save_dataset(upload_key, uploaded.name, df, result)
+        st.session_state.store_key = upload_key
+        load_inference_artifacts()
+
         st.session_state.inference_results = result
         st.session_state.inference_done = True
 
@@ -94,16 +228,42 @@ if uploaded and not st.session_state.inference_done:
 
 if st.session_state.inference_done:
 
-    df = st.session_state.df_uploaded
-    predictions_url = st.session_state.predictions_url  # ✅ ambil dari session_state
-    df_match =  st.session_state.get("df_match") 
-    df = df.merge(
-        df_match[['claim_id', 'fraud_prediction']], 
-        on='claim_id', 
-        how='left'
-    )
+    # ✅ ambil dari session_state; merge dengan prediksi sudah dihitung sekali.
+    # Dataset dari result store tidak memerlukan backend.
+    if not st.session_state.from_store:
+        load_inference_artifacts()
+    df = st.session_state.df_merged
     result = st.session_state.inference_results
 
+    # Key cache graf: hash isi dataset (sudah termasuk fraud_prediction)
+    if st.session_state.dataset_hash is None:
+        st.session_state.dataset_hash = dataset_hash(df)
+    data_key = st.session_state.dataset_hash
+    store_key = st.session_state.store_key
+
+    # =============================
+    # LEADERBOARD RISIKO FASKES
+    # =============================
+    st.subheader("🏆 Leaderboard Risiko Faskes")
+
+    if st.button("Hitung risiko semua faskes"):
+        # Betweenness dibagi per sumber BFS ke beberapa proses; RISK_WORKERS kosong = semua CPU
+        with st.spinner("Menghitung centrality & komunitas untuk seluruh graf..."):
+            st.session_state.faskes_leaderboard = graph_cache.get_or_compute(
+                (data_key, "leaderboard"),
+                lambda: result_store.get_or_compute_table(
+                    store_key, "leaderboard",
+                    lambda: calculate_graph_risk_parallel(
+                        build_claim_graph(df), centrality="approx", community="louvain",
+                        workers=st.secrets.get("RISK_WORKERS"),
+                    ),
+                ),
+            )
+
+    if st.session_state.faskes_leaderboard is not None:
+        # Tabel bisa di-sort dengan klik header kolom
+        st.dataframe(st.session_state.faskes_leaderboard, use_container_width=True, hide_index=True)
+
     # Opsi untuk memilih Faskes ID
     st.subheader("🏥 Pilih Faskes untuk Analisis Risiko")
 
@@ -113,80 +273,171 @@ if st.session_state.inference_done:
     # Slider untuk memilih radius
     radius = st.slider("Pilih Radius untuk Subgraph", min_value=1, max_value=10, value=5, step=1)
 
+    # Membangun graf klaim sekali per (dataset, Faskes ID); rerun (ganti node/radius)
+    # dan sesi lain dengan file yang sama memakai ulang graf dari cache.
     # Filtering lokal (tidak trigger inference lagi)
-    filtered_df = df[df['faskes_id'] == selected_faskes]
-
-    # Membangun graf klaim setelah pemilihan Faskes ID
-    G = build_claim_graph(filtered_df)
-
-    # Pilih node untuk pusat graf setelah G dibentuk
-    nodes_in_graph = sorted([node for node in G.nodes])  # Mengurutkan node berdasarkan abjad
-    selected_node = st.selectbox("Pilih Node untuk Pusat Graf", nodes_in_graph)
+    with perf.span("claim_graph", faskes=selected_faskes):
+        claim_graph = graph_cache.get_or_compute(
+            (data_key, selected_faskes, "graph"),
+            lambda: ClaimGraph(df[df['faskes_id'] == selected_faskes]),
+        )
+    G = claim_graph.G
+
+    with perf.span("graph_risk", faskes=selected_faskes):
+        risk = graph_cache.get_or_compute(
+            (data_key, selected_faskes, "risk"),
+            lambda: result_store.get_or_compute_result(
+                store_key, f"risk:{selected_faskes}",
+                lambda: claim_graph.graph_risk(selected_faskes, community="louvain"),
+            ),
+        )
+    if risk is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Final Risk", f"{risk['final_risk']:.2f}")
+        col2.metric("Betweenness", f"{risk['betweenness']:.4f}")
+        col3.metric("Degree", f"{risk['degree']:.4f}")
+        col4.metric("Community Score", f"{risk['community_score']}")
+
+    # Mode tampilan: ego graph node mentah, atau ringkasan super-node (komunitas /
+    # tipe node) yang ukurannya tidak bergantung pada volume klaim faskes
+    view_mode = st.radio("Mode tampilan graf", list(VIEW_MODES), horizontal=True)
+    summary_by = VIEW_MODES[view_mode]
+
+    if summary_by is None:
+        # Pilih node untuk pusat graf setelah G dibentuk
+        nodes_in_graph = sorted([node for node in G.nodes])  # Mengurutkan node berdasarkan abjad
+        selected_node = st.selectbox("Pilih Node untuk Pusat Graf", nodes_in_graph)
 
     # Render Subgraph
-    if selected_faskes:
+    if selected_faskes and summary_by is None:
         st.subheader("🕸️ Visualisasi Graf Kolusi (Subgraph)")
 
         # Periksa apakah node yang dipilih ada di graf
         if selected_node in G.nodes:
-            # Buat subgraf berdasarkan radius yang dipilih
-            subG = nx.ego_graph(G, selected_node, radius=radius)
-
-            # Setup Visualisasi menggunakan pyvis
-            nt = Network(
-                height="700px",
-                width="100%",
-                bgcolor="#ffffff",
-                font_color="black",
-                directed=False
+            # Buat subgraf berdasarkan radius yang dipilih (lapisan BFS di-index sekali)
+            # lalu render pyvis di memori; yang di-cache per (graf, node, radius) hanya
+            # body graf, aset vis disisipkan sekali per halaman lewat graph_page_html
+            def render_subgraph():
+                subG, truncated = claim_graph.ego_graph(selected_node, radius, max_nodes=EGO_MAX_NODES)
+                return render_graph_body(subG), truncated
+
+            with perf.span("subgraph_html", radius=radius):
+                graph_body, truncated = graph_cache.get_or_compute(
+                    (data_key, selected_faskes, selected_node, radius, "body"), render_subgraph
+                )
+            if truncated:
+                st.warning(
+                    f"Subgraf dipotong menjadi {EGO_MAX_NODES:,} node terdekat. "
+                    "Kecilkan radius untuk melihat graf lengkap."
+                )
+
+            st.components.v1.html(graph_page_html(graph_body), height=700)
+
+    elif selected_faskes:
+        st.subheader("🕸️ Ringkasan Graf Kolusi (Super-node)")
+
+        with perf.span("graph_summary", by=summary_by):
+            summary, members = graph_cache.get_or_compute(
+                (data_key, selected_faskes, summary_by, "summary"),
+                lambda: summarize_graph(G, by=summary_by, community="louvain"),
+            )
+            summary_body = graph_cache.get_or_compute(
+                (data_key, selected_faskes, summary_by, "summary_body"),
+                lambda: render_summary_body(summary),
+            )
+        st.caption(
+            f"{G.number_of_nodes():,} node diringkas menjadi {summary.number_of_nodes():,} super-node. "
+            "Warna = rasio klaim fraud, tebal edge = jumlah edge asli."
+        )
+        st.components.v1.html(graph_page_html(summary_body), height=700)
+
+        # Tabel super-node, rasio fraud tertinggi dulu
+        super_nodes = sorted(summary.nodes(data=True), key=lambda item: (-item[1]["fraud_ratio"], -item[1]["size"]))
+        st.dataframe(
+            [
+                {
+                    "super-node": node,
+                    "node": data["size"],
+                    "klaim": data["claims"],
+                    "klaim fraud": data["fraud_claims"],
+                    "rasio fraud": round(data["fraud_ratio"], 3),
+                    **{kind: data["counts"].get(kind, 0) for kind in ["participant", "dpjp", "icd"]},
+                }
+                for node, data in super_nodes
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        # Drill-down: satu super-node sekaligus (anggota + tetangga langsung)
+        drill_node = st.selectbox("Drill-down super-node", [node for node, _ in super_nodes])
+        with perf.span("drill_down_html", super_node=drill_node):
+            def render_drill_down():
+                subG, truncated = expand_super_node(G, members[drill_node], max_nodes=EGO_MAX_NODES)
+                return render_graph_body(subG), truncated
+
+            drill_body, truncated = graph_cache.get_or_compute(
+                (data_key, selected_faskes, summary_by, drill_node, "drill_body"), render_drill_down
             )
-            nt.barnes_hut(gravity=-20000, central_gravity=0)
-            nt.toggle_physics(False)
-
-            # Menambahkan node ke dalam visualisasi
-            for node, data in subG.nodes(data=True):
-                node_type = data.get("type", "")
-                fraud = data.get("fraud", 0)  # Ambil nilai fraud dari node (claim)
-
-                # Menentukan warna dan simbol berdasarkan jenis node dan fraud
-                if node_type == "faskes":
-                    color, shape, size = "#ff6666", "dot", 20
-                elif node_type == "participant":
-                    color, shape, size = "#66b3ff", "dot", 10
-                elif node_type == "dpjp":
-                    color, shape, size = "#99ff99", "diamond", 14
-                elif node_type == "icd":
-                    color, shape, size = "#ffcc66", "triangle", 14
-                elif node_type == "claim":
-                    # Jika fraud_prediction == 1, set warna hitam dan bentuk simbol khusus
-                    if fraud == 1:
-                        color, shape, size = "black", "star", 18
-                    else:
-                        color, shape, size = "#ff99ff", "star", 18
-                else:
-                    color, shape, size = "#cccccc", "dot", 8
-
-                nt.add_node(node, label=node, color=color, shape=shape, size=size)
-
-            # Menambahkan edge ke dalam visualisasi
-            for src, dst, data in subG.edges(data=True):
-                nt.add_edge(src, dst)
-
-            # Simpan graf dan tampilkan
-            nt.save_graph("graph.html")
-            st.components.v1.html(open("graph.html").read(), height=700)
+        if truncated:
+            st.warning(
+                f"Drill-down dipotong menjadi {EGO_MAX_NODES:,} node "
+                "(anggota dengan derajat terbesar didahulukan)."
+            )
+        st.components.v1.html(graph_page_html(drill_body), height=700)
 
     # =============================
-    # LOAD RESULTS (Tidak POST ulang)
+    # LOAD RESULTS (Tidak POST / download ulang)
     # =============================
-    predictions_url = API_BASE + "/" + result["predictions_url"]
-    explanations_url = API_BASE +"/" + result["explanations_url"]
-    # report_url       = API_BASE + result["report_url"]
-
     st.subheader("📌 Explanation Results")
-    explanations = requests.get(explanations_url).json()
-    # Iterasi melalui setiap item penjelasan
-    for item in explanations:
+
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        claim_query = st.text_input("Cari Claim ID").strip()
+    with col2:
+        label_options = ["Semua"] + sorted(st.session_state.explanation_labels, key=str)
+        prediction_selected = st.selectbox("Prediction", label_options)
+        prediction_filter = None if prediction_selected == "Semua" else prediction_selected
+    with col3:
+        min_confidence = st.slider("Confidence minimum (%)", min_value=0, max_value=100, value=0, step=5) / 100
+    with col4:
+        page_size = st.selectbox("Per halaman", PAGE_SIZES, index=1)
+
+    page_number = st.number_input("Halaman", min_value=1, value=1, step=1)
+    filters = {"claim_query": claim_query, "prediction": prediction_filter, "min_confidence": min_confidence}
+
+    def load_explanation_page(offset):
+        # Backend dengan paging: ambil hanya halaman ini (di-cache per parameter).
+        # Backend lama: list lengkap diambil sekali lalu difilter & dipotong lokal.
+        if st.session_state.explanation_index is not None:
+            return st.session_state.explanation_index.page(offset, page_size, **filters)
+        key = (offset, page_size, claim_query, prediction_filter, min_confidence)
+        if key not in st.session_state.explanation_pages:
+            page = fetch_page(backend, st.session_state.explanations_url, offset, page_size, **filters)
+            if not page["paged"]:
+                index = ExplanationIndex(page["items"])
+                if store_key is not None:
+                    result_store.save_table(store_key, "explanations", pd.DataFrame(page["items"]))
+                st.session_state.explanation_index = index
+                st.session_state.explanation_labels = set(index.labels())
+                return index.page(offset, page_size, **filters)
+            pages = st.session_state.explanation_pages
+            if len(pages) >= EXPLANATION_PAGE_CACHE:
+                pages.pop(next(iter(pages)))
+            pages[key] = page
+            st.session_state.explanation_labels.update(item["prediction"] for item in page["items"])
+        return st.session_state.explanation_pages[key]
+
+    page = load_explanation_page((page_number - 1) * page_size)
+    n_pages = max((page["total"] + page_size - 1) // page_size, 1)
+    if page_number > n_pages:
+        page_number = n_pages
+        page = load_explanation_page((page_number - 1) * page_size)
+
+    st.caption(f"{page['total']:,} klaim cocok — halaman {page_number} dari {n_pages}")
+
+    # Hanya item di halaman aktif yang dirender
+    for item in page["items"]:
         with st.expander(f"Claim ID: `{item['claim_id']}` — Prediction: **{item['prediction']}** ({item['confidence']*100:.1f}%)"):
             # Menampilkan penjelasan naratif
             st.markdown("#### 📖 Narrative Explanation")
@@ -198,8 +449,16 @@ if st.session_state.inference_done:
     # =============================
     st.subheader("📊 Predictions Table (CSV)")
 
-    df = pd.read_csv(predictions_url)   # CSV bisa langsung load dari URL
-    st.dataframe(df)
+    st.dataframe(st.session_state.df_match)
 
     st.success("Inference Completed!")
 
+# =============================
+# STATISTIK CACHE GRAF
+# =============================
+st.sidebar.subheader("🗄️ Graph Cache")
+st.sidebar.json(graph_cache.stats())
+st.sidebar.subheader("💾 Result Store")
+st.sidebar.json(result_store.stats())
+
+perf.end_page(perf_run, {"Latensi backend": backend.latency_stats(), "Graph cache": graph_cache.stats()})
@@ -0,0 +1,183 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+# Log JSON-lines (satu baris per span); kosong = tidak menulis log
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH")
+PROFILE_TOP_N = 25
+
+# Run aktif & kedalaman span per context: thread baru mulai tanpa run (seperti
+# thread-local), tapi task thread pool yang di-submit lewat submit() membawa
+# salinan context pemanggil sehingga span-nya masuk ke run halaman
+_run = contextvars.ContextVar("perf_run", default=None)
+_depth = contextvars.ContextVar("perf_depth", default=0)
+_log_lock = threading.Lock()
+
+
+# ============================
+# RUN & SPAN
+# ============================
+class PerfRun:
+    # Kumpulan span dari satu eksekusi script (satu rerun Streamlit)
+
+    def __init__(self, page: str, profile: bool = False, log_path: str = None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.page = page
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.thread = threading.current_thread().name
+        self.total_ms = None
+        self.profile_text = None
+        self.log_path = log_path if log_path is not None else PERF_LOG_PATH
+        self._profiler = None
+        if profile:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # profiler lain sedang aktif
+                self._profiler = None
+
+    @property
+    def finished(self):
+        return self.total_ms is not None
+
+    def finish(self):
+        # Idempoten: run yang terputus (st.stop) ditutup saat run berikutnya dimulai
+        if self.finished:
+            return self
+        self.total_ms = (time.perf_counter() - self.start) * 1000
+        if self._profiler is not None:
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            self.profile_text = out.getvalue()
+            self._profiler = None
+        if _run.get() is self:
+            _run.set(None)
+        self._write_log()
+        return self
+
+    def _write_log(self):
+        if not self.log_path:
+            return
+        base = {"run_id": self.run_id, "page": self.page, "ts": self.started_at}
+        lines = [json.dumps({**base, "span": "run", "ms": round(self.total_ms, 2)})]
+        lines += [json.dumps({**base, **span}, default=str) for span in self.spans]
+        with _log_lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def start_run(page: str, profile: bool = False, log_path: str = None):
+    # Span di thread ini (thread script Streamlit) dicatat ke run ini
+    run = PerfRun(page, profile=profile, log_path=log_path)
+    _run.set(run)
+    _depth.set(0)
+    return run
+
+
+def current_run():
+    return _run.get()
+
+
+def submit(pool, fn, *args, **kwargs):
+    # pool.submit di salinan context pemanggil (satu salinan per task): span di
+    # thread worker tercatat ke run yang sama, ter-nest di bawah span pemanggil.
+    # Worker ProcessPoolExecutor tidak bisa ikut; span-nya hilang (lihat panel).
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    # Catat durasi blok ke run aktif; tanpa run aktif (mis. benchmark) hanya no-op
+    run = current_run()
+    if run is None:
+        yield
+        return
+    depth = _depth.get()
+    record = {"span": name, "depth": depth, "offset_ms": round((time.perf_counter() - run.start) * 1000, 2), **attrs}
+    thread = threading.current_thread().name
+    if thread != run.thread:
+        record["thread"] = thread
+    _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        _depth.set(depth)
+        run.spans.append(record)  # list.append aman dari banyak thread
+
+
+def traced(name: str):
+    # Dekorator: seluruh pemanggilan fungsi jadi satu span
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ============================
+# PANEL STREAMLIT
+# ============================
+def begin_page(page: str):
+    # Dipanggil di awal page: tutup run sebelumnya yang terputus, baca opsi
+    # dari sidebar, lalu mulai run baru
+    import streamlit as st
+
+    previous = st.session_state.get("perf_run")
+    if previous is not None:
+        previous.finish()
+
+    panel = st.sidebar.toggle("⏱️ Perf panel", key="perf_panel")
+    profile = st.sidebar.toggle("cProfile", key="perf_profile", disabled=not panel)
+    run = start_run(page, profile=profile, log_path=st.secrets.get("PERF_LOG_PATH", PERF_LOG_PATH))
+    st.session_state.perf_run = run
+    return run
+
+
+def end_page(run: PerfRun, extras: dict = None):
+    # Tutup run lalu tampilkan span (berurutan, ter-indentasi sesuai nesting),
+    # cProfile dan statistik tambahan (latensi backend, cache graf) di sidebar
+    import streamlit as st
+
+    run.finish()
+    if not st.session_state.get("perf_panel"):
+        return
+
+    with st.sidebar.expander(f"⏱️ Perf — {run.total_ms:,.0f} ms", expanded=True):
+        rows = [
+            {
+                "span": "  " * s["depth"] + s["span"],
+                "ms": s["ms"],
+                "mulai (ms)": s["offset_ms"],
+                "thread": s.get("thread", ""),
+            }
+            for s in sorted(run.spans, key=lambda s: s["offset_ms"])
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Tidak ada span pada rerun ini.")
+        st.caption(
+            "Span dari thread pool (request paralel, batch stream) ikut tercatat dengan nama "
+            "thread-nya. Worker proses (risiko paralel) tidak tercatat per worker; durasinya "
+            "hanya terlihat di span pemanggil di proses utama."
+        )
+        for title, value in (extras or {}).items():
+            st.markdown(f"**{title}**")
+            st.json(value, expanded=False)
+        if run.profile_text:
+            st.markdown("**cProfile**")
+            st.code(run.profile_text, language="text")
@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import requests
+import streamlit as st
+
+API_URL = "https://wilayah.id/api"
+SNAPSHOT_PATH = Path(__file__).resolve().parent / "data" / "regions.json"
+REFRESH_TTL = 24 * 60 * 60  # detik
+REQUEST_TIMEOUT = (3, 10)
+RETRY_INTERVAL = 5 * 60  # jeda sebelum mencoba lagi setelah request gagal
+
+
+# ============================
+# DATA WILAYAH (PROVINSI & KABUPATEN)
+# ============================
+class RegionData:
+    # Data provinsi/kabupaten dari snapshot lokal (semua kabupaten ikut dibundel);
+    # lookup nama -> kode O(1). Thread script tidak pernah memanggil jaringan:
+    # refresh dari wilayah.id opsional, berjalan di thread latar dengan TTL.
+
+    def __init__(self, snapshot_path: Path = SNAPSHOT_PATH, ttl: float = REFRESH_TTL, remote: bool = True):
+        self.snapshot_path = Path(snapshot_path)
+        self.ttl = ttl
+        self.remote = remote
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._last_attempt = 0.0
+        self._load(self.snapshot_path)
+
+    # ----- snapshot -----
+    def _load(self, path: Path):
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self._apply(snapshot.get("provinces", []), snapshot.get("regencies", {}), snapshot.get("fetched_at"))
+
+    def _apply(self, provinces: list, regencies: dict, fetched_at):
+        # Index dibangun lengkap dulu lalu ditukar dalam satu assignment: pembaca
+        # (thread script) selalu melihat index lama atau baru, tidak pernah campuran
+        self._index = {
+            "provinces": provinces,
+            "regencies": dict(regencies),
+            "province_code": {p["name"]: p["code"] for p in provinces},
+            "regency_code": {
+                code: {r["name"]: r["code"] for r in items} for code, items in regencies.items()
+            },
+            "fetched_at": fetched_at,
+        }
+
+    @property
+    def fetched_at(self):
+        return self._index["fetched_at"]
+
+    def save_snapshot(self, path: Path = None):
+        path = Path(path or self.snapshot_path)
+        index = self._index
+        snapshot = {
+            "fetched_at": index["fetched_at"],
+            "provinces": index["provinces"],
+            "regencies": index["regencies"],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=1, ensure_ascii=False)
+            f.write("\n")
+
+    # ----- lookup -----
+    def provinces(self):
+        return self._index["provinces"]
+
+    def province_code(self, name: str):
+        return self._index["province_code"].get(name)
+
+    def regencies(self, province_code: str):
+        if not province_code:
+            return []
+        return self._index["regencies"].get(province_code, [])
+
+    def regency_code(self, province_code: str, name: str):
+        return self._index["regency_code"].get(province_code, {}).get(name)
+
+    # ----- refresh remote -----
+    def is_stale(self):
+        return self.fetched_at is None or time.time() - self.fetched_at > self.ttl
+
+    def refresh(self):
+        # Unduh ulang semua provinsi & kabupaten; data lama tetap dipakai bila gagal
+        provinces = _fetch("provinces.json")
+        regencies = {p["code"]: _fetch(f"regencies/{p['code']}.json") for p in provinces}
+        self._apply(provinces, regencies, time.time())
+
+    def refresh_async(self):
+        # Dipanggil tiap rerun; paling banyak satu thread refresh berjalan
+        if not self.remote or not self.is_stale():
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except requests.RequestException:
+                pass
+
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            if time.time() - self._last_attempt < RETRY_INTERVAL:
+                return
+            self._last_attempt = time.time()
+            self._refresh_thread = threading.Thread(target=run, name="region-refresh", daemon=True)
+            self._refresh_thread.start()
+
+
+def _fetch(path: str):
+    res = requests.get(f"{API_URL}/{path}", timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    return res.json()["data"]
+
+
+@st.cache_resource
+def get_region_data():
+    return RegionData(remote=st.secrets.get("REGION_REMOTE_REFRESH", True))
+
+
+if __name__ == "__main__":
+    # Perbarui snapshot lokal: python region_data.py
+    regions = RegionData(remote=True)
+    regions.refresh()
+    regions.save_snapshot()
+    print(f"{len(regions.provinces())} provinsi disimpan ke {regions.snapshot_path}")
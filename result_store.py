@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from perf import traced
+
+# Lokasi store; bisa dipindah lewat env (mis. ke volume persisten di server)
+RESULT_STORE_DIR = os.environ.get(
+    "RESULT_STORE_DIR", str(Path(__file__).resolve().parent / ".result_store")
+)
+# Dataset yang paling lama tidak dibuka dihapus bila jumlahnya melebihi batas ini
+MAX_DATASETS = 20
+# Dataset yang lebih tua dari ini (sejak inference) dianggap kedaluwarsa
+MAX_AGE_S = 7 * 24 * 3600
+SQLITE_TIMEOUT = 30
+# Naikkan bila skema berubah; store versi lama dikosongkan (isinya hanya cache)
+SCHEMA_VERSION = 2
+# Tabel dasar sebuah dataset; tabel lain (leaderboard, penjelasan) adalah hasil turunan
+BASE_TABLES = {"uploaded", "predictions"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    key TEXT PRIMARY KEY,
+    name TEXT,
+    n_rows INTEGER,
+    inference_results TEXT,
+    predictions_version TEXT,
+    created_at REAL,
+    last_used_at REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT,
+    name TEXT,
+    value TEXT,
+    created_at REAL,
+    PRIMARY KEY (key, name)
+);
+"""
+
+_MISSING = object()
+
+
+# ============================
+# HASH ISI UPLOAD
+# ============================
+def content_hash(data: bytes, model_version: str = ""):
+    # Key dataset: hash byte file yang diunggah (nama file tidak ikut) + versi model,
+    # supaya hasil dari model lama tidak dipakai lagi setelah model dilatih ulang
+    digest = hashlib.sha256(data)
+    if model_version:
+        digest.update(b"\0" + str(model_version).encode())
+    return digest.hexdigest()
+
+
+def _to_json(value):
+    # Nilai numpy (float64, int64) dari hasil risiko ikut diserialisasi
+    return json.dumps(value, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+
+
+# ============================
+# STORE PERSISTEN (PARQUET + SQLITE)
+# ============================
+class ResultStore:
+    # Menyimpan tabel (upload, prediksi, penjelasan, leaderboard) sebagai Parquet
+    # di <root>/<key>/<nama>.parquet dan index dataset + hasil kecil (JSON)
+    # di SQLite, sehingga dataset yang sama bisa dibuka ulang setelah restart
+    # server tanpa memanggil /inference_graph atau menghitung ulang risiko.
+    # Dataset baru dianggap lengkap setelah prediksinya disimpan (save_predictions).
+
+    def __init__(self, root: str = RESULT_STORE_DIR, max_datasets: int = MAX_DATASETS, max_age: float = MAX_AGE_S):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_datasets = max_datasets
+        self.max_age = max_age
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            stale_schema = conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION
+            if stale_schema:
+                conn.executescript("DROP TABLE IF EXISTS datasets; DROP TABLE IF EXISTS results;")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if stale_schema:
+            for path in self.root.iterdir():
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+
+    @contextmanager
+    def _connect(self):
+        # Satu koneksi per operasi: aman dipakai dari thread script Streamlit mana pun
+        conn = sqlite3.connect(self.root / "index.sqlite", timeout=SQLITE_TIMEOUT)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _table_path(self, key: str, name: str):
+        return self.root / key / f"{name}.parquet"
+
+    # ---------- dataset ----------
+    @traced("store_save_dataset")
+    def save_dataset(self, key: str, name: str, df: pd.DataFrame, inference_results: dict):
+        self.save_table(key, "uploaded", df)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, NULL, ?, ?)",
+                (key, name, len(df), _to_json(inference_results), now, now),
+            )
+        self.prune()
+
+    @traced("store_load_dataset")
+    def load_dataset(self, key: str):
+        # Hasil: {"name", "df", "predictions", "predictions_version", "inference_results"}
+        # atau None bila belum tersimpan lengkap / sudah kedaluwarsa
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT name, inference_results, predictions_version, created_at FROM datasets WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        name, inference_results, predictions_version, created_at = row
+        df = self.load_table(key, "uploaded")
+        predictions = self.load_table(key, "predictions")
+        # Kedaluwarsa atau file Parquet hilang: anggap tidak tersimpan
+        if time.time() - created_at > self.max_age or df is None or predictions is None:
+            self.delete_dataset(key)
+            return None
+        with self._connect() as conn:
+            conn.execute("UPDATE datasets SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        return {
+            "name": name,
+            "df": df,
+            "predictions": predictions,
+            "predictions_version": predictions_version,
+            "inference_results": json.loads(inference_results),
+        }
+
+    def save_predictions(self, key: str, df: pd.DataFrame, version: str):
+        # version: ETag artefak prediksi (atau hash isinya). Versi berubah -> semua
+        # hasil turunan (risiko, leaderboard, penjelasan) dihapus karena sudah basi.
+        with self._connect() as conn:
+            row = conn.execute("SELECT predictions_version FROM datasets WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return df
+        if row[0] is not None and row[0] != version:
+            self.invalidate_results(key)
+        self.save_table(key, "predictions", df)
+        with self._connect() as conn:
+            conn.execute("UPDATE datasets SET predictions_version = ? WHERE key = ?", (version, key))
+        return df
+
+    def invalidate_results(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        for path in (self.root / key).glob("*.parquet"):
+            if path.stem not in BASE_TABLES:
+                path.unlink(missing_ok=True)
+
+    def delete_dataset(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM datasets WHERE key = ?", (key,))
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        shutil.rmtree(self.root / key, ignore_errors=True)
+
+    def prune(self):
+        # Buang dataset yang paling lama tidak dibuka di luar max_datasets
+        with self._connect() as conn:
+            stale = conn.execute(
+                "SELECT key FROM datasets ORDER BY last_used_at DESC LIMIT -1 OFFSET ?",
+                (self.max_datasets,),
+            ).fetchall()
+        for (key,) in stale:
+            self.delete_dataset(key)
+
+    # ---------- tabel (Parquet) ----------
+    def save_table(self, key: str, name: str, df: pd.DataFrame):
+        # Tulis ke file sementara lalu rename, supaya pembaca tidak melihat file setengah jadi
+        path = self._table_path(key, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return df
+
+    def load_table(self, key: str, name: str):
+        path = self._table_path(key, name)
+        return pd.read_parquet(path) if path.exists() else None
+
+    @traced("store_table")
+    def get_or_compute_table(self, key: str, name: str, compute):
+        df = self.load_table(key, name)
+        if df is None:
+            df = self.save_table(key, name, compute())
+        return df
+
+    # ---------- hasil kecil (JSON di SQLite) ----------
+    def get_result(self, key: str, name: str, default=None):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM results WHERE key = ? AND name = ?", (key, name)
+            ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def put_result(self, key: str, name: str, value):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, name, _to_json(value), time.time()),
+            )
+        return value
+
+    @traced("store_result")
+    def get_or_compute_result(self, key: str, name: str, compute):
+        # None juga disimpan (mis. faskes tanpa node di graf), jadi pakai sentinel
+        value = self.get_result(key, name, _MISSING)
+        if value is _MISSING:
+            value = self.put_result(key, name, compute())
+        return value
+
+    def stats(self):
+        with self._connect() as conn:
+            n_datasets = conn.execute("SELECT COUNT(*) FROM datasets").fetchone()[0]
+            n_results = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        disk = sum(path.stat().st_size for path in self.root.rglob("*") if path.is_file())
+        return {
+            "path": str(self.root),
+            "datasets": n_datasets,
+            "max_datasets": self.max_datasets,
+            "max_age_days": round(self.max_age / 86400, 1),
+            "results": n_results,
+            "disk_mb": round(disk / 1024 ** 2, 1),
+        }
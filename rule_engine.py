@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from perf import traced
+
+# Ambang default; bisa di-override sebagian lewat argumen `thresholds`
+THRESHOLDS = {
+    "claim_ratio_high": 1.3,          # billed > 130% paid
+    "selisih_tarif_share": 0.5,       # selisih klaim > 50% tarif INACBG
+    "billed_tarif_multiple": 2.0,     # billed > 2x tarif INACBG
+    "billed_rolling_multiple": 3.0,   # billed > 3x rata-rata 30 hari
+    "visit_count_high": 8,
+    "nik_reuse_high": 3,
+    "drug_ratio_high": 0.6,
+    "procedure_ratio_high": 0.7,
+    "pathway_deviation_high": 0.7,
+    "repeat_claim_days": 3,
+}
+
+# Skor (jumlah bobot rule yang terpicu, maks. 1) -> label
+RED_SCORE = 0.7
+GREEN_SCORE = 0.0
+LABELS = ["GREEN", "AMBER", "RED"]
+
+# Tanpa fitur ini klaim tidak bisa dianggap "jelas aman" -> AMBER
+CORE_FEATURES = ["claim_ratio", "selisih_klaim"]
+
+
+def _col(df: pd.DataFrame, name: str, default=np.nan):
+    if name in df.columns:
+        return df[name].to_numpy(dtype=float, na_value=np.nan)
+    return np.full(len(df), default, dtype=float)
+
+
+def _positive(df: pd.DataFrame, name: str):
+    # Nilai acuan 0 berarti tidak diisi; rule pembanding tidak terpicu
+    values = _col(df, name)
+    return np.where(values > 0, values, np.nan)
+
+
+# ============================
+# DEFINISI RULE
+# ============================
+# (nama, bobot, kondisi(df, t) -> mask bool, penjelasan). Kolom yang tidak ada
+# dianggap NaN sehingga rule-nya tidak pernah terpicu.
+RULES = [
+    (
+        "high_claim_ratio", 0.3,
+        lambda df, t: _col(df, "claim_ratio") > t["claim_ratio_high"],
+        "Billed amount jauh di atas paid amount (claim ratio > {claim_ratio_high}).",
+    ),
+    (
+        "selisih_above_tarif", 0.3,
+        lambda df, t: _col(df, "selisih_klaim") > t["selisih_tarif_share"] * _positive(df, "tarif_inacbg"),
+        "Selisih klaim melebihi {selisih_tarif_share:.0%} tarif INACBG.",
+    ),
+    (
+        "billed_above_tarif", 0.25,
+        lambda df, t: _col(df, "billed_amount") > t["billed_tarif_multiple"] * _positive(df, "tarif_inacbg"),
+        "Billed amount lebih dari {billed_tarif_multiple}x tarif INACBG.",
+    ),
+    (
+        "billed_above_rolling_avg", 0.2,
+        lambda df, t: _col(df, "billed_amount") > t["billed_rolling_multiple"] * _positive(df, "rolling_avg_cost_30d"),
+        "Billed amount lebih dari {billed_rolling_multiple}x rata-rata biaya 30 hari terakhir.",
+    ),
+    (
+        "frequent_visits", 0.2,
+        lambda df, t: _col(df, "visit_count_30d") >= t["visit_count_high"],
+        "Kunjungan dalam 30 hari terakhir >= {visit_count_high}.",
+    ),
+    (
+        "self_referral", 0.25,
+        lambda df, t: (_col(df, "referral_flag", 0) > 0) & (_col(df, "referral_to_same_facility", 0) > 0),
+        "Rujukan ke fasilitas yang sama.",
+    ),
+    (
+        "nik_hash_reuse", 0.4,
+        lambda df, t: _col(df, "nik_hash_reuse_count") >= t["nik_reuse_high"],
+        "Hash NIK dipakai di >= {nik_reuse_high} klaim.",
+    ),
+    (
+        "high_drug_ratio", 0.15,
+        lambda df, t: _col(df, "drug_ratio") >= t["drug_ratio_high"],
+        "Biaya obat >= {drug_ratio_high:.0%} dari billed amount.",
+    ),
+    (
+        "high_procedure_ratio", 0.15,
+        lambda df, t: _col(df, "procedure_ratio") >= t["procedure_ratio_high"],
+        "Biaya prosedur >= {procedure_ratio_high:.0%} dari billed amount.",
+    ),
+    (
+        "clinical_pathway_deviation", 0.2,
+        lambda df, t: _col(df, "clinical_pathway_deviation_score") >= t["pathway_deviation_high"],
+        "Skor deviasi jalur klinis >= {pathway_deviation_high}.",
+    ),
+    (
+        "repeat_claim", 0.15,
+        lambda df, t: (_col(df, "time_diff_prev_claim") > 0) & (_col(df, "time_diff_prev_claim") <= t["repeat_claim_days"]),
+        "Klaim berulang dalam {repeat_claim_days} hari.",
+    ),
+]
+
+
+# ============================
+# SCREENING
+# ============================
+@traced("screen_claims")
+def screen_claims(df: pd.DataFrame, thresholds: dict = None,
+                  red_score: float = RED_SCORE, green_score: float = GREEN_SCORE):
+    # Evaluasi semua rule sekaligus (satu mask per rule atas seluruh baris).
+    # Hasil per baris: risk_score, label GREEN/AMBER/RED, reasons, dan
+    # forward=True untuk klaim meragukan (AMBER) yang perlu dinilai backend.
+    t = {**THRESHOLDS, **(thresholds or {})}
+    triggered = np.zeros((len(df), len(RULES)), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for j, (_, _, condition, _) in enumerate(RULES):
+            triggered[:, j] = condition(df, t)
+    weights = np.array([weight for _, weight, _, _ in RULES])
+    score = np.minimum(triggered @ weights, 1.0)
+
+    complete = np.ones(len(df), dtype=bool)
+    for col in CORE_FEATURES:
+        complete &= ~np.isnan(_col(df, col))
+
+    label = np.where(score >= red_score, 2, np.where((score <= green_score) & complete, 0, 1))
+    # Reasons dibangun sekali per kombinasi rule yang terpicu, lalu dipetakan ke baris
+    explanations = [{"rule": name, "explanation": text.format(**t)} for name, _, _, text in RULES]
+    patterns, inverse = np.unique(triggered @ (1 << np.arange(len(RULES))), return_inverse=True)
+    reasons_by_pattern = np.empty(len(patterns), dtype=object)
+    for i, pattern in enumerate(patterns):
+        reasons_by_pattern[i] = [explanations[j] for j in range(len(RULES)) if pattern >> j & 1]
+    reasons = reasons_by_pattern[inverse.reshape(-1)]
+    return pd.DataFrame({
+        "risk_score": score,
+        "label": np.array(LABELS, dtype=object)[label],
+        "reasons": reasons,
+        "forward": label == 1,
+    }, index=df.index)
+
+
+def traffic_stats(screening: pd.DataFrame):
+    total = len(screening)
+    forwarded = int(screening["forward"].sum())
+    return {
+        "total": total,
+        "forwarded": forwarded,
+        "avoided": total - forwarded,
+        "avoided_share": (total - forwarded) / total if total else 0.0,
+    }
@@ -0,0 +1,92 @@
+import gzip
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+
+# ============================
+# STUB BACKEND (http.server lokal)
+# ============================
+class StubHandler(BaseHTTPRequestHandler):
+    # Rute:
+    #   /sleep/<ms>  tunda respons <ms> milidetik (latensi buatan)
+    #   path lain    balas JSON {"path", "body", "gzip_request"}
+    # stub.fail[path] = n membuat n request pertama ke path itu dibalas 503;
+    # stub.delay[path] = detik menambah latensi buatan ke setiap request ke path itu.
+    protocol_version = "HTTP/1.1"  # keep-alive, supaya reuse koneksi bisa diamati
+
+    def _handle(self):
+        stub = self.server.stub
+        path = urlsplit(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        gzip_request = self.headers.get("Content-Encoding") == "gzip"
+        if gzip_request:
+            body = gzip.decompress(body)
+
+        with stub.lock:
+            stub.hits[(self.command, path)] += 1
+            stub.connections.add(self.client_address)
+            stub.in_flight += 1
+            stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+            fail = stub.fail.get(path, 0) > 0
+            if fail:
+                stub.fail[path] -= 1
+        try:
+            if path.startswith("/sleep/"):
+                time.sleep(int(path.rsplit("/", 1)[1]) / 1000)
+            time.sleep(stub.delay.get(path, 0))
+        finally:
+            with stub.lock:
+                stub.in_flight -= 1
+
+        payload = json.dumps({
+            "path": path,
+            "body": body.decode("utf-8", errors="replace"),
+            "gzip_request": gzip_request,
+        }).encode()
+        self.send_response(503 if fail else 200)
+        self.send_header("Content-Type", "application/json")
+        if not fail and "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class StubBackend:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.connections = set()
+        self.fail = {}
+        self.delay = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_backend():
+    stub = StubBackend()
+    yield stub
+    stub.close()
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+import requests
+
+from backend_client import BackendClient
+
+
+@pytest.fixture
+def client(stub_backend):
+    client = BackendClient(stub_backend.url, timeout=(2, 5), backoff_factor=0.05)
+    yield client
+    client.close()
+
+
+def test_connection_is_reused(client, stub_backend):
+    for _ in range(5):
+        assert client.get("/ok").status_code == 200
+    assert stub_backend.hits[("GET", "/ok")] == 5
+    assert len(stub_backend.connections) == 1
+
+
+def test_read_timeout(stub_backend):
+    client = BackendClient(stub_backend.url, timeout=(2, 0.2), retries=0)
+    start = time.perf_counter()
+    # Tanpa retry requests tetap membungkus ReadTimeoutError dalam ConnectionError
+    with pytest.raises(requests.RequestException, match="Read timed out"):
+        client.get("/sleep/1000")
+    assert time.perf_counter() - start < 0.9
+    client.close()
+
+
+def test_get_retries_5xx_with_backoff(client, stub_backend):
+    stub_backend.fail["/ok"] = 2
+    start = time.perf_counter()
+    response = client.get("/ok")
+    assert response.status_code == 200
+    assert stub_backend.hits[("GET", "/ok")] == 3
+    # backoff urllib3: 0 lalu 0.1s (backoff_factor * 2)
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_batch_post_is_not_retried(client, stub_backend):
+    stub_backend.fail["/inference_graph"] = 2
+    response = client.post("/inference_graph", files={"file": ("claims.csv", b"claim_id\n1\n")})
+    assert response.status_code == 503
+    assert stub_backend.hits[("POST", "/inference_graph")] == 1
+
+
+def test_idempotent_post_is_retried(client, stub_backend):
+    stub_backend.fail["/score_single"] = 2
+    response = client.post("/score_single", json={"claim_id": 1})
+    assert response.status_code == 200
+    assert stub_backend.hits[("POST", "/score_single")] == 3
+
+
+def test_retries_give_up_with_last_response(client, stub_backend):
+    stub_backend.fail["/ok"] = 10
+    assert client.get("/ok").status_code == 503
+    assert stub_backend.hits[("GET", "/ok")] == 4  # 1 + RETRIES
+
+
+def test_gzip_request_and_response(stub_backend):
+    client = BackendClient(stub_backend.url, gzip_requests=True)
+    payload = {"narrative": "x" * 5000}
+    response = client.post("/score_single", json=payload)
+    data = response.json()  # respons gzip didekompres oleh requests
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert data["gzip_request"] is True
+    assert data["body"] == '{"narrative": "' + "x" * 5000 + '"}'
+
+    small = client.post("/score_single", json={"claim_id": 1}).json()
+    assert small["gzip_request"] is False  # di bawah GZIP_MIN_BYTES
+    client.close()
+
+
+def test_latency_histogram(client):
+    client.get("/sleep/120")
+    client.get("/ok")
+    stats = client.latency_stats()
+    assert stats["GET /sleep/120"]["count"] == 1
+    assert stats["GET /sleep/120"]["max_ms"] >= 120
+    assert stats["GET /sleep/120"]["buckets"] == {"<=250ms": 1}
+    assert stats["GET /ok"]["count"] == 1
@@ -0,0 +1,58 @@
+import json
+import time
+
+import pytest
+
+from backend_client import BackendClient
+
+LATENCY = 0.3
+
+
+@pytest.fixture
+def client(stub_backend):
+    client = BackendClient(stub_backend.url)
+    yield client
+    client.close()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def test_gather_takes_max_latency_not_sum(client, stub_backend):
+    calls = {f"c{i}": ("GET", f"/sleep/{int(LATENCY * 1000)}", {"params": {"i": i}}) for i in range(4)}
+    responses, elapsed = timed(lambda: client.gather(calls))
+    assert all(r.status_code == 200 for r in responses.values())
+    assert LATENCY <= elapsed < 2 * LATENCY  # serial: 4 * LATENCY
+    assert stub_backend.max_in_flight == 4
+
+
+def test_gather_respects_concurrency_limit(client, stub_backend):
+    calls = {f"c{i}": ("GET", "/sleep/150", None) for i in range(8)}
+    _, elapsed = timed(lambda: client.gather(calls, max_concurrency=2))
+    assert stub_backend.max_in_flight <= 2
+    assert elapsed >= 4 * 0.15
+
+
+def test_score_claims_parallel_and_ordered(client, stub_backend):
+    stub_backend.delay["/score_single"] = LATENCY
+    payloads = [{"claim_id": i} for i in range(6)]
+    responses, elapsed = timed(lambda: client.score_claims(payloads, max_concurrency=3))
+    assert stub_backend.max_in_flight <= 3
+    assert 2 * LATENCY <= elapsed < 3 * LATENCY  # 6 klaim / 3 worker = 2 gelombang
+    assert [json.loads(r.json()["body"])["claim_id"] for r in responses] == list(range(6))
+
+
+def test_fetch_artifacts_parallel(client, stub_backend):
+    urls = {name: f"/sleep/{int(LATENCY * 1000)}?artifact={name}" for name in ["predictions", "explanations", "report"]}
+    artifacts, elapsed = timed(lambda: client.fetch_artifacts(urls))
+    assert set(artifacts) == set(urls)
+    assert elapsed < 2 * LATENCY  # serial: 3 * LATENCY
+    assert stub_backend.max_in_flight == 3
+
+    # Dalam TTL: tidak ada request baru
+    _, elapsed = timed(lambda: client.fetch_artifacts(urls))
+    assert elapsed < LATENCY
+    assert stub_backend.hits[("GET", f"/sleep/{int(LATENCY * 1000)}")] == 3
@@ -0,0 +1,87 @@
+import base64
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from batch_stream import estimate_row_bytes, stream_batch_score
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, df: pd.DataFrame):
+        csv_b64 = base64.b64encode(df.to_csv(index=False).encode()).decode()
+        self.content = json.dumps({"predictions_csv_b64": csv_b64}).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeClient:
+    # /batch_score palsu: chunk CSV dibaca ulang lalu diberi kolom prediksi
+    def __init__(self):
+        self.chunks = []
+
+    def post(self, endpoint, files, **kwargs):
+        chunk = pd.read_csv(io.BytesIO(files["file"][1]))
+        self.chunks.append(chunk)
+        return FakeResponse(chunk.assign(
+            predicted_fraud=chunk["claim_id"] % 2,
+            predicted_fraud_type=["upcoding" if i % 2 else "none" for i in chunk["claim_id"]],
+        ))
+
+
+def claims(n_rows: int):
+    return pd.DataFrame({
+        "claim_id": range(n_rows),
+        "nama_faskes": ["RS Sémarang" if i % 3 else "Klinik Pratama" for i in range(n_rows)],
+        "billed_amount": [1000.5 + i for i in range(n_rows)],
+    })
+
+
+def upload(df: pd.DataFrame, sep: str, encoding: str):
+    return io.BytesIO(df.to_csv(index=False, sep=sep).encode(encoding))
+
+
+@pytest.mark.parametrize("sep,encoding", [(",", "utf-8"), (";", "latin-1"), ("\t", "utf-16")])
+def test_stream_uses_sniffed_delimiter_and_encoding(sep, encoding):
+    df = claims(2_500)
+    client = FakeClient()
+
+    result = stream_batch_score(client, upload(df, sep, encoding), "claims.csv", chunk_rows=1_000)
+
+    assert [len(c) for c in client.chunks] == [1_000, 1_000, 500]
+    assert list(client.chunks[0].columns) == list(df.columns)
+    assert result["claim_id"].tolist() == list(range(2_500))
+    assert result["nama_faskes"].tolist() == df["nama_faskes"].tolist()
+
+
+def test_row_estimate_uses_sniffed_delimiter():
+    df = claims(500)
+    comma = estimate_row_bytes(upload(df, ",", "utf-8"), "claims.csv")
+    semicolon = estimate_row_bytes(upload(df, ";", "latin-1"), "claims.csv")
+    assert semicolon == comma
+
+
+def test_all_rows_rejected_returns_empty_predictions():
+    client = FakeClient()
+
+    result = stream_batch_score(
+        client, upload(claims(50), ";", "utf-8"), "claims.csv", chunk_rows=20,
+        prepare=lambda chunk: chunk.iloc[0:0],
+    )
+
+    assert client.chunks == []
+    assert result.empty
+    assert {"claim_id", "predicted_fraud", "predicted_fraud_type"} <= set(result.columns)
+    # Operasi di halaman ringkasan tetap jalan pada hasil kosong
+    assert result["predicted_fraud"].sum() == 0
+    assert result["predicted_fraud_type"].value_counts().empty
+
+
+def test_header_only_file_returns_empty_predictions():
+    result = stream_batch_score(FakeClient(), upload(claims(0), ";", "utf-8"), "claims.csv")
+    assert list(result.columns) == ["claim_id", "nama_faskes", "billed_amount", "predicted_fraud", "predicted_fraud_type"]
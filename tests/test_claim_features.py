@@ -0,0 +1,55 @@
+import pandas as pd
+
+from claim_features import prepare_claims
+
+
+def make_claims(**overrides):
+    df = pd.DataFrame({
+        "claim_id": ["C1", "C2", "C3"],
+        "participant_id": ["P1", "P2", "P3"],
+        "faskes_id": ["F1", "F1", "F2"],
+        "dpjp_id": ["D1", "D2", "D3"],
+        "kode_icd10": ["A09", "E11", "I10"],
+        "tgl_pelayanan": ["2024-01-05", "2024-02-10", "2024-03-15"],
+        "billed_amount": [100_000, 200_000, 300_000],
+        "paid_amount": [90_000, 180_000, 270_000],
+    })
+    for col, values in overrides.items():
+        df[col] = values
+    return df
+
+
+def test_valid_rows_pass():
+    valid, rejected = prepare_claims(make_claims())
+    assert len(valid) == 3
+    assert rejected.empty
+    assert valid["claim_month"].tolist() == [1, 2, 3]
+
+
+def test_blank_date_rejects_only_that_row():
+    valid, rejected = prepare_claims(make_claims(tgl_pelayanan=["2024-01-05", "", "2024-03-15"]))
+    assert valid["claim_id"].tolist() == ["C1", "C3"]
+    assert rejected["claim_id"].tolist() == ["C2"]
+    assert "tgl_pelayanan kosong" in rejected["errors"].iloc[0]
+    assert "claim_month kosong" in rejected["errors"].iloc[0]
+
+
+def test_unparseable_date_rejects_only_that_row():
+    valid, rejected = prepare_claims(make_claims(tgl_pelayanan=["2024-01-05", "bukan tanggal", "2024-03-15"]))
+    assert valid["claim_id"].tolist() == ["C1", "C3"]
+    assert "tgl_pelayanan bukan tanggal" in rejected["errors"].iloc[0]
+
+
+def test_claim_month_column_fills_blank_date():
+    df = make_claims(tgl_pelayanan=["2024-01-05", None, "2024-03-15"], claim_month=[None, 7, None])
+    valid, rejected = prepare_claims(df)
+    assert rejected["claim_id"].tolist() == ["C2"]  # tanggal tetap wajib
+    assert "claim_month kosong" not in rejected["errors"].iloc[0]
+    assert valid["claim_month"].tolist() == [1, 3]
+
+
+def test_out_of_range_and_category():
+    valid, rejected = prepare_claims(make_claims(billed_amount=[100_000, -1, 300_000], sex=["M", "X", ""]))
+    assert rejected["claim_id"].tolist() == ["C2"]
+    assert "billed_amount < 0" in rejected["errors"].iloc[0]
+    assert "sex tidak dikenal" in rejected["errors"].iloc[0]
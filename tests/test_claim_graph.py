@@ -0,0 +1,142 @@
+import threading
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_claims import make_synthetic_claims
+from network_analysis import ClaimGraph, NeighbourhoodIndex, build_claim_graph, calculate_graph_risk
+
+
+def claims(n_rows: int, seed: int, prefix: str):
+    # Prefix id di semua kolom node: data dengan prefix berbeda = komponen terpisah
+    df = make_synthetic_claims(n_rows, seed=seed, n_faskes=3)
+    for col in ["claim_id", "participant_id", "faskes_id", "dpjp_id", "kode_icd10"]:
+        df[col] = prefix + df[col].astype(str)
+    return df
+
+
+def partition(graph: ClaimGraph, node, method: str):
+    # Komunitas di komponen node (skor per faskes terlalu kasar untuk membedakan)
+    graph.community_score(node, method=method)
+    _, communities = graph._component_of(node)[("communities", method, 42)]
+    return {frozenset(c) for c in communities["communities"]}
+
+
+@pytest.mark.parametrize("method", ["greedy", "louvain"])
+def test_untouched_component_uses_current_resolution(method):
+    small, large = claims(60, seed=1, prefix="a"), claims(600, seed=2, prefix="b")
+    node = "FSK_a0"
+
+    graph = ClaimGraph(small)
+    before = partition(graph, node, method)  # satu-satunya komponen: resolution = 1
+
+    graph.add_claims(large)  # komponen node tidak tersentuh, tapi m global naik
+    fresh = ClaimGraph(pd.concat([small, large], ignore_index=True))
+    assert partition(graph, node, method) == partition(fresh, node, method)
+    assert partition(graph, node, method) != before
+
+    graph.remove_claims(large["claim_id"])
+    assert partition(graph, node, method) == before
+
+
+def test_concurrent_mutation_and_reads_are_serialized():
+    # Graf dibagi antar sesi: satu thread menambah/menghapus klaim di komponen lain
+    # sementara thread lain membaca risiko; hasil harus selalu sama dengan graf
+    # tanpa klaim tambahan atau dengan klaim tambahan, tanpa exception.
+    small, large = claims(60, seed=1, prefix="a"), claims(300, seed=2, prefix="b")
+    expected = {
+        ClaimGraph(small).graph_risk("a0", community="louvain")["final_risk"],
+        ClaimGraph(pd.concat([small, large], ignore_index=True)).graph_risk("a0", community="louvain")["final_risk"],
+    }
+    graph = ClaimGraph(small)
+    errors, results = [], []
+    done = threading.Event()
+
+    def mutate():
+        try:
+            for _ in range(20):
+                graph.add_claims(large)
+                graph.remove_claims(large["claim_id"])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                results.append(graph.graph_risk("a0", community="louvain")["final_risk"])
+                graph.ego_graph("FSK_a0", 2)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=mutate)] + [threading.Thread(target=read) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(60)
+
+    assert errors == []
+    assert results and set(results) <= expected
+
+
+def test_repeated_claim_ids_keep_all_rows():
+    # Satu klaim bisa muncul di beberapa baris (satu DPJP/diagnosis per baris):
+    # hasil harus sama dengan build_claim_graph, bukan hanya baris terakhir
+    df = pd.DataFrame({
+        "claim_id": ["c1", "c1", "c2"],
+        "participant_id": ["p1", "p1", "p2"],
+        "faskes_id": [1, 1, 1],
+        "dpjp_id": ["DR_1", "DR_2", "DR_1"],
+        "kode_icd10": ["A", "B", "A"],
+        "fraud_prediction": [0, 1, 0],
+    })
+    expected = build_claim_graph(df)
+    graph = ClaimGraph(df)
+
+    assert nx.utils.graphs_equal(graph.G, expected)
+    assert graph.graph_risk(1) == pytest.approx(calculate_graph_risk(expected, 1))
+
+    # 50 claim_id dipakai ulang oleh baris lain (peserta/DPJP/faskes berbeda)
+    synthetic = make_synthetic_claims(2_000, seed=3)
+    synthetic.loc[synthetic.index[-50:], "claim_id"] = synthetic["claim_id"].iloc[:50].to_numpy()
+    assert nx.utils.graphs_equal(ClaimGraph(synthetic).G, build_claim_graph(synthetic))
+
+
+def test_update_and_remove_replace_every_row_of_a_claim():
+    base = claims(60, seed=1, prefix="a")
+    first = base.iloc[[0]]
+    graph = ClaimGraph(pd.concat([base, first.assign(dpjp_id="aDR_extra")], ignore_index=True))
+
+    graph.update_claims(first)  # versi baru claim menggantikan kedua baris lamanya
+    assert nx.utils.graphs_equal(graph.G, build_claim_graph(base))
+
+    graph.remove_claims([first["claim_id"].iloc[0]])
+    assert nx.utils.graphs_equal(graph.G, build_claim_graph(base.iloc[1:]))
+
+
+@pytest.mark.parametrize("radius", [1, 2, 3])
+def test_ego_nodes_match_networkx_ego_graph(radius):
+    G = build_claim_graph(make_synthetic_claims(2_000, seed=4))
+    center = "FSK_0"
+    nodes, truncated = NeighbourhoodIndex(G).ego_nodes(center, radius)
+    assert not truncated
+    assert set(nodes) == set(nx.ego_graph(G, center, radius=radius))
+
+
+def test_ego_layers_stop_at_radius_and_max_nodes():
+    G = build_claim_graph(make_synthetic_claims(2_000, seed=4))
+    index = NeighbourhoodIndex(G, max_centers=2)
+
+    index.ego_nodes("FSK_0", 1)
+    layers, seen = index._layers["FSK_0"]
+    assert len(layers) == 2 and seen == set(nx.ego_graph(G, "FSK_0", radius=1))
+
+    nodes, truncated = index.ego_nodes("FSK_0", 10, max_nodes=50)
+    assert truncated and len(nodes) == 50
+    assert len(index._layers["FSK_0"][1]) < G.number_of_nodes()  # tidak menelusuri seluruh komponen
+
+    index.ego_nodes("FSK_1", 1)
+    index.ego_nodes("FSK_2", 1)
+    assert list(index._layers) == ["FSK_1", "FSK_2"]
@@ -0,0 +1,53 @@
+from benchmarks.synthetic_claims import make_synthetic_claims
+from graph_cache import GraphCache, estimate_nbytes
+from network_analysis import ClaimGraph
+
+
+def test_none_value_is_cached():
+    cache = GraphCache(max_bytes=1024 ** 2)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None  # mis. faskes tanpa node di graf
+
+    assert cache.get_or_compute("risk", compute) is None
+    assert cache.get_or_compute("risk", compute) is None
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_get_default_on_miss():
+    cache = GraphCache(max_bytes=1024 ** 2)
+    sentinel = object()
+    assert cache.get("missing") is None
+    assert cache.get("missing", sentinel) is sentinel
+    cache.put("key", None)
+    assert cache.get("key", sentinel) is None
+
+
+
+def test_growing_claim_graph_is_remeasured():
+    graph = ClaimGraph(make_synthetic_claims(200, seed=5, n_faskes=3))
+    cache = GraphCache(max_bytes=1024 ** 3)
+    cache.put("graph", graph)
+    stored = cache.nbytes
+
+    # Lookup mengisi cache turunan (betweenness, degree, komunitas, lapisan ego)
+    graph.graph_risk(0)
+    graph.ego_graph("FSK_0", 3)
+    cache.get("graph")
+    assert cache.nbytes == estimate_nbytes(graph) > stored
+
+
+def test_growth_past_the_limit_evicts_oldest_entries():
+    graph = ClaimGraph(make_synthetic_claims(200, seed=5, n_faskes=3))
+    cache = GraphCache(max_bytes=estimate_nbytes(graph) + 1024)
+    cache.put("old", "x" * 256)
+    cache.put("graph", graph)
+
+    graph.graph_risk(0)
+    cache.get("graph")
+    assert cache.get("old") is None
+    assert cache.stats()["evictions"] >= 1
+    assert cache.nbytes <= cache.max_bytes
@@ -0,0 +1,57 @@
+import networkx as nx
+import pytest
+
+import graph_render
+from graph_render import graph_page_html, render_graph_body, render_summary_body, vendored_assets_html
+
+
+@pytest.fixture
+def pyvis_html(monkeypatch):
+    # HTML versi lama: dokumen pyvis utuh dengan aset vendored disisipkan inline
+    captured = []
+    to_body = graph_render._to_body
+
+    def spy(nt):
+        html = graph_render._PYVIS_ASSET_TAGS.sub("", nt.generate_html())
+        captured.append(html.replace(graph_render._HEAD_ANCHOR, graph_render._HEAD_ANCHOR + vendored_assets_html(), 1))
+        return to_body(nt)
+
+    monkeypatch.setattr(graph_render, "_to_body", spy)
+    return captured
+
+
+def claim_graph():
+    G = nx.Graph()
+    G.add_node("FSK_1", type="faskes")
+    G.add_node("PTC_<1>", type="participant")
+    G.add_node("CLM_1", type="claim", fraud=1)
+    G.add_edges_from([("FSK_1", "CLM_1"), ("PTC_<1>", "CLM_1")])
+    return G
+
+
+def summary_graph(n_nodes: int):
+    G = nx.Graph()
+    for i in range(n_nodes):
+        G.add_node(
+            f"community {i}", size=3, counts={"claim": 2, "participant": 1},
+            claims=2, fraud_claims=1, fraud_ratio=0.5, internal_edges=2,
+        )
+    G.add_edge("community 0", "community 1", weight=4)
+    return G
+
+
+def test_body_has_no_assets_and_page_matches_pyvis(pyvis_html):
+    body = render_graph_body(claim_graph())
+
+    assert "vis-network" not in str(body)
+    assert len(str(body)) < 5_000
+    assert graph_page_html(body).strip() == pyvis_html[0].strip()
+    assert "\\u003c1\\u003e" in body["nodes"]  # id node di-escape untuk <script>
+
+
+@pytest.mark.parametrize("n_nodes", [3, 150])
+def test_summary_page_matches_pyvis(pyvis_html, n_nodes):
+    body = render_summary_body(summary_graph(n_nodes))
+
+    assert body["loading_bar"] == (n_nodes > 100)
+    assert graph_page_html(body).strip() == pyvis_html[0].strip()
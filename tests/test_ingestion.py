@@ -0,0 +1,46 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from ingestion import ID_COLUMNS, downcast_numeric, read_claims
+
+
+def claims_frame():
+    return pd.DataFrame({
+        "claim_id": np.arange(1, 6, dtype=np.int64),
+        "participant_id": np.arange(10, 15, dtype=np.int64),
+        "faskes_id": np.array([1, 1, 2, 2, 3], dtype=np.int64),
+        "dpjp_id": np.array([7, 7, 8, 8, 9], dtype=np.int64),
+        "kode_icd10": ["A09", "A09", "E11", "I10", "J18"],
+        "lama_dirawat": np.array([1, 2, 3, 4, 5], dtype=np.int64),
+        "billed_amount": [150_000.0, 2_500_000.0, 300_000.0, 1.5, 42.0],
+    })
+
+
+def test_downcast_skips_id_columns():
+    df = downcast_numeric(claims_frame())
+
+    for col in ID_COLUMNS:
+        assert df[col].dtype == np.int64, col
+    assert df["lama_dirawat"].dtype == np.int8
+    assert df["billed_amount"].dtype == np.float32
+
+
+def test_read_csv_keeps_claim_id_dtype():
+    buf = io.BytesIO(claims_frame().to_csv(index=False, sep=";").encode())
+    df = read_claims(buf, "claims.csv")
+
+    assert df["claim_id"].dtype == np.int64
+    assert df["faskes_id"].dtype == "category"
+    assert df["lama_dirawat"].dtype == np.int8
+    assert df["claim_id"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_read_parquet_keeps_claim_id_dtype():
+    buf = io.BytesIO()
+    claims_frame().to_parquet(buf, index=False)
+    df = read_claims(buf, "claims.parquet")
+
+    assert df["claim_id"].dtype == np.int64
+    assert df["dpjp_id"].dtype == "category"
@@ -0,0 +1,37 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import network_analysis
+from benchmarks.synthetic_claims import make_synthetic_claims
+from network_analysis import build_claim_graph, calculate_graph_risk_batch, calculate_graph_risk_parallel
+
+
+@pytest.fixture(scope="module")
+def claim_graph():
+    # Data sintetis apa adanya: ICD & peserta lintas faskes -> satu komponen raksasa
+    G = build_claim_graph(make_synthetic_claims(800, seed=3, n_faskes=6))
+    assert nx.number_connected_components(G) == 1
+    return G
+
+
+@pytest.mark.parametrize("centrality", ["exact", "approx"])
+def test_parallel_matches_batch(claim_graph, centrality, monkeypatch):
+    monkeypatch.setattr(network_analysis, "PARALLEL_MIN_NODES", 0)
+    batch = calculate_graph_risk_batch(claim_graph, centrality=centrality, community="louvain")
+    parallel = calculate_graph_risk_parallel(claim_graph, centrality=centrality, community="louvain", workers=2)
+
+    batch = batch.set_index("faskes_id").sort_index()
+    parallel = parallel.set_index("faskes_id").sort_index()
+    assert list(parallel.index) == list(batch.index)
+    for col in ["betweenness", "degree", "betweenness_error"]:
+        np.testing.assert_allclose(parallel[col], batch[col], rtol=1e-9, atol=1e-12)
+    assert (parallel["community_score"] == batch["community_score"]).all()
+    assert (parallel["final_risk"] == batch["final_risk"]).all()
+
+
+def test_small_graph_falls_back_to_batch(claim_graph):
+    # Di bawah PARALLEL_MIN_NODES tidak ada pool yang dibuat
+    parallel = calculate_graph_risk_parallel(claim_graph, faskes_ids=["0", "1"], workers=4)
+    batch = calculate_graph_risk_batch(claim_graph, faskes_ids=["0", "1"])
+    assert parallel.equals(batch)
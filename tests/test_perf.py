@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import perf
+
+
+def run_page(fn):
+    # Seperti satu rerun Streamlit: run dimulai dan ditutup di thread script
+    result = {}
+
+    def script():
+        run = perf.start_run("test", log_path="")
+        fn()
+        result["run"] = run.finish()
+
+    thread = threading.Thread(target=script, name="script")
+    thread.start()
+    thread.join()
+    return result["run"]
+
+
+def test_spans_from_submitted_tasks_join_the_run():
+    def task(i):
+        with perf.span("task", i=i):
+            pass
+
+    def page():
+        with perf.span("fan_out"), ThreadPoolExecutor(max_workers=2) as pool:
+            for future in [perf.submit(pool, task, i) for i in range(3)]:
+                future.result()
+
+    run = run_page(page)
+    tasks = [s for s in run.spans if s["span"] == "task"]
+    assert sorted(s["i"] for s in tasks) == [0, 1, 2]
+    assert all(s["depth"] == 1 and s["thread"] != "script" for s in tasks)
+    assert [s["depth"] for s in run.spans if s["span"] == "fan_out"] == [0]
+    assert "thread" not in next(s for s in run.spans if s["span"] == "fan_out")
+
+
+def test_plain_pool_submit_does_not_record():
+    # Tanpa perf.submit thread worker tidak punya run (seperti thread-local dulu)
+    def task():
+        with perf.span("task"):
+            return perf.current_run()
+
+    def page():
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(task).result() is None
+
+    assert run_page(page).spans == []
+    assert perf.current_run() is None
+
+
+def test_run_is_cleared_after_finish():
+    seen = {}
+
+    def page():
+        seen["run"] = perf.current_run()
+
+    run = run_page(page)
+    assert seen["run"] is run
+    assert run.finished
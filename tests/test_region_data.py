@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+import requests
+
+import region_data
+from region_data import RegionData
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    calls = []
+
+    def fetch(path):
+        calls.append(path)
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(region_data, "_fetch", fetch)
+    return calls
+
+
+def test_snapshot_bundles_regencies_for_every_province(no_network):
+    regions = RegionData(remote=False)
+    provinces = regions.provinces()
+
+    assert len(provinces) == 38
+    assert sum(len(regions.regencies(p["code"])) for p in provinces) == 514
+    for p in provinces:
+        items = regions.regencies(p["code"])
+        assert items, p["name"]
+        assert all(r["code"].startswith(p["code"] + ".") for r in items)
+    assert regions.regency_code("32", "Kabupaten Bogor") == "32.01"
+    assert no_network == []
+
+
+def test_regencies_never_hit_network_on_script_thread(no_network):
+    regions = RegionData(remote=True)
+    assert regions.regencies("33")
+    assert regions.regencies("99") == []
+    assert regions.regencies("") == []
+    assert no_network == []
+
+
+def test_refresh_async_swaps_index_in_background(monkeypatch, tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def fetch(path):
+        started.set()
+        release.wait(5)
+        if path == "provinces.json":
+            return [{"code": "11", "name": "Aceh"}]
+        return [{"code": "11.01", "name": "Kabupaten Baru"}]
+
+    monkeypatch.setattr(region_data, "_fetch", fetch)
+    regions = RegionData(remote=True)
+    assert regions.is_stale()
+
+    regions.refresh_async()
+    regions.refresh_async()  # thread yang sama masih berjalan: tidak dobel
+    assert started.wait(5)
+    # Selama refresh, pembaca tetap melihat snapshot lama yang utuh
+    assert len(regions.provinces()) == 38
+    assert regions.regency_code("11", "Kabupaten Simeulue") == "11.09"
+
+    release.set()
+    regions._refresh_thread.join(5)
+    assert regions.provinces() == [{"code": "11", "name": "Aceh"}]
+    assert regions.regency_code("11", "Kabupaten Baru") == "11.01"
+    assert not regions.is_stale()
+
+    regions.save_snapshot(tmp_path / "regions.json")
+    assert RegionData(tmp_path / "regions.json", remote=False).regencies("11") == regions.regencies("11")
+
+
+def test_failed_refresh_keeps_snapshot(no_network):
+    regions = RegionData(remote=True)
+    regions.refresh_async()
+    regions._refresh_thread.join(5)
+    assert len(regions.provinces()) == 38
+    assert no_network == ["provinces.json"]
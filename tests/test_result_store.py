@@ -0,0 +1,105 @@
+import time
+
+import pandas as pd
+import pytest
+
+from result_store import ResultStore, content_hash
+
+RESULT = {"predictions_url": "jobs/1/predictions.csv", "explanations_url": "jobs/1/explanations.json"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / "store", max_datasets=2)
+
+
+def uploaded():
+    return pd.DataFrame({"claim_id": ["c1", "c2"], "faskes_id": [10, 11], "amount": [1.5, 2.0]})
+
+
+def predictions():
+    return pd.DataFrame({"claim_id": ["c1", "c2"], "fraud_prediction": [0, 1]})
+
+
+def save(store, key, version="v1"):
+    store.save_dataset(key, f"{key}.csv", uploaded(), RESULT)
+    store.save_predictions(key, predictions(), version)
+
+
+def test_dataset_round_trip(store):
+    save(store, "a")
+    stored = ResultStore(store.root).load_dataset("a")  # instance baru = setelah restart
+
+    pd.testing.assert_frame_equal(stored["df"], uploaded())
+    pd.testing.assert_frame_equal(stored["predictions"], predictions())
+    assert stored["name"] == "a.csv"
+    assert stored["predictions_version"] == "v1"
+    assert stored["inference_results"] == RESULT
+
+
+def test_dataset_without_predictions_is_incomplete(store):
+    store.save_dataset("a", "a.csv", uploaded(), RESULT)
+    assert store.load_dataset("a") is None
+
+
+def test_none_result_is_cached(store):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert store.get_or_compute_result("a", "risk:1", compute) is None
+    assert store.get_or_compute_result("a", "risk:1", compute) is None
+    assert len(calls) == 1
+
+
+def test_prune_drops_least_recently_used(store):
+    for key in ("a", "b"):
+        save(store, key)
+        time.sleep(0.01)
+    store.load_dataset("a")  # a lebih baru dipakai daripada b
+    time.sleep(0.01)
+    save(store, "c")
+
+    assert store.load_dataset("b") is None
+    assert not (store.root / "b").exists()
+    assert store.load_dataset("a") is not None
+    assert store.load_dataset("c") is not None
+
+
+def test_missing_parquet_file_means_not_stored(store):
+    save(store, "a")
+    store.put_result("a", "risk:1", {"final_risk": 0.5})
+    (store.root / "a" / "uploaded.parquet").unlink()
+
+    assert store.load_dataset("a") is None
+    assert store.stats()["datasets"] == 0
+    assert store.get_result("a", "risk:1") is None
+
+
+def test_expired_dataset_is_dropped(tmp_path):
+    store = ResultStore(tmp_path / "store", max_age=0)
+    save(store, "a")
+    assert store.load_dataset("a") is None
+
+
+def test_new_predictions_version_invalidates_results(store):
+    save(store, "a")
+    store.put_result("a", "risk:1", {"final_risk": 0.5})
+    store.save_table("a", "leaderboard", pd.DataFrame({"faskes_id": [10]}))
+
+    store.save_predictions("a", predictions(), "v1")  # versi sama: hasil tetap
+    assert store.get_result("a", "risk:1") == {"final_risk": 0.5}
+
+    store.save_predictions("a", predictions(), "v2")
+    assert store.get_result("a", "risk:1") is None
+    assert store.load_table("a", "leaderboard") is None
+    assert store.load_dataset("a")["predictions_version"] == "v2"
+
+
+def test_content_hash_includes_model_version():
+    data = b"claim_id,amount\nc1,1\n"
+    assert content_hash(data) == content_hash(data, "")
+    assert content_hash(data, "m1") != content_hash(data)
+    assert content_hash(data, "m1") != content_hash(data, "m2")
@@ -0,0 +1,42 @@
+import pytest
+
+import network_analysis
+from benchmarks.synthetic_claims import make_synthetic_claims
+from network_analysis import build_claim_graph, compute_centrality, detect_communities
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    network_analysis.clear_centrality_cache()
+    network_analysis.clear_community_cache()
+    yield
+    network_analysis.clear_centrality_cache()
+    network_analysis.clear_community_cache()
+
+
+def graphs(n: int):
+    return [build_claim_graph(make_synthetic_claims(200, seed=seed, n_faskes=3)) for seed in range(n)]
+
+
+def cached_bytes(cache):
+    return sum(size for _, size in cache.values())
+
+
+def test_centrality_cache_is_bounded_by_memory(monkeypatch):
+    small = graphs(3)
+    per_graph = 2 * network_analysis.CENTRALITY_BYTES_PER_NODE * max(G.number_of_nodes() for G in small)
+    monkeypatch.setattr(network_analysis, "CENTRALITY_CACHE_MAX_MB", 2 * per_graph / 1024 ** 2)
+
+    for G in small:
+        compute_centrality(G)
+    assert len(network_analysis._centrality_cache) == 2  # entri terlama dibuang
+    assert cached_bytes(network_analysis._centrality_cache) <= 2 * per_graph
+    assert compute_centrality(small[-1]) is compute_centrality(small[-1])
+
+
+def test_result_larger_than_the_cap_is_not_cached(monkeypatch):
+    G = graphs(1)[0]
+    monkeypatch.setattr(network_analysis, "COMMUNITY_CACHE_MAX_MB", 0)
+
+    assert detect_communities(G) is not detect_communities(G)
+    assert len(network_analysis._community_cache) == 0